@@ -0,0 +1,190 @@
+"""
+Deterministic synthetic corpora for the benchmarks: English-like text of any size and directory trees of
+many files. The same size and seed always produce the same bytes, so results are comparable across runs.
+
+Usage:
+    python benchmarks/corpus.py text OUT_FILE --size 10MB [--seed 0]
+    python benchmarks/corpus.py tree OUT_DIR --files 1000 [--file-size 2KB] [--seed 0]
+
+Sentences follow a few part-of-speech patterns, so the spaCy parser finds real noun chunks, and content
+words are drawn from a Zipf distribution, like in natural text.
+"""
+
+import argparse
+import random
+import re
+from collections.abc import Iterator
+from itertools import accumulate, product
+from pathlib import Path
+
+
+def _words(text: str) -> list[str]:
+    return text.split()
+
+
+NOUNS = _words(
+    "analysis author budget city client code company customer data density design document engine error "
+    "feature file government group history index keyword language library manager market member method model "
+    "network office parser pattern people performance plan problem process product project question reader "
+    "report research result schedule search server service student system table team test text theory user "
+    "value version website window word world",
+)
+ADJECTIVES = _words(
+    "accurate active annual basic better central common complete current different digital early easy "
+    "efficient final first free general global great important large local major modern new old open popular "
+    "possible private public quick recent robust simple small special strong useful",
+)
+VERBS = _words(
+    "added analyzed built changed checked collected created described explained found improved included kept "
+    "learned measured moved opened parsed reached reduced released reported sent showed started stored tested "
+    "tracked updated used wrote",
+)
+# Syllables of the rare made-up nouns that give the vocabulary a long tail, as in real corpora
+SYLLABLES = _words(
+    "ba da ka la ma na pa ra sa ta ven dor mil tan rex cor lum bri zen fal gor hin jus kel mor nix pol qua sul tor",
+)
+ADVERBS = _words("again carefully clearly daily easily often quickly rarely recently slowly today yesterday")
+FUNCTION_WORDS = {
+    "det": ["the", "a", "this", "every", "our", "their"],
+    "prep": ["in", "of", "for", "with", "on", "from", "about", "across"],
+    "pron": ["they", "we", "she", "he", "it"],
+    "conj": ["and", "but", "while", "because"],
+}
+PATTERNS = (
+    "det adj noun verb det noun",
+    "det noun verb det adj noun prep det noun",
+    "det noun prep det noun verb adv",
+    "pron verb det adj noun conj det noun verb adv",
+    "det adj noun prep det adj noun verb det noun",
+    "pron adv verb det noun prep det noun",
+)
+
+# Extensions of the files of generated trees: mostly supported ones, plus some that are skipped
+TREE_EXTENSIONS = (".txt", ".md", ".txt", ".md", ".html", ".py", ".txt", ".md", ".log", ".csv")
+# Files per directory of generated trees
+FILES_PER_DIRECTORY = 100
+
+_SIZE_PATTERN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([KMG]?B)?\s*$", re.IGNORECASE)
+_SIZE_UNITS = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3}
+
+
+def parse_size(size: str) -> int:
+    """
+    Parses a size such as "1KB", "2.5MB" or "512" (bytes) into a number of bytes.
+    """
+    match = _SIZE_PATTERN.match(size)
+    if match is None:
+        raise ValueError(f"Invalid size: {size!r}")
+    return int(float(match.group(1)) * _SIZE_UNITS[(match.group(2) or "B").upper()])
+
+
+def format_size(size: int) -> str:
+    """
+    Formats a number of bytes as the shortest exact "<n>KB"-style size, e.g. 1048576 -> "1MB".
+    """
+    for unit in ("GB", "MB", "KB"):
+        if size % _SIZE_UNITS[unit] == 0:
+            return f"{size // _SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+
+def _zipf_cum_weights(count: int) -> list[float]:
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+# Real nouns first, then about 28,000 made-up ones, so that real nouns are the most frequent
+_NOUN_VOCABULARY = NOUNS + ["".join(syllables) for length in (2, 3) for syllables in product(SYLLABLES, repeat=length)]
+_CONTENT_WORDS = {"noun": _NOUN_VOCABULARY, "adj": ADJECTIVES, "verb": VERBS, "adv": ADVERBS}
+_CUM_WEIGHTS = {tag: _zipf_cum_weights(len(words)) for tag, words in _CONTENT_WORDS.items()}
+
+
+def _sentence(rng: random.Random) -> str:
+    words = []
+    for tag in rng.choice(PATTERNS).split():
+        if tag in FUNCTION_WORDS:
+            words.append(rng.choice(FUNCTION_WORDS[tag]))
+        else:
+            words.append(rng.choices(_CONTENT_WORDS[tag], cum_weights=_CUM_WEIGHTS[tag])[0])
+    sentence = " ".join(words)
+    return f"{sentence[0].upper()}{sentence[1:]}{rng.choice('...!?')}"
+
+
+def iter_paragraphs(seed: int = 0) -> Iterator[str]:
+    """
+    Yields an endless, deterministic sequence of paragraphs of three to eight sentences.
+    """
+    rng = random.Random(seed)  # noqa: S311 - reproducible text, not security
+    while True:
+        yield " ".join(_sentence(rng) for _ in range(rng.randint(3, 8)))
+
+
+def generate_text(size: int, seed: int = 0) -> str:
+    """
+    Generates exactly `size` bytes (ASCII characters) of text, the same as write_text_file writes.
+    Paragraphs are separated by blank lines.
+    """
+    parts = []
+    length = 0
+    for paragraph in iter_paragraphs(seed):
+        if length >= size:
+            break
+        parts.append(f"{paragraph}\n\n")
+        length += len(parts[-1])
+    return "".join(parts)[:size]
+
+
+def write_text_file(path: Path | str, size: int, seed: int = 0) -> Path:
+    """
+    Writes `size` bytes of generated text to a file, streaming paragraphs so that even very large files
+    are generated in constant memory. Returns the path of the file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    remaining = size
+    with path.open("w", encoding="ascii", newline="\n") as f:
+        for paragraph in iter_paragraphs(seed):
+            if remaining <= 0:
+                break
+            block = f"{paragraph}\n\n"[:remaining]
+            f.write(block)
+            remaining -= len(block)
+    return path
+
+
+def write_tree(root: Path | str, files: int, file_size: int = 2048, seed: int = 0) -> Path:
+    """
+    Writes a directory tree of `files` generated files, FILES_PER_DIRECTORY per directory, nested two
+    levels deep. About one file in five has an unsupported extension. Returns the root directory.
+    """
+    root = Path(root)
+    for index in range(files):
+        directory = root / f"d{index // FILES_PER_DIRECTORY**2:03d}" / f"d{index // FILES_PER_DIRECTORY:05d}"
+        extension = TREE_EXTENSIONS[index % len(TREE_EXTENSIONS)]
+        write_text_file(directory / f"file_{index:06d}{extension}", file_size, seed + index)
+    return root
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic corpus.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    text_parser = subparsers.add_parser("text", help="Write one text file.")
+    text_parser.add_argument("output", help="The file to write.")
+    text_parser.add_argument("--size", default="1MB", help="Size of the file, e.g. 1KB or 100MB (default: 1MB).")
+    tree_parser = subparsers.add_parser("tree", help="Write a directory tree of text files.")
+    tree_parser.add_argument("output", help="The directory to write the files to.")
+    tree_parser.add_argument("--files", type=int, default=1000, help="Number of files (default: 1000).")
+    tree_parser.add_argument("--file-size", default="2KB", help="Size of each file (default: 2KB).")
+    for subparser in (text_parser, tree_parser):
+        subparser.add_argument("--seed", type=int, default=0, help="Seed of the generator (default: 0).")
+    args = parser.parse_args()
+
+    if args.command == "text":
+        path = write_text_file(args.output, parse_size(args.size), args.seed)
+        print(f"Wrote {args.size} of text to {path}")
+    else:
+        root = write_tree(args.output, args.files, parse_size(args.file_size), args.seed)
+        print(f"Wrote {args.files} files to {root}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Compares the fast engine with the spaCy engine on a corpus: throughput of each engine and how well
+their word counts agree.
+
+Usage:
+    python benchmarks/fast_engine.py PATH [--lemma-table TABLE] [--top_n 50]
+
+PATH is a file or a directory of supported files, e.g. one generated with benchmarks/corpus.py.
+Agreement is reported as the weighted Jaccard similarity of the corpus word counts (the share of counted
+words both engines agree on) and as the overlap of their top N keywords.
+"""
+
+import argparse
+import time
+from collections import Counter
+from pathlib import Path
+
+from kratio.constants import ANALYSIS_TYPE_WORDS, DEFAULT_BATCH_SIZE, DEFAULT_CHUNK_SIZE, SUPPORTED_EXTENSIONS
+from kratio.core.analyzer import count_chunked_texts
+from kratio.core.fast_engine import FastWordAnalyzer
+from kratio.io.file_handler import get_files_from_directory, is_directory, iter_text_chunks
+
+
+def _collect_files(path: str) -> list[Path]:
+    return get_files_from_directory(path, SUPPORTED_EXTENSIONS) if is_directory(path) else [Path(path)]
+
+
+def _run_spacy(files: list[Path]) -> tuple[Counter[str], float]:
+    start = time.perf_counter()
+    totals: Counter[str] = Counter()
+    chunked_texts = ((file, iter_text_chunks(file, DEFAULT_CHUNK_SIZE)) for file in files)
+    for _, counts in count_chunked_texts(chunked_texts, ANALYSIS_TYPE_WORDS, DEFAULT_BATCH_SIZE):
+        totals.update(counts[ANALYSIS_TYPE_WORDS])
+    return totals, time.perf_counter() - start
+
+
+def _run_fast(files: list[Path], lemma_table: str | None) -> tuple[Counter[str], float]:
+    start = time.perf_counter()
+    analyzer = FastWordAnalyzer(lemma_table)
+    totals: Counter[str] = Counter()
+    for file in files:
+        totals.update(analyzer.count_texts(iter_text_chunks(file, DEFAULT_CHUNK_SIZE))[ANALYSIS_TYPE_WORDS])
+    return totals, time.perf_counter() - start
+
+
+def weighted_jaccard(a: Counter[str], b: Counter[str]) -> float:
+    """
+    Returns sum(min) / sum(max) over the counts of every term; 1.0 means identical counts.
+    """
+    union = (a | b).total()
+    return (a & b).total() / union if union else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the fast engine against the spaCy engine.")
+    parser.add_argument("path", help="File or directory to analyze.")
+    parser.add_argument("--lemma-table", help="JSON lemma lookup table for the fast engine.")
+    parser.add_argument("--top_n", type=int, default=50, help="Number of top keywords to compare (default: 50).")
+    args = parser.parse_args()
+
+    files = _collect_files(args.path)
+    megabytes = sum(file.stat().st_size for file in files) / 1024 / 1024
+
+    fast_counts, fast_seconds = _run_fast(files, args.lemma_table)
+    spacy_counts, spacy_seconds = _run_spacy(files)
+
+    top_fast = {term for term, _ in fast_counts.most_common(args.top_n)}
+    top_spacy = {term for term, _ in spacy_counts.most_common(args.top_n)}
+    print(f"Corpus: {len(files)} files, {megabytes:.2f} MB")
+    for name, seconds in (("spacy", spacy_seconds), ("fast", fast_seconds)):
+        print(f"{name:>6}: {seconds:8.3f} s  {megabytes / seconds if seconds else 0:8.2f} MB/s")
+    print(f"Speedup: {spacy_seconds / fast_seconds if fast_seconds else 0:.1f}x")
+    print(f"Agreement (weighted Jaccard of word counts): {weighted_jaccard(fast_counts, spacy_counts):.1%}")
+    print(f"Top {args.top_n} overlap: {len(top_fast & top_spacy) / max(len(top_spacy), 1):.1%}")
+
+
+if __name__ == "__main__":
+    main()
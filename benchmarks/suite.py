@@ -0,0 +1,475 @@
+"""
+Benchmark suite of the Kratio pipeline stages on deterministic synthetic corpora (see corpus.py).
+
+Usage:
+    python benchmarks/suite.py run [--sizes 1KB,1MB,100MB] [--trees 10,1000,100000] [--stages words,scan]
+                                   [--repeat 3] [--corpus-dir DIR] [--output results.json]
+    python benchmarks/suite.py compare BASELINE.json CURRENT.json [--tolerance 0.1]
+
+`run` measures every stage on every corpus and writes the results as JSON. Text stages run on one file of
+each size; tree stages on directory trees of each number of files. Each stage runs in a fresh process, so
+its peak RSS is its own (it includes loading the spaCy model), and the best of --repeat runs is kept as the
+wall time. Tokens are counted as runs of word characters, the same way for every stage.
+
+`compare` flags stages whose wall time or peak RSS grew by more than the tolerance over a stored baseline,
+and exits with status 1 if there is any regression.
+
+Stages:
+    words, noun_chunks   spaCy engine counts (WordAnalyzer, NounChunkAnalyzer), streamed in chunks
+    fast                 fast engine word counts
+    normalize            normalize_to_dataframe of the word counts of the file
+    serialize_json/csv   Serializer.serialize of the resulting DataFrame
+    scan                 get_files_from_directory on a tree
+    watch                the watch-mode callback (KratioController.reanalyze_file) after an edit, on up to
+                         WATCH_SAMPLE files of a tree
+"""
+
+import argparse
+import contextlib
+import importlib.metadata
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from corpus import format_size, parse_size, write_text_file, write_tree
+from loguru import logger
+
+from kratio.constants import (
+    ANALYSIS_TYPE_NOUN_CHUNKS,
+    ANALYSIS_TYPE_WORDS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    ENGINE_FAST,
+    ENGINE_SPACY,
+    SUPPORTED_EXTENSIONS,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Number of files of a tree edited and re-analyzed by the watch stage
+WATCH_SAMPLE = 100
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+
+@dataclass
+class Workload:
+    """
+    A prepared benchmark: `run` is timed, and the work it does is `tokens` tokens or `files` files.
+    `reset`, if set, is called untimed before every run, so runs that change their inputs all do the same work.
+    """
+
+    run: Callable[[], object]
+    tokens: int | None = None
+    files: int | None = None
+    reset: Callable[[], object] | None = None
+
+
+# Prepares a workload from the corpus file or tree, a scratch directory and the command-line options
+type Stage = Callable[[Path, Path, argparse.Namespace], Workload]
+
+
+def _count_tokens(path: Path) -> int:
+    from kratio.io.file_handler import iter_text_chunks
+
+    return sum(len(_WORD_PATTERN.findall(chunk)) for chunk in iter_text_chunks(path, DEFAULT_CHUNK_SIZE))
+
+
+def _spacy_counts(analysis_type: str) -> Stage:
+    def setup(path: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+        from kratio.core.analyzer import count_chunked_texts, get_combined_analyzer
+        from kratio.io.file_handler import iter_text_chunks
+
+        get_combined_analyzer(analysis_type)  # Loads the model outside of the timed runs
+
+        def run() -> None:
+            chunked_texts = [(path, iter_text_chunks(path, DEFAULT_CHUNK_SIZE))]
+            for _ in count_chunked_texts(chunked_texts, analysis_type, DEFAULT_BATCH_SIZE):
+                pass
+
+        return Workload(run, tokens=_count_tokens(path))
+
+    return setup
+
+
+def _fast_counts(path: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+    from kratio.core.fast_engine import FastWordAnalyzer
+    from kratio.io.file_handler import iter_text_chunks
+
+    analyzer = FastWordAnalyzer(options.lemma_table)
+    return Workload(
+        lambda: analyzer.count_texts(iter_text_chunks(path, DEFAULT_CHUNK_SIZE)),
+        tokens=_count_tokens(path),
+    )
+
+
+def _word_counts_series(path: Path, options: argparse.Namespace) -> "tuple[pd.Series, int]":
+    import pandas as pd  # noqa: F811
+
+    from kratio.core.fast_engine import FastWordAnalyzer
+    from kratio.io.file_handler import iter_text_chunks
+
+    counts = FastWordAnalyzer(options.lemma_table).count_texts(iter_text_chunks(path, DEFAULT_CHUNK_SIZE))
+    series = pd.Series(counts[ANALYSIS_TYPE_WORDS], dtype=int)
+    return series, int(series.sum())
+
+
+def _normalize(path: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+    from kratio.utils.data_utils import normalize_to_dataframe
+
+    series, total = _word_counts_series(path, options)
+    return Workload(lambda: normalize_to_dataframe(series, total, "Keyword", "Word"), tokens=_count_tokens(path))
+
+
+def _serialize(suffix: str) -> Stage:
+    def setup(path: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+        from kratio.io.serializer import Serializer
+        from kratio.utils.data_utils import normalize_to_dataframe
+
+        series, total = _word_counts_series(path, options)
+        df = normalize_to_dataframe(series, total, "Keyword", "Word")
+        output_path = workdir / f"results{suffix}"
+        return Workload(lambda: Serializer().serialize(df, str(output_path)), tokens=_count_tokens(path))
+
+    return setup
+
+
+def _scan(root: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+    from kratio.io.file_handler import get_files_from_directory
+
+    files = sum(1 for path in root.rglob("*") if path.is_file())
+    return Workload(lambda: get_files_from_directory(str(root), SUPPORTED_EXTENSIONS), files=files)
+
+
+def _watch(root: Path, workdir: Path, options: argparse.Namespace) -> Workload:
+    from corpus import iter_paragraphs
+
+    from kratio.cli.cli_parser import parse_arguments
+    from kratio.cli.controller import KratioController
+    from kratio.io.file_handler import get_files_from_directory
+    from kratio.io.serializer import Serializer
+
+    # Edit copies of the files, so the stored corpus stays the same
+    sources = sorted(get_files_from_directory(str(root), SUPPORTED_EXTENSIONS))[:WATCH_SAMPLE]
+    files = [workdir / path.name for path in sources]
+    argv = ["kratio", str(workdir), "--no-visualization", "--no-cache", "--no-server", "--format", "json"]
+    with _patched_argv([*argv, "--engine", options.engine]):
+        args = parse_arguments()
+    controller = KratioController(serializer=Serializer())
+    edits = iter_paragraphs(seed=len(files))
+    # Every run appends the same paragraph to each file
+    appended = {file: f"\n\n{next(edits)}" for file in files}
+
+    def reset() -> None:
+        # Restores the original files, so every run edits inputs of the same size
+        for source, file in zip(sources, files, strict=True):
+            shutil.copyfile(source, file)
+            controller.reanalyze_file(file, args)  # Counts every paragraph once, like the initial analysis
+
+    def run() -> None:
+        for file in files:
+            with file.open("a", encoding="utf-8") as f:
+                f.write(appended[file])
+            controller.reanalyze_file(file, args)
+
+    return Workload(run, files=len(files), reset=reset)
+
+
+@contextlib.contextmanager
+def _patched_argv(argv: list[str]):  # noqa: ANN202
+    original, sys.argv = sys.argv, argv
+    try:
+        yield
+    finally:
+        sys.argv = original
+
+
+TEXT_STAGES: dict[str, Stage] = {
+    "words": _spacy_counts(ANALYSIS_TYPE_WORDS),
+    "noun_chunks": _spacy_counts(ANALYSIS_TYPE_NOUN_CHUNKS),
+    "fast": _fast_counts,
+    "normalize": _normalize,
+    "serialize_json": _serialize(".json"),
+    "serialize_csv": _serialize(".csv"),
+}
+TREE_STAGES: dict[str, Stage] = {
+    "scan": _scan,
+    "watch": _watch,
+}
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _measure(stage: str, path: Path, options: argparse.Namespace) -> dict:
+    """
+    Prepares and runs one stage in the current (fresh) process. Returns its measurements.
+    """
+    logger.remove()
+    setup = TEXT_STAGES.get(stage) or TREE_STAGES[stage]
+    with (
+        tempfile.TemporaryDirectory(prefix="kratio-bench-") as workdir,
+        Path(os.devnull).open("w") as devnull,
+        contextlib.redirect_stdout(devnull),
+    ):
+        try:
+            workload = setup(path, Path(workdir), options)
+        except SystemExit as e:  # The model loader exits when the spaCy model cannot be loaded
+            raise RuntimeError(f"stage setup exited with status {e.code}") from None
+        timings = []
+        for _ in range(options.repeat):
+            if workload.reset is not None:
+                workload.reset()
+            start = time.perf_counter()
+            workload.run()
+            timings.append(time.perf_counter() - start)
+    wall = min(timings)
+    return {
+        "wall_s": wall,
+        "runs_s": timings,
+        "tokens": workload.tokens,
+        "files": workload.files,
+        "tokens_per_s": workload.tokens / wall if workload.tokens and wall else None,
+        "files_per_s": workload.files / wall if workload.files and wall else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _run_isolated(stage: str, path: Path, options: argparse.Namespace) -> dict:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        try:
+            return executor.submit(_measure, stage, path, options).result()
+        except Exception as e:
+            return {"error": f"{type(e).__name__}: {e}"}
+
+
+def _text_corpus(corpus_dir: Path, size: int, seed: int) -> Path:
+    path = corpus_dir / f"text-{format_size(size)}-seed{seed}.txt"
+    if not path.is_file() or path.stat().st_size != size:
+        write_text_file(path, size, seed)
+    return path
+
+
+def _tree_corpus(corpus_dir: Path, files: int, seed: int) -> Path:
+    root = corpus_dir / f"tree-{files}-seed{seed}"
+    marker = root / ".complete"
+    if not marker.exists():
+        shutil.rmtree(root, ignore_errors=True)
+        write_tree(root, files, seed=seed)
+        marker.touch()
+    return root
+
+
+def _version(package: str) -> str:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return "not installed"
+
+
+def _environment() -> dict:
+    return {
+        "created": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "kratio": _version("kratio"),
+        "spacy": _version("spacy"),
+    }
+
+
+def _format_rate(result: dict) -> str:
+    if result.get("tokens_per_s"):
+        return f"{result['tokens_per_s']:>12,.0f} tokens/s"
+    if result.get("files_per_s"):
+        return f"{result['files_per_s']:>12,.0f} files/s "
+    return ""
+
+
+def run_suite(options: argparse.Namespace) -> dict:
+    """
+    Generates (or reuses) the corpora and measures the selected stages on each of them.
+
+    Returns:
+        dict: The environment ("environment") and one result per stage and corpus ("results").
+    """
+    stages = options.stages.split(",") if options.stages else [*TEXT_STAGES, *TREE_STAGES]
+    unknown = set(stages) - set(TEXT_STAGES) - set(TREE_STAGES)
+    if unknown:
+        raise SystemExit(f"Unknown stages: {', '.join(sorted(unknown))}")
+
+    cases = [(stage, format_size(size), size) for size in options.sizes for stage in stages if stage in TEXT_STAGES]
+    cases += [(stage, f"{files}files", files) for files in options.trees for stage in stages if stage in TREE_STAGES]
+
+    with contextlib.ExitStack() as stack:
+        if options.corpus_dir:
+            corpus_dir = Path(options.corpus_dir)
+        else:
+            corpus_dir = Path(stack.enter_context(tempfile.TemporaryDirectory(prefix="kratio-corpus-")))
+        results = []
+        for stage, case, size in cases:
+            if stage in TEXT_STAGES:
+                path = _text_corpus(corpus_dir, size, options.seed)
+            else:
+                path = _tree_corpus(corpus_dir, size, options.seed)
+            result = {"stage": stage, "case": case, **_run_isolated(stage, path, options)}
+            results.append(result)
+            if "error" in result:
+                print(f"{stage:>15} {case:>12}  failed: {result['error']}")
+            else:
+                print(
+                    f"{stage:>15} {case:>12} {result['wall_s']:10.4f} s {_format_rate(result)}"
+                    f" {result['peak_rss_mb'] or 0:8.1f} MB peak RSS",
+                )
+    return {
+        "environment": _environment(),
+        "options": {"seed": options.seed, "repeat": options.repeat},
+        "results": results,
+    }
+
+
+def compare_results(baseline: dict, current: dict, tolerance: float, min_delta: float) -> list[str]:
+    """
+    Compares the results of two runs, printing one line per stage and corpus found in both.
+
+    Args:
+        baseline (dict): The stored results, as written by `run`.
+        current (dict): The new results.
+        tolerance (float): Relative growth of wall time or peak RSS tolerated, e.g. 0.1 for 10%.
+        min_delta (float): Wall-time differences below this many seconds are never regressions, since the
+            smallest corpora are measured in microseconds.
+
+    Returns:
+        list[str]: A description of each regression.
+    """
+    baseline_results = {(r["stage"], r["case"]): r for r in baseline["results"] if "error" not in r}
+    regressions = []
+    for result in current["results"]:
+        key = (result["stage"], result["case"])
+        before = baseline_results.get(key)
+        if before is None or "error" in result:
+            continue
+        wall_change = result["wall_s"] / before["wall_s"] - 1 if before["wall_s"] else 0.0
+        rss_change = 0.0
+        if result["peak_rss_mb"] and before["peak_rss_mb"]:
+            rss_change = result["peak_rss_mb"] / before["peak_rss_mb"] - 1
+
+        problems = []
+        if wall_change > tolerance and result["wall_s"] - before["wall_s"] >= min_delta:
+            problems.append(f"wall time {wall_change:+.1%}")
+        if rss_change > tolerance:
+            problems.append(f"peak RSS {rss_change:+.1%}")
+        status = f"REGRESSION ({', '.join(problems)})" if problems else "ok"
+        print(
+            f"{key[0]:>15} {key[1]:>12} {before['wall_s']:10.4f} s -> {result['wall_s']:10.4f} s "
+            f"({wall_change:+7.1%})  RSS {rss_change:+7.1%}  {status}",
+        )
+        if problems:
+            regressions.append(f"{key[0]} on {key[1]}: {', '.join(problems)}")
+
+    for field in ("python", "spacy", "platform", "cpu_count"):
+        if baseline["environment"].get(field) != current["environment"].get(field):
+            print(
+                f"Note: {field} differs ({baseline['environment'].get(field)} -> {current['environment'].get(field)}); "
+                f"results may not be comparable.",
+            )
+    return regressions
+
+
+def _size_list(value: str) -> list[int]:
+    return [parse_size(size) for size in value.split(",") if size]
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(number) for number in value.split(",") if number]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the Kratio pipeline stages on synthetic corpora.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks and write the results as JSON.")
+    run_parser.add_argument(
+        "--sizes",
+        type=_size_list,
+        default="1KB,100KB,1MB",
+        help="Text sizes (default: 1KB,100KB,1MB).",
+    )
+    run_parser.add_argument("--trees", type=_int_list, default="10,1000", help="Files per tree (default: 10,1000).")
+    run_parser.add_argument("--stages", help="Comma-separated stages to run (default: all).")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Runs per stage; the fastest is kept (default: 3).")
+    run_parser.add_argument("--seed", type=int, default=0, help="Seed of the corpus generator (default: 0).")
+    run_parser.add_argument(
+        "--corpus-dir",
+        help="Directory where generated corpora are kept and reused between runs (default: a temporary directory).",
+    )
+    run_parser.add_argument(
+        "--engine",
+        default=ENGINE_SPACY,
+        choices=[ENGINE_SPACY, ENGINE_FAST],
+        help=f"Engine of the watch stage (default: {ENGINE_SPACY}).",
+    )
+    run_parser.add_argument("--lemma-table", help="JSON lemma lookup table for the fast engine.")
+    run_parser.add_argument(
+        "--output",
+        default="benchmark-results.json",
+        help="File to write the results to (default: benchmark-results.json).",
+    )
+
+    compare_parser = subparsers.add_parser("compare", help="Compare results with a baseline and flag regressions.")
+    compare_parser.add_argument("baseline", help="Results of the baseline run.")
+    compare_parser.add_argument("current", help="Results of the run to check.")
+    compare_parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.1,
+        help="Tolerated relative growth of wall time and peak RSS (default: 0.1).",
+    )
+    compare_parser.add_argument(
+        "--min-delta",
+        type=float,
+        default=0.001,
+        help="Smallest wall-time growth in seconds reported as a regression (default: 0.001).",
+    )
+    args = parser.parse_args()
+
+    if args.command == "run":
+        report = run_suite(args)
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"Results written to {args.output}")
+        return
+
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    regressions = compare_results(baseline, current, args.tolerance, args.min_delta)
+    if regressions:
+        print(f"{len(regressions)} regression(s):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
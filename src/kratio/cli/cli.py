@@ -5,11 +5,10 @@ from pathlib import Path
 from loguru import logger
 
 from kratio.cli.cli_parser import parse_arguments
-from kratio.cli.controller import KratioController
+from kratio.cli.client import forward_to_server
 from kratio.exceptions import FileProcessingError, FileReadError, OutputDirectoryError
-from kratio.io.serializer import Serializer
+from kratio.io.file_handler import is_directory
 from kratio.utils.logging_config import setup_logging
-from kratio.utils.watch import FileWatcher
 
 
 def main() -> None:
@@ -17,14 +16,33 @@ def main() -> None:
     Main function to run the Kratio keyword density analyzer.
     Acts as the composition root for the application.
     """
+    if sys.argv[1:2] == ["serve"]:
+        from kratio.cli.server import serve_main
+
+        serve_main(sys.argv[2:])
+        return
+
     try:
         args = parse_arguments()
         # Set logging level based on debug flag
         log_level = "DEBUG" if hasattr(args, "debug") and args.debug else "INFO"
         setup_logging(silent=args.silent, level=log_level)
 
+        # A running server has the model loaded already; only fall back to analyzing here without one
+        exit_code = forward_to_server(args)
+        if exit_code is not None:
+            sys.exit(exit_code)
+
+        # Imported after forwarding, so forwarded runs never load pandas, spaCy or matplotlib
+        from kratio.cli.controller import KratioController
+        from kratio.io.cache import DocCache, ResultCache
+        from kratio.io.serializer import Serializer
+        from kratio.utils.watch import FileWatcher
+
         serializer = Serializer()
-        controller = KratioController(serializer=serializer)
+        cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+        doc_cache = DocCache(args.cache_dir, args.parse_cache_max_size * 1024 * 1024) if args.parse_cache else None
+        controller = KratioController(serializer=serializer, cache=cache, doc_cache=doc_cache)
 
         if args.watch:
             # In watch mode, automatically disable visualization unless explicitly enabled
@@ -36,20 +54,24 @@ def main() -> None:
 
             # Create a file watcher
             watcher = FileWatcher()
+            if is_directory(args.path):
+                # The files found by the initial analysis are fingerprinted, so saves without changes are skipped
+                controller.scan_listener = watcher.fingerprints.record_stat
+            if args.aggregate and is_directory(args.path):
+                # Changed files update the corpus results in place; they are refreshed by the loop below
+                controller.watch_corpus()
 
             # Define callback function for file changes
             def on_file_change(file_path: Path) -> None:
+                if not file_path.exists():
+                    logger.info(f"{file_path} was removed")
+                    controller.forget_file(file_path)
+                    return
                 logger.info(f"Re-analyzing {file_path}")
-                # Create a copy of args with the updated path
-                import copy
-
-                file_args = copy.deepcopy(args)
-                file_args.path = str(file_path)
-                # Ensure watch flag is set in the copied args
-                file_args.watch = True
                 logger.debug(f"File change callback with path: {file_path}")
                 try:
-                    controller.run_analysis(file_args)
+                    # Only the paragraphs changed since the last analysis of the file are parsed again
+                    controller.reanalyze_file(file_path, args)
                 except FileReadError as e:
                     logger.error(f"Error reading file during re-analysis: {e}")
                     logger.info("Continuing to watch for changes...")
@@ -65,11 +87,26 @@ def main() -> None:
 
             try:
                 # Start watching the specified path
-                watcher.start_watching(args.path, on_file_change)
-
-                # Run initial analysis
+                watcher.start_watching(
+                    args.path,
+                    on_file_change,
+                    workers=args.watch_workers,
+                    debounce_seconds=args.watch_debounce,
+                    polling=args.watch_polling,
+                    poll_interval=args.watch_poll_interval,
+                    exclude=args.exclude or (),
+                    use_ignore_files=not args.no_ignore,
+                    prune=not args.no_ignore,
+                )
+
+                # Run initial analysis; a single file is analyzed per paragraph so later edits are incremental.
+                # Changes made meanwhile are analyzed once it is complete.
                 try:
-                    controller.run_analysis(args)
+                    with watcher.hold_changes():
+                        if is_directory(args.path):
+                            controller.run_analysis(args)
+                        else:
+                            controller.reanalyze_file(Path(args.path), args)
                 except (FileReadError, FileProcessingError, OutputDirectoryError) as e:
                     logger.error(f"Error during initial analysis: {e}")
                     logger.info("Continuing to watch for changes...")
@@ -80,6 +117,12 @@ def main() -> None:
                 try:
                     while True:
                         time.sleep(1)
+                        controller.govern_memory(args)
+                        try:
+                            controller.refresh_corpus(args)
+                            controller.publish_metrics(args)
+                        except OutputDirectoryError as e:
+                            logger.error(f"Output directory error while writing results: {e}")
                 except KeyboardInterrupt:
                     raise  # Re-raise to be caught by outer try/except
 
@@ -90,6 +133,9 @@ def main() -> None:
             except KeyboardInterrupt:
                 logger.info("Watch mode interrupted by user.")
                 watcher.stop_watching()
+                # The last changes may not have been written to --output yet
+                controller.refresh_corpus(args, flush=True)
+                controller.report_metrics(args)
                 sys.exit(130)  # Exit code for KeyboardInterrupt
             except Exception as e:
                 logger.exception(f"Unexpected error in watch mode: {e}")
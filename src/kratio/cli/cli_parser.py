@@ -1,6 +1,30 @@
 import argparse
+from pathlib import Path
 
-from kratio.constants import ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
+from kratio.constants import (
+    ANALYSIS_TYPE_ALL,
+    ANALYSIS_TYPE_NOUN_CHUNKS,
+    ANALYSIS_TYPE_WORDS,
+    DECODE_ERRORS_REPLACE,
+    DECODE_ERRORS_SKIP,
+    DECODE_ERRORS_STRICT,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CACHE_MAX_MB,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_DECODE_ERRORS,
+    DEFAULT_MAX_VOCAB_GROWTH,
+    DEFAULT_PARSE_CACHE_MAX_MB,
+    DEFAULT_PREFETCH_FILES,
+    DEFAULT_READ_THREADS,
+    DEFAULT_SCAN_THREADS,
+    DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+    DEFAULT_WATCH_DEBOUNCE_SECONDS,
+    DEFAULT_WATCH_POLL_INTERVAL_SECONDS,
+    DEFAULT_WATCH_WORKERS,
+    DEFAULT_WRITE_QUEUE,
+    ENGINE_FAST,
+    ENGINE_SPACY,
+)
 
 
 def parse_arguments() -> argparse.Namespace:
@@ -10,7 +34,10 @@ def parse_arguments() -> argparse.Namespace:
     Returns:
         argparse.Namespace: An object containing the parsed arguments.
     """
-    parser = argparse.ArgumentParser(description="Analyze keyword density in a text file or directory.")
+    parser = argparse.ArgumentParser(
+        description="Analyze keyword density in a text file or directory.",
+        epilog="Run 'kratio serve' to start a server that keeps the spaCy model loaded; kratio forwards runs to it.",
+    )
     parser.add_argument(
         "path",
         type=str,
@@ -20,11 +47,30 @@ def parse_arguments() -> argparse.Namespace:
         "--analysis_type",
         type=str,
         default=ANALYSIS_TYPE_WORDS,
-        choices=[ANALYSIS_TYPE_WORDS, ANALYSIS_TYPE_NOUN_CHUNKS],
+        choices=[ANALYSIS_TYPE_WORDS, ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_ALL],
         help=(
             f"The type of analysis to perform ("
-            f"{ANALYSIS_TYPE_WORDS} or {ANALYSIS_TYPE_NOUN_CHUNKS}, "
-            f"default: {ANALYSIS_TYPE_WORDS})."
+            f"{ANALYSIS_TYPE_WORDS}, {ANALYSIS_TYPE_NOUN_CHUNKS} or {ANALYSIS_TYPE_ALL}, "
+            f"default: {ANALYSIS_TYPE_WORDS}). "
+            f"'{ANALYSIS_TYPE_ALL}' derives every analysis from a single parse of each file."
+        ),
+    )
+    parser.add_argument(
+        "--engine",
+        type=str,
+        default=ENGINE_SPACY,
+        choices=[ENGINE_SPACY, ENGINE_FAST],
+        help=(
+            f"Counting engine (default: {ENGINE_SPACY}). '{ENGINE_FAST}' skips spaCy entirely and uses a regex "
+            f"tokenizer, spaCy's stop words and a lemma lookup table; {ANALYSIS_TYPE_WORDS} analysis only."
+        ),
+    )
+    parser.add_argument(
+        "--lemma-table",
+        type=str,
+        help=(
+            f"JSON lemma lookup table ({{form: lemma}}) for --engine {ENGINE_FAST} "
+            "(default: the spacy-lookups-data table if installed)."
         ),
     )
     parser.add_argument(
@@ -36,7 +82,19 @@ def parse_arguments() -> argparse.Namespace:
     parser.add_argument(
         "--output",
         type=str,
-        help="Output file path to dump the DataFrame (CSV or JSON format).",
+        help=(
+            "Output file path to dump the DataFrame (CSV, JSON or NDJSON format). When a directory is analyzed, "
+            "the results of every file are streamed to it, with a source_file column."
+        ),
+    )
+    parser.add_argument(
+        "--output-template",
+        type=str,
+        help=(
+            "Also write the results of each file to its own output, e.g. results/{parent}/{stem}.csv; {parent} "
+            "is the file's directory relative to the analyzed directory, {name} its name and {analysis_type} "
+            "the analysis type."
+        ),
     )
     parser.add_argument(
         "--save-plot",
@@ -55,6 +113,156 @@ def parse_arguments() -> argparse.Namespace:
         choices=["json", "csv", "table"],
         help="Output format for the analysis results (json, csv, or table, default: table).",
     )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help=(
+            "Merge the counts of all files into corpus-level frequency, density and document frequency; "
+            "--output and --save-plot receive the corpus results."
+        ),
+    )
+    parser.add_argument(
+        "--per-file",
+        action="store_true",
+        help="With --aggregate, also display the results of each file.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Number of files spaCy processes per batch when analyzing a directory (default: {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=(
+            "Maximum number of characters parsed as one document; larger files are streamed in paragraph- "
+            f"or sentence-aligned chunks and their counts merged (default: {DEFAULT_CHUNK_SIZE})."
+        ),
+    )
+    parser.add_argument(
+        "--decode-errors",
+        type=str,
+        default=DEFAULT_DECODE_ERRORS,
+        choices=[DECODE_ERRORS_STRICT, DECODE_ERRORS_REPLACE, DECODE_ERRORS_SKIP],
+        help=(
+            f"How to handle bytes that are not valid UTF-8: '{DECODE_ERRORS_STRICT}' fails the file, "
+            f"'{DECODE_ERRORS_REPLACE}' substitutes U+FFFD and '{DECODE_ERRORS_SKIP}' drops them "
+            f"(default: {DEFAULT_DECODE_ERRORS}). Binary files are skipped when analyzing a directory."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to analyze a directory (default: 1).",
+    )
+    parser.add_argument(
+        "--exclude",
+        action="append",
+        metavar="PATTERN",
+        help=(
+            "Skip files and directories matching this pattern (.gitignore syntax, relative to the analyzed "
+            "directory) when analyzing a directory. May be given several times."
+        ),
+    )
+    parser.add_argument(
+        "--no-ignore",
+        action="store_true",
+        help=(
+            "Do not honor .gitignore and .kratioignore files, and descend into VCS, cache, node_modules and "
+            "virtual environment directories too."
+        ),
+    )
+    parser.add_argument(
+        "--scan-threads",
+        type=int,
+        default=DEFAULT_SCAN_THREADS,
+        help=(
+            "Number of threads listing directories in parallel when analyzing a directory, which mostly helps "
+            f"on network filesystems (default: {DEFAULT_SCAN_THREADS})."
+        ),
+    )
+    parser.add_argument(
+        "--read-threads",
+        type=int,
+        default=DEFAULT_READ_THREADS,
+        help=(
+            "Number of threads reading and hashing files ahead of the analysis, which hides slow storage such as "
+            f"network filesystems; 0 reads each file when it is analyzed (default: {DEFAULT_READ_THREADS})."
+        ),
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=DEFAULT_PREFETCH_FILES,
+        help=(
+            "Maximum number of files read ahead of the analysis; files over 4 MB are streamed instead "
+            f"(default: {DEFAULT_PREFETCH_FILES})."
+        ),
+    )
+    parser.add_argument(
+        "--write-queue",
+        type=int,
+        default=DEFAULT_WRITE_QUEUE,
+        help=(
+            "Maximum number of results waiting to be displayed and serialized on the writer thread while the "
+            "next files are analyzed; 0 writes each result before analyzing the next file. Plotted results are "
+            f"always written on the main thread (default: {DEFAULT_WRITE_QUEUE})."
+        ),
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Disable the on-disk result cache and analyze every file.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory of the result cache (default: $KRATIO_CACHE_DIR, else ~/.cache/kratio).",
+    )
+    parser.add_argument(
+        "--cache-max-size",
+        type=int,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=(
+            "Size limit of the result cache in MB; least recently used entries are evicted beyond it "
+            f"(default: {DEFAULT_CACHE_MAX_MB})."
+        ),
+    )
+    parser.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Log result and parse cache hits, misses and size at the end of the run.",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        type=str,
+        help=(
+            "Write the run's metrics (documents, tokens and bytes processed, and p50/p90/p99 latencies per stage) "
+            "to this file: JSON for a .json file, the Prometheus text format otherwise."
+        ),
+    )
+    parser.add_argument(
+        "--parse-cache",
+        action="store_true",
+        help=(
+            "Cache parsed documents in the cache directory, so analyzing the same files with another "
+            "--analysis_type skips the spaCy pipeline. Not used with --workers."
+        ),
+    )
+    parser.add_argument(
+        "--parse-cache-max-size",
+        type=int,
+        default=DEFAULT_PARSE_CACHE_MAX_MB,
+        help=f"Size limit of the parse cache in MB (default: {DEFAULT_PARSE_CACHE_MAX_MB}).",
+    )
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Analyze in this process even if a Kratio server (kratio serve) is running.",
+    )
     parser.add_argument(
         "--silent",
         action="store_true",
@@ -65,9 +273,113 @@ def parse_arguments() -> argparse.Namespace:
         action="store_true",
         help="Monitor the file or directory and re-run analysis on every change.",
     )
+    parser.add_argument(
+        "--watch-debounce",
+        type=float,
+        default=DEFAULT_WATCH_DEBOUNCE_SECONDS,
+        help=(
+            "In watch mode, seconds without further changes to a file before it is re-analyzed, so a burst of "
+            f"saves (a checkout, a formatter) re-analyzes each file once (default: {DEFAULT_WATCH_DEBOUNCE_SECONDS})."
+        ),
+    )
+    parser.add_argument(
+        "--watch-workers",
+        type=int,
+        default=DEFAULT_WATCH_WORKERS,
+        help=f"In watch mode, number of threads re-analyzing changed files (default: {DEFAULT_WATCH_WORKERS}).",
+    )
+    parser.add_argument(
+        "--watch-polling",
+        action="store_true",
+        help=(
+            "In watch mode, detect changes by polling file sizes and modification times instead of relying on "
+            "file system events, which can be missed on network mounts and in containers. Polling is also used "
+            "when file system events are unavailable."
+        ),
+    )
+    parser.add_argument(
+        "--watch-poll-interval",
+        type=float,
+        default=DEFAULT_WATCH_POLL_INTERVAL_SECONDS,
+        help=f"Seconds between two polls of the watched path (default: {DEFAULT_WATCH_POLL_INTERVAL_SECONDS}).",
+    )
+    parser.add_argument(
+        "--snapshot-interval",
+        type=float,
+        default=DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+        help=(
+            "In watch mode, minimum seconds between two writes of --metrics-out and, when watching a directory "
+            f"with --aggregate, of the corpus results to --output (default: {DEFAULT_SNAPSHOT_INTERVAL_SECONDS})."
+        ),
+    )
+    parser.add_argument(
+        "--max-vocab-growth",
+        type=int,
+        default=DEFAULT_MAX_VOCAB_GROWTH,
+        help=(
+            "In watch mode, reload the spaCy model once its vocabulary has gained this many strings, as it keeps "
+            f"every word it has seen (0 for no limit, default: {DEFAULT_MAX_VOCAB_GROWTH})."
+        ),
+    )
+    parser.add_argument(
+        "--max-rss-mb",
+        type=int,
+        default=0,
+        help="In watch mode, reload the spaCy model when the process uses more memory than this (Linux only).",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Enable debug logging for troubleshooting.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help=(
+            "Profile the run with cProfile and tracemalloc and log a report of the time and peak allocations "
+            "of each stage (reading, spaCy pipeline, counting, DataFrames, display, serialization, plotting) "
+            "and of the slowest functions. Runs locally, never on a Kratio server, with every stage on the main "
+            "thread."
+        ),
+    )
+    parser.add_argument(
+        "--profile-stats",
+        type=str,
+        help="With --profile, also write the cProfile statistics to this .pstats file (for snakeviz, gprof2dot, ...).",
+    )
+    args = parser.parse_args()
+    if args.engine == ENGINE_FAST and args.analysis_type != ANALYSIS_TYPE_WORDS:
+        parser.error(f"--engine {ENGINE_FAST} only supports --analysis_type {ANALYSIS_TYPE_WORDS}.")
+    if args.per_file and not args.aggregate:
+        parser.error("--per-file requires --aggregate.")
+    if args.output_template:
+        if args.aggregate:
+            parser.error("--output-template cannot be combined with --aggregate.")
+        try:
+            args.output_template.format(parent=".", stem="", name="", analysis_type="")
+        except (KeyError, IndexError, ValueError) as e:
+            parser.error(f"Invalid --output-template {args.output_template!r}: unknown or malformed field {e}.")
+    if args.lemma_table and args.engine != ENGINE_FAST:
+        parser.error(f"--lemma-table requires --engine {ENGINE_FAST}.")
+    if args.profile_stats and not args.profile:
+        parser.error("--profile-stats requires --profile.")
+    if min(args.batch_size, args.chunk_size) < 1:
+        parser.error("--batch-size and --chunk-size must be at least 1.")
+    if min(args.read_threads, args.prefetch, args.write_queue, args.scan_threads) < 0:
+        parser.error("--read-threads, --prefetch, --write-queue and --scan-threads cannot be negative.")
+    if min(args.max_vocab_growth, args.max_rss_mb) < 0:
+        parser.error("--max-vocab-growth and --max-rss-mb cannot be negative.")
+    if args.watch_workers < 1 or args.watch_debounce < 0 or min(args.watch_poll_interval, args.snapshot_interval) <= 0:
+        parser.error(
+            "--watch-workers must be at least 1, --watch-debounce cannot be negative and "
+            "--watch-poll-interval and --snapshot-interval must be positive.",
+        )
+    if args.profile and args.watch:
+        parser.error("--profile cannot be combined with --watch.")
+    if args.watch and args.output and not args.aggregate and Path(args.path).is_dir():
+        # A re-analyzed file could only replace the results of the whole directory with its own
+        parser.error(
+            "--output cannot be combined with --watch on a directory without --aggregate; "
+            "use --output-template to keep one output per file.",
+        )
+    return args
@@ -0,0 +1,128 @@
+"""
+Thin client of the Kratio analysis server (`kratio serve`).
+Only standard library modules are imported here, so forwarding a run to a warm server skips loading
+pandas, spaCy and matplotlib in the CLI process.
+"""
+
+import json
+import os
+import socket
+import stat
+import sys
+import tempfile
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from kratio.constants import SERVER_SOCKET_ENV_VAR
+
+if TYPE_CHECKING:
+    import argparse
+
+# Arguments holding paths, resolved against the client's working directory before forwarding
+_PATH_ARGUMENTS = ("path", "output", "output_template", "save_plot", "cache_dir", "lemma_table", "metrics_out")
+# Seconds to wait for the server to accept a connection
+_CONNECT_TIMEOUT = 1.0
+
+
+def default_socket_path() -> Path:
+    """
+    Returns the server socket path: $KRATIO_SOCKET, else kratio.sock in $XDG_RUNTIME_DIR, which only the
+    current user can access, else kratio-<uid>.sock in the temporary directory.
+    """
+    if SERVER_SOCKET_ENV_VAR in os.environ:
+        return Path(os.environ[SERVER_SOCKET_ENV_VAR])
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and Path(runtime_dir).is_dir():
+        return Path(runtime_dir) / "kratio.sock"
+    return Path(tempfile.gettempdir()) / f"kratio-{os.getuid()}.sock"
+
+
+def _is_trusted_socket(socket_path: Path) -> bool:
+    """
+    Checks that the socket belongs to the current user and that no one else can write to it. The default path
+    in the shared temporary directory is predictable, so another user could create it first to receive the
+    paths of every run and answer with made-up results.
+    """
+    try:
+        socket_stat = socket_path.stat()
+    except OSError:
+        return False
+    if socket_stat.st_uid != os.getuid() or socket_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+        logger.warning(
+            f"Not forwarding to the Kratio server at {socket_path}: the socket is owned or writable by another "
+            "user. Analyzing locally.",
+        )
+        return False
+    return True
+
+
+def send_message(sock: socket.socket, message: dict) -> None:
+    """
+    Sends one newline-terminated JSON message.
+    """
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def receive_message(sock: socket.socket) -> dict:
+    """
+    Receives one newline-terminated JSON message. Raises ConnectionError if the peer closes first.
+    """
+    data = bytearray()
+    while not data.endswith(b"\n"):
+        block = sock.recv(65536)
+        if not block:
+            raise ConnectionError("Connection closed before a complete message was received.")
+        data.extend(block)
+    return json.loads(data)
+
+
+def _can_forward(args: "argparse.Namespace") -> bool:
+    # Watch mode runs for the lifetime of the CLI, interactive plots must be shown by the CLI process, and
+    # profiles describe a cold run in this process
+    shows_plot = not args.no_visualization and not args.save_plot
+    local_only = args.watch or args.no_server or getattr(args, "profile", False)
+    return hasattr(socket, "AF_UNIX") and not local_only and not shows_plot
+
+
+def forward_to_server(args: "argparse.Namespace", socket_path: Path | None = None) -> int | None:
+    """
+    Runs an analysis on the Kratio server if one is listening, writing its output to this process's
+    stdout and stderr.
+
+    The request carries the parsed arguments of KratioController.run_analysis; the response carries the
+    printed output, the log messages, the top results of every analyzed file and the exit code.
+
+    Args:
+        args (argparse.Namespace): The parsed CLI arguments.
+        socket_path (Path | None): The server socket (defaults to default_socket_path()).
+
+    Returns:
+        int | None: The exit code of the run, or None if it could not be forwarded and must run locally.
+    """
+    if not _can_forward(args):
+        return None
+    socket_path = socket_path or default_socket_path()
+    if not socket_path.exists() or not _is_trusted_socket(socket_path):
+        return None
+
+    request_args = dict(vars(args))
+    for name in _PATH_ARGUMENTS:
+        if request_args.get(name):
+            request_args[name] = str(Path(request_args[name]).absolute())
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(_CONNECT_TIMEOUT)
+            sock.connect(str(socket_path))
+            sock.settimeout(None)  # Analyses of large directories take as long as they take
+            send_message(sock, {"args": request_args})
+            response = receive_message(sock)
+    except (OSError, ValueError) as e:
+        logger.debug(f"Kratio server at {socket_path} is not available, analyzing locally: {e}")
+        return None
+
+    sys.stderr.write(response["log"])
+    sys.stdout.write(response["stdout"])
+    return response["exit_code"]
@@ -1,4 +1,14 @@
+import contextlib
+import functools
+import gc
+import hashlib
+import itertools
 import os
+import sys
+import threading
+import time
+from collections import Counter
+from collections.abc import Callable, Iterable, Iterator
 from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -6,23 +16,59 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     import argparse
 
+    import pandas as pd
+    from spacy.tokens import Doc
+
 from loguru import logger
 
-from kratio.constants import ANALYSIS_TYPE_WORDS, SUPPORTED_EXTENSIONS
-from kratio.core.analyzer import analyze_text_noun_chunks, analyze_text_words
+from kratio.constants import (
+    ANALYSIS_TYPE_WORDS,
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_DECODE_ERRORS,
+    DEFAULT_MAX_VOCAB_GROWTH,
+    DEFAULT_PREFETCH_FILES,
+    DEFAULT_READ_THREADS,
+    DEFAULT_SCAN_THREADS,
+    DEFAULT_SNAPSHOT_INTERVAL_SECONDS,
+    DEFAULT_WRITE_QUEUE,
+    ENGINE_FAST,
+    ENGINE_SPACY,
+    SUPPORTED_EXTENSIONS,
+)
+from kratio.core.aggregate import CorpusCounts
+from kratio.core.analyzer import (
+    count_chunked_texts,
+    counts_to_dataframes,
+    get_analysis_types,
+    get_combined_analyzer,
+    parse_chunked_texts,
+)
+from kratio.core.fast_engine import FastWordAnalyzer
+from kratio.core.incremental import IncrementalCounts
+from kratio.core.parallel import count_files_parallel
 from kratio.exceptions import FileProcessingError, FileReadError, OutputDirectoryError
+from kratio.io.cache import DiskCache, DocCache, ResultCache
 from kratio.io.file_handler import (
-    get_files_from_directory,
+    hash_file,
+    is_binary_file,
     is_directory,
+    iter_text_chunks,
     read_text_file,
+    split_paragraphs,
 )
-from kratio.io.serializer import Serializer
-from kratio.utils.utils import display_top_keywords
-from kratio.visualization.visualizer import (
-    display_plot,
-    persist_plot,
-    visualize_top_keywords,
-)
+from kratio.io.scanner import iter_files
+from kratio.io.serializer import ResultStream, Serializer
+from kratio.utils.memory import MemoryLimits
+from kratio.utils.metrics import metrics
+from kratio.utils.pipeline import OrderedWriter, prefetch
+from kratio.utils.profiling import StageProfiler
+from kratio.utils.utils import display_top_keywords, format_top_keywords
+
+# Number of files whose cache entries are looked up together while the directory scan continues
+_PLANNING_WINDOW = 256
+# Files larger than this are not read ahead but streamed chunk by chunk, so read-ahead memory stays bounded
+_PREFETCH_MAX_FILE_BYTES = 4 * 1024 * 1024
 
 
 def _validate_output_path(file_path: str | Path) -> None:
@@ -45,58 +91,807 @@ def _validate_output_path(file_path: str | Path) -> None:
             raise OutputDirectoryError(f"Output directory '{output_dir}' is not writable.")
 
 
+def _hash_file(file_path: Path) -> str:
+    """
+    Hashes a file's content for cache lookups, wrapping read failures in FileProcessingError.
+    """
+    try:
+        return hash_file(file_path)
+    except FileReadError as e:
+        raise FileProcessingError(f"Error reading file {file_path}: {e}") from e
+
+
+def _file_size(file_path: Path) -> int:
+    try:
+        return file_path.stat().st_size
+    except OSError:
+        return 0
+
+
+def _is_text_file(file_path: Path) -> bool:
+    """
+    Sniffs the first bytes of a file found by a directory scan, so mislabeled binary files are skipped.
+    """
+    if is_binary_file(file_path):
+        logger.warning(f"Skipping binary file {file_path}")
+        return False
+    return True
+
+
+def _pipeline_settings(args: "argparse.Namespace") -> tuple[int, int, int]:
+    """
+    Returns the number of reader threads, the number of files read ahead and the depth of the writer queue.
+    Profiled runs keep every stage on the main thread, which is the only one the profiler follows.
+    """
+    if getattr(args, "profile", False):
+        return 0, 0, 0
+    return (
+        getattr(args, "read_threads", DEFAULT_READ_THREADS),
+        getattr(args, "prefetch", DEFAULT_PREFETCH_FILES),
+        getattr(args, "write_queue", DEFAULT_WRITE_QUEUE),
+    )
+
+
+def _corpus_label(corpus: CorpusCounts) -> str:
+    return f"corpus of {corpus.documents} file{'s' if corpus.documents != 1 else ''}"
+
+
+def _model_fingerprint() -> str:
+    # Imported here so runs with the fast engine never import spaCy
+    from kratio.core.spacy_loader import SpacyModelLoader
+
+    return SpacyModelLoader.get_model_fingerprint()
+
+
+@functools.cache
+def _code_version() -> str:
+    """
+    Returns what identifies the Kratio code in result cache keys: the installed version, or in a source checkout
+    without an installed distribution a digest of the package's source files, so that code changes invalidate
+    the cache. Resolved on first use, as reading the distribution metadata is slow.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("kratio")
+    except PackageNotFoundError:
+        package_dir = Path(__file__).parent.parent
+        digest = hashlib.blake2b(digest_size=16)
+        for source in sorted(package_dir.rglob("*.py")):
+            digest.update(source.relative_to(package_dir).as_posix().encode("utf-8"))
+            digest.update(source.read_bytes())
+        return f"source-{digest.hexdigest()}"
+
+
+def _log_cache_stats(name: str, cache: DiskCache) -> None:
+    stats = cache.stats()
+    logger.info(
+        f"{name}: {stats['hits']} hits, {stats['misses']} misses, {stats['evictions']} evictions, "
+        f"{stats['entries']} entries ({stats['size_bytes'] / 1024:.1f} KiB) in {cache.cache_dir}",
+    )
+
+
+def _path_for_analysis_type(file_path: str, analysis_type: str, multiple: bool) -> str:
+    """
+    Returns the path to write an analysis type's output to.
+    When several analysis types share one output path, the type is appended to the file name
+    (e.g. results.csv -> results_words.csv).
+    """
+    if not multiple:
+        return file_path
+    path = Path(file_path)
+    return str(path.with_stem(f"{path.stem}_{analysis_type}"))
+
+
+def _templated_output_path(template: str, file_path: Path, analysis_type: str, args: "argparse.Namespace") -> str:
+    """
+    Fills in --output-template for one analyzed file: {parent} is the file's directory relative to the analyzed
+    directory ("." at its top), {stem} and {name} its name without and with extension, and {analysis_type}
+    the analysis type (e.g. results/{parent}/{stem}.csv).
+    """
+    root = Path(args.path) if is_directory(args.path) else Path(args.path).parent
+    try:
+        parent = file_path.parent.absolute().relative_to(root.absolute()).as_posix()
+    except ValueError:
+        parent = "."
+    return template.format(parent=parent, stem=file_path.stem, name=file_path.name, analysis_type=analysis_type)
+
+
+class _MissPlan[T]:
+    """
+    Plans the files of a window that missed a cache: only the first file with a given content is computed,
+    and the files with the same content further down the window reuse its result. Results are taken by content
+    hash rather than by position, so a duplicate never consumes the result of the next computed file.
+    """
+
+    def __init__(self, files: list[Path], hashes: list[str], cached: list[bool]) -> None:
+        self.to_compute: list[Path] = []
+        # How many files of the window still need the result of each content
+        self._pending: Counter[str] = Counter()
+        for file, content_hash, hit in zip(files, hashes, cached, strict=True):
+            if hit:
+                continue
+            if content_hash not in self._pending:
+                self.to_compute.append(file)
+            self._pending[content_hash] += 1
+        self._results: dict[str, T] = {}
+
+    def take(self, content_hash: str, computed: Iterator[tuple[Path, T]]) -> T:
+        """
+        Returns the result for a content, computing it on its first file; it is kept until its last file took it.
+        """
+        if content_hash not in self._results:
+            _, self._results[content_hash] = next(computed)
+        self._pending[content_hash] -= 1
+        if self._pending[content_hash] > 0:
+            return self._results[content_hash]
+        del self._pending[content_hash]
+        return self._results.pop(content_hash)
+
+
 class KratioController:
     """
     Orchestrates the analysis, presentation, and serialization of keyword density.
     """
 
-    def __init__(self, serializer: Serializer) -> None:
+    def __init__(
+        self,
+        serializer: Serializer,
+        cache: ResultCache | None = None,
+        doc_cache: DocCache | None = None,
+    ) -> None:
         self.serializer = serializer
+        self.cache = cache
+        self.doc_cache = doc_cache
+        # Fast engine analyzers by lemma table, as a server's controller serves runs with different tables
+        self._fast_analyzers: dict[str | None, FastWordAnalyzer] = {}
+        # Per-paragraph counts of the files re-analyzed in watch mode
+        self._incremental: dict[Path, IncrementalCounts] = {}
+        # Watch mode re-analyzes files on several threads: reads overlap, but spaCy pipelines are not meant to
+        # be shared between threads and results must not interleave
+        self._analysis_lock = threading.Lock()
+        self._output_lock = threading.Lock()
+        # With --aggregate in watch mode: the corpus of the watched directory, the counts each file contributes
+        # to it, and whether its latest state has been displayed and written to --output
+        self._live_corpus: CorpusCounts | None = None
+        self._file_counts: dict[Path, dict[str, Counter[str]]] = {}
+        self._corpus_lock = threading.Lock()
+        self._corpus_displayed = True
+        self._corpus_written = True
+        self._last_snapshot = 0.0
+        # Limits of a watch session's memory, set up by govern_memory, and when --metrics-out was last written
+        self._memory_limits: MemoryLimits | None = None
+        self._last_metrics = 0.0
+        # During a directory run, the streams the results of every file are written to, keyed by output path
+        self._streams: dict[str, ResultStream | None] | None = None
+        # When set to a list, the top results of every presented source are also appended to it
+        self.collected_results: list[dict] | None = None
+        # When set, called with every file a directory scan finds, on a scanning thread and before the file is read
+        self.scan_listener: Callable[[Path], None] | None = None
 
-    def _process_file(self, file_path: Path, args: "argparse.Namespace") -> None:
+    def _get_fast_analyzer(self, args: "argparse.Namespace") -> FastWordAnalyzer:
+        """
+        Returns the fast engine analyzer of the run's lemma table, loading it once per controller and table.
         """
-        Processes a single file for keyword density analysis.
+        lemma_table = getattr(args, "lemma_table", None)
+        if lemma_table not in self._fast_analyzers:
+            self._fast_analyzers[lemma_table] = FastWordAnalyzer(lemma_table)
+        return self._fast_analyzers[lemma_table]
+
+    def _read_chunks(self, file_path: Path, chunk_size: int, errors: str = DEFAULT_DECODE_ERRORS) -> Iterator[str]:
         """
+        Reads a file for analysis in chunks, wrapping read failures in FileProcessingError.
+        """
+        with contextlib.suppress(OSError):  # A missing file is reported by iter_text_chunks
+            metrics.increment("bytes", file_path.stat().st_size)
         try:
-            text = read_text_file(file_path)
-            df = (
-                analyze_text_words(text)
-                if args.analysis_type == ANALYSIS_TYPE_WORDS
-                else analyze_text_noun_chunks(text)
+            yield from metrics.time_total("reading file", iter_text_chunks(file_path, chunk_size, errors))
+        except FileReadError as e:
+            raise FileProcessingError(f"Error reading file {file_path}: {e}") from e
+
+    def _read_ahead(self, files: Iterable[Path], args: "argparse.Namespace") -> Iterator[tuple[Path, Iterable[str]]]:
+        """
+        Reads the chunks of the next files on reader threads while the current file is analyzed.
+        Yields each file with its chunks in file order; large files are streamed by the consumer instead.
+        """
+        chunk_size = getattr(args, "chunk_size", DEFAULT_CHUNK_SIZE)
+        errors = getattr(args, "decode_errors", DEFAULT_DECODE_ERRORS)
+        threads, depth, _ = _pipeline_settings(args)
+
+        def read(file: Path) -> Iterable[str]:
+            chunks = self._read_chunks(file, chunk_size, errors)
+            return chunks if threads < 1 or _file_size(file) > _PREFETCH_MAX_FILE_BYTES else list(chunks)
+
+        return prefetch(read, files, "reading", threads, depth)
+
+    def _count_uncached(
+        self,
+        files: Iterable[Path],
+        args: "argparse.Namespace",
+    ) -> Iterator[tuple[Path, dict[str, "Counter[str]"]]]:
+        """
+        Counts the terms of files either across worker processes or by streaming their chunks through
+        spaCy in batches (or the fast engine). Results are yielded in file order; except with several
+        workers, which schedule the largest files first, files are consumed as they are yielded.
+        """
+        workers = getattr(args, "workers", 1)
+        chunk_size = getattr(args, "chunk_size", DEFAULT_CHUNK_SIZE)
+        batch_size = getattr(args, "batch_size", DEFAULT_BATCH_SIZE)
+        engine = getattr(args, "engine", ENGINE_SPACY)
+        if workers > 1:
+            files = list(files)
+        if workers > 1 and len(files) > 1:
+            if self.doc_cache is not None and engine == ENGINE_SPACY:
+                logger.debug("The parse cache is not used when analyzing with several workers.")
+            lemma_table = getattr(args, "lemma_table", None)
+            return count_files_parallel(
+                files,
+                args.analysis_type,
+                workers,
+                chunk_size,
+                batch_size,
+                engine,
+                lemma_table,
+                getattr(args, "decode_errors", DEFAULT_DECODE_ERRORS),
+            )
+        if engine == ENGINE_FAST:
+            analyzer = self._get_fast_analyzer(args)
+            return ((file, analyzer.count_texts(chunks)) for file, chunks in self._read_ahead(files, args))
+        if self.doc_cache is not None:
+            windows = itertools.batched(files, _PLANNING_WINDOW)
+            return itertools.chain.from_iterable(self._count_with_parse_cache(list(w), args) for w in windows)
+        return count_chunked_texts(self._read_ahead(files, args), args.analysis_type, batch_size)
+
+    def _count_with_parse_cache(
+        self,
+        files: list[Path],
+        args: "argparse.Namespace",
+    ) -> Iterator[tuple[Path, dict[str, "Counter[str]"]]]:
+        """
+        Counts the terms of files in file order, deserializing the Docs of previously parsed files
+        from the parse cache and only running the pipeline on the rest.
+        Files are parsed with the components of every analyzer, so cached Docs serve any analysis type.
+        """
+        doc_cache = self.doc_cache
+        chunk_size = str(getattr(args, "chunk_size", DEFAULT_CHUNK_SIZE))
+        decode_errors = getattr(args, "decode_errors", DEFAULT_DECODE_ERRORS)
+        batch_size = getattr(args, "batch_size", DEFAULT_BATCH_SIZE)
+        analyzer = get_combined_analyzer(args.analysis_type, parse_all=True)
+        components = ",".join(sorted(analyzer.nlp.pipe_names))
+        fingerprint = _model_fingerprint()
+        hashes = [content_hash for _, content_hash in self._hash_ahead(files, args)]
+        keys = [
+            DocCache.make_key(content_hash, fingerprint, components, chunk_size, decode_errors)
+            for content_hash in hashes
+        ]
+        cached = [doc_cache.contains(key) for key in keys]
+        doc_cache.record_miss(cached.count(False))
+
+        def parse(to_parse: list[Path]) -> Iterator[tuple[Path, list["Doc"]]]:
+            return parse_chunked_texts(self._read_ahead(to_parse, args), analyzer.nlp, batch_size)
+
+        misses = _MissPlan(files, hashes, cached)
+        parsed = parse(misses.to_compute)
+        for file, content_hash, key, hit in zip(files, hashes, keys, cached, strict=True):
+            if not hit:
+                # Files with the same content are parsed once; the others reuse its Docs
+                docs = misses.take(content_hash, parsed)
+            else:
+                docs = doc_cache.load(key, analyzer.nlp.vocab)
+                if docs is not None:
+                    yield file, analyzer.count_docs(docs)
+                    continue
+                # An entry that was present during planning can still turn out unreadable; parse that file alone
+                _, docs = next(parse([file]))
+            doc_cache.store(key, docs)
+            yield file, analyzer.count_docs(docs)
+
+    def _hash_ahead(self, files: Iterable[Path], args: "argparse.Namespace") -> Iterator[tuple[Path, str]]:
+        """
+        Hashes the content of files for cache lookups on the reader threads, yielding them in file order.
+        """
+        threads, depth, _ = _pipeline_settings(args)
+        return prefetch(_hash_file, files, "hashing", threads, depth)
+
+    def _cache_keys(self, content_hash: str, args: "argparse.Namespace") -> dict[str, str]:
+        """
+        Derives the result cache key of a file's content for each analysis type of the run. The counts also
+        depend on how the content is split into chunks and decoded.
+        """
+        chunk_size = str(getattr(args, "chunk_size", DEFAULT_CHUNK_SIZE))
+        decode_errors = getattr(args, "decode_errors", DEFAULT_DECODE_ERRORS)
+        if getattr(args, "engine", ENGINE_SPACY) == ENGINE_FAST:
+            fingerprint = self._get_fast_analyzer(args).fingerprint()
+        else:
+            fingerprint = _model_fingerprint()
+        return {
+            analysis_type: ResultCache.make_key(
+                content_hash,
+                analysis_type,
+                fingerprint,
+                _code_version(),
+                chunk_size,
+                decode_errors,
             )
+            for analysis_type in get_analysis_types(args.analysis_type)
+        }
 
-            if not args.silent:
+    def _count_files(
+        self,
+        files: Iterable[Path],
+        args: "argparse.Namespace",
+    ) -> Iterator[tuple[Path, dict[str, "Counter[str]"]]]:
+        """
+        Counts the terms of files in file order, serving unchanged files from the result cache
+        and only analyzing the rest. Cache lookups are planned per window of files, so the first
+        results are ready before the directory scan yielding them is complete.
+        """
+        if self.cache is None:
+            yield from self._count_uncached(files, args)
+            return
+        if getattr(args, "workers", 1) > 1:
+            # Worker processes are started once for the whole run rather than per window
+            yield from self._count_cached_window(list(files), args)
+            return
+        for window in itertools.batched(files, _PLANNING_WINDOW):
+            yield from self._count_cached_window(list(window), args)
+
+    def _count_cached_window(
+        self,
+        files: list[Path],
+        args: "argparse.Namespace",
+    ) -> Iterator[tuple[Path, dict[str, "Counter[str]"]]]:
+        cache = self.cache
+        hashes = [content_hash for _, content_hash in self._hash_ahead(files, args)]
+        keys = [self._cache_keys(content_hash, args) for content_hash in hashes]
+        cached = [all(cache.contains(key) for key in file_keys.values()) for file_keys in keys]
+        # Every entry of a file that is analyzed again is a miss, as hits are counted per entry that is read
+        cache.record_miss(sum(len(file_keys) for file_keys, hit in zip(keys, cached, strict=True) if not hit))
+        misses = _MissPlan(files, hashes, cached)
+        computed = self._count_uncached(misses.to_compute, args)
+
+        for file, content_hash, file_keys, hit in zip(files, hashes, keys, cached, strict=True):
+            if not hit:
+                # Files with the same content are analyzed once; the others reuse its counts
+                counts = misses.take(content_hash, computed)
+            else:
+                counts = {analysis_type: cache.get(key) for analysis_type, key in file_keys.items()}
+                if all(type_counts is not None for type_counts in counts.values()):
+                    yield file, counts
+                    continue
+                # An entry that was present during planning can still turn out unreadable; analyze that file alone
+                _, counts = next(self._count_uncached([file], args))
+            for analysis_type, key in file_keys.items():
+                cache.put(key, counts[analysis_type])
+            yield file, counts
+
+    def _process_files(self, files: Iterable[Path], args: "argparse.Namespace") -> None:
+        """
+        Processes files for keyword density analysis, presenting the results of each file in order.
+        With --aggregate, the counts of every file are merged into corpus-level results instead,
+        and per-file results are only displayed when --per-file is set.
+
+        Results are displayed and serialized on a writer thread while the next files are analyzed,
+        except when plotting, which must stay on the main thread. When a directory is analyzed, the results
+        of every file are streamed to --output one after the other, rather than each replacing the last.
+        """
+        # In watch mode with --aggregate, the files are recorded in the live corpus (see watch_corpus)
+        live = self._live_corpus is not None
+        corpus = self._live_corpus
+        if corpus is None and getattr(args, "aggregate", False):
+            corpus = CorpusCounts()
+        # Per-file results are plotted unless they are aggregated
+        plots = corpus is None and not args.no_visualization
+        write_queue = 0 if plots else _pipeline_settings(args)[2]
+        self._streams = {} if corpus is None and args.output and is_directory(args.path) else None
+        try:
+            with OrderedWriter("writing", write_queue) as writer:
+                for file_path, counts in metrics.time_items("analyzing file", self._count_files(files, args)):
+                    metrics.increment("documents")
+                    if corpus is None:
+                        writer.submit(self._present_results, file_path, counts, args)
+                        continue
+                    if live:
+                        self._update_corpus(file_path, counts)
+                    else:
+                        corpus.add(counts)
+                    if getattr(args, "per_file", False):
+                        writer.submit(self._present_results, file_path, counts, args, display_only=True)
+        finally:
+            streams, self._streams = self._streams or {}, None
+            for stream in streams.values():
+                if stream is not None:
+                    stream.close()
+
+        if corpus is None:
+            return
+        self._present(_corpus_label(corpus), self._live_corpus_results if live else corpus.to_dataframes, args)
+        if live:
+            with self._corpus_lock:
+                self._corpus_displayed = self._corpus_written = True
+                self._last_snapshot = time.monotonic()
+
+    def _present_results(
+        self,
+        file_path: Path,
+        counts: dict[str, "Counter[str]"],
+        args: "argparse.Namespace",
+        display_only: bool = False,
+    ) -> None:
+        """
+        Displays, serializes and plots the analysis results of a single file.
+        Counts are keyed by analysis type; see _present.
+        """
+        self._present(
+            str(file_path),
+            lambda top_n: counts_to_dataframes(counts, top_n),
+            args,
+            display_only,
+            source=file_path,
+        )
+
+    def _present(
+        self,
+        label: str,
+        build_results: "Callable[[int | None], dict[str, pd.DataFrame]]",
+        args: "argparse.Namespace",
+        display_only: bool = False,
+        source: Path | None = None,
+    ) -> None:
+        """
+        Displays, serializes and plots analysis results keyed by analysis type; with several types, each one
+        is written to its own output and plot file. Display and plot only need the top_n terms, so the full
+        sorted tables are only built when they are written to --output or --output-template.
+
+        Args:
+            label (str): What the results describe, e.g. the analyzed file.
+            build_results (Callable[[int | None], dict[str, pd.DataFrame]]): Builds the result DataFrames,
+                limited to the given number of top terms, or complete for None.
+            args (argparse.Namespace): The parsed arguments.
+            display_only (bool): Whether to skip writing the output and plot files and showing plots.
+            source (Path | None): The file the results are for, unless they describe a corpus.
+        """
+        template = getattr(args, "output_template", None) if source is not None else None
+        with metrics.time("presenting results"):
+            with metrics.time("building results"):
+                results = build_results(args.top_n)
+                full_results = build_results(None) if (args.output or template) and not display_only else None
+            multiple = len(results) > 1
+            if not args.silent and hasattr(args, "watch") and args.watch:
                 # Add timestamp in watch mode
-                if hasattr(args, "watch") and args.watch:
-                    timestamp = datetime.now().strftime("%H:%M:%S")
-                    logger.info(f"[{timestamp}] Analysis results for {file_path}:")
+                timestamp = datetime.now().strftime("%H:%M:%S")
+                logger.info(f"[{timestamp}] Analysis results for {label}:")
 
-                display_top_keywords(df, args.top_n, args.format)
+            for analysis_type, df in results.items():
+                if self.collected_results is not None:
+                    top = format_top_keywords(df, args.top_n)
+                    self.collected_results.append({"source": label, "analysis_type": analysis_type, "top": top})
 
-            if args.output:
-                _validate_output_path(args.output)
-                self.serializer.serialize(df, args.output)
+                if not args.silent:
+                    if multiple:
+                        logger.info(f"{analysis_type} results for {label}:")
+                    with metrics.time("displaying results"):
+                        display_top_keywords(df, args.top_n, args.format)
 
-            if not args.no_visualization:
-                fig = visualize_top_keywords(df, args.top_n, args.analysis_type)
-                if args.save_plot:
-                    _validate_output_path(args.save_plot)
-                    persist_plot(fig, args.save_plot)
-                else:
-                    display_plot(fig)
+                if display_only:
+                    continue
 
-        except FileReadError as e:
-            raise FileProcessingError(f"Error reading file {file_path}: {e}") from e
+                if full_results is not None and args.output:
+                    self._write_output(
+                        full_results[analysis_type],
+                        args.output,
+                        analysis_type,
+                        multiple,
+                        label if source is not None else None,
+                    )
+                if full_results is not None and template:
+                    self._write_output(
+                        full_results[analysis_type],
+                        _templated_output_path(template, source, analysis_type, args),
+                        analysis_type,
+                        multiple and "{analysis_type}" not in template,
+                    )
+
+                if not args.no_visualization:
+                    # matplotlib and seaborn are only imported when plotting
+                    from kratio.visualization.visualizer import (
+                        close_plots,
+                        display_plot,
+                        persist_plot,
+                        visualize_top_keywords,
+                    )
+
+                    try:
+                        with metrics.time("plotting"):
+                            fig = visualize_top_keywords(df, args.top_n, analysis_type)
+                            if args.save_plot:
+                                plot_path = _path_for_analysis_type(args.save_plot, analysis_type, multiple)
+                                _validate_output_path(plot_path)
+                                persist_plot(fig, plot_path)
+                        if not args.save_plot:
+                            # Not timed: the plot window stays open until the user closes it
+                            display_plot(fig)
+                    finally:
+                        # pyplot keeps every figure until it is closed, which adds up over a watch session
+                        close_plots()
+
+    def _write_output(
+        self,
+        df: "pd.DataFrame",
+        output: str,
+        analysis_type: str,
+        multiple: bool,
+        source: str | None = None,
+    ) -> None:
+        """
+        Writes a result table to its output file. During a directory run, the tables of the files (those with a
+        source) are appended to a stream per output file instead, opened on first use.
+        """
+        output_path = _path_for_analysis_type(output, analysis_type, multiple)
+        if source is not None and self._streams is not None:
+            if output_path not in self._streams:
+                _validate_output_path(output_path)
+                self._streams[output_path] = self.serializer.open_stream(output_path)
+            stream = self._streams[output_path]
+            if stream is not None:
+                with metrics.time("serializing results"):
+                    stream.write(df, source)
+            return
+        _validate_output_path(output_path)
+        with metrics.time("serializing results"):
+            self.serializer.serialize(df, output_path)
+
+    def watch_corpus(self) -> None:
+        """
+        Keeps the corpus results of a watched directory up to date (--aggregate in watch mode).
+
+        The initial analysis records the counts of every file; when a file is re-analyzed, its previous counts
+        are taken out of the corpus and its new ones merged, so the corpus results never have to be computed
+        from scratch. The results are displayed and written by refresh_corpus rather than after every change.
+        """
+        self._live_corpus = CorpusCounts()
+
+    def _update_corpus(self, file_path: Path, counts: dict[str, Counter[str]] | None) -> None:
+        """
+        Replaces the counts a file contributes to the live corpus; None removes the file from the corpus.
+        """
+        key = file_path.absolute()
+        with self._corpus_lock:
+            previous = self._file_counts.pop(key, None)
+            if previous is not None:
+                self._live_corpus.remove(previous)
+            if counts is not None:
+                self._live_corpus.add(counts)
+                self._file_counts[key] = counts
+            self._corpus_displayed = self._corpus_written = False
+
+    def _live_corpus_results(self, top_n: int | None) -> dict[str, "pd.DataFrame"]:
+        with self._corpus_lock:
+            return self._live_corpus.to_dataframes(top_n)
+
+    def refresh_corpus(self, args: "argparse.Namespace", flush: bool = False) -> None:
+        """
+        Called periodically in watch mode: displays the corpus results again if files changed since they were
+        last displayed, replacing the previous view on a terminal, and writes them to --output if files
+        changed since the last write, at most every --snapshot-interval seconds. A burst of changes thus
+        costs one refresh rather than one per file.
+
+        Args:
+            args (argparse.Namespace): The parsed arguments.
+            flush (bool): Whether to write pending changes to --output now, e.g. when watch mode stops.
+        """
+        if self._live_corpus is None:
+            return
+        interval = getattr(args, "snapshot_interval", DEFAULT_SNAPSHOT_INTERVAL_SECONDS)
+        with self._corpus_lock:
+            display = not self._corpus_displayed
+            write = (
+                bool(args.output)
+                and not self._corpus_written
+                and (flush or time.monotonic() - self._last_snapshot >= interval)
+            )
+            label = _corpus_label(self._live_corpus)
+            self._corpus_displayed = True
+            if write:
+                self._corpus_written = True
+                self._last_snapshot = time.monotonic()
+
+        with self._output_lock:
+            if display and not args.silent:
+                if args.format == "table" and sys.stdout.isatty():
+                    # Clears the terminal, so the view of the corpus stays in place
+                    print("\033[H\033[2J", end="", flush=True)
+                self._present(label, self._live_corpus_results, args, display_only=True)
+            if write:
+                results = self._live_corpus_results(None)
+                for analysis_type, df in results.items():
+                    self._write_output(df, args.output, analysis_type, len(results) > 1)
+                logger.debug(f"Wrote the results of the {label} to {args.output}")
+
+    def forget_file(self, file_path: Path) -> None:
+        """
+        Drops what is kept about a watched file that was deleted or moved away, taking it out of the live corpus.
+        """
+        key = file_path.absolute()
+        with self._analysis_lock:
+            self._incremental.pop(key, None)
+        if self._live_corpus is not None and key in self._file_counts:
+            self._update_corpus(file_path, None)
+
+    def govern_memory(self, args: "argparse.Namespace") -> None:
+        """
+        Called periodically in watch mode: records the resident set size and vocabulary size gauges, and
+        reloads the spaCy pipelines once their vocabulary has grown by --max-vocab-growth strings or the
+        process exceeds --max-rss-mb, so a session running for days keeps a bounded footprint.
+        """
+        if self._memory_limits is None:
+            self._memory_limits = MemoryLimits(
+                getattr(args, "max_vocab_growth", DEFAULT_MAX_VOCAB_GROWTH),
+                getattr(args, "max_rss_mb", 0) * 1024 * 1024,
+            )
+        if getattr(args, "engine", ENGINE_SPACY) == ENGINE_FAST:
+            # The fast engine keeps no vocabulary; there is nothing to reload
+            self._memory_limits.check(None)
+            return
+
+        from kratio.core.spacy_loader import SpacyModelLoader
+
+        with self._analysis_lock:
+            reason = self._memory_limits.check(SpacyModelLoader.vocabulary_size())
+            if reason is None:
+                return
+            logger.info(f"Reloading the spaCy model, as {reason}")
+            with metrics.time("reloading model"):
+                SpacyModelLoader.unload()
+                # The per-paragraph counts are plain strings and stay valid; only their counter is replaced
+                count_paragraphs = self._paragraph_counter(args)
+                for state in self._incremental.values():
+                    state.count_paragraphs = count_paragraphs
+                gc.collect()
+            self._memory_limits.reloaded()
+            metrics.increment("model reloads")
+
+    def publish_metrics(self, args: "argparse.Namespace") -> None:
+        """
+        Called periodically in watch mode: writes the metrics recorded so far to --metrics-out, at most every
+        --snapshot-interval seconds, so they can be collected while the session runs.
+        """
+        metrics_out = getattr(args, "metrics_out", None)
+        interval = getattr(args, "snapshot_interval", DEFAULT_SNAPSHOT_INTERVAL_SECONDS)
+        if not metrics_out or time.monotonic() - self._last_metrics < interval:
+            return
+        self._last_metrics = time.monotonic()
+        _validate_output_path(metrics_out)
+        metrics.write(metrics_out)
+
+    def _paragraph_counter(
+        self,
+        args: "argparse.Namespace",
+    ) -> Callable[[list[str]], list[dict[str, "Counter[str]"]]]:
+        """
+        Returns a function counting a batch of paragraphs with the engine and analysis type of the run.
+        """
+        if getattr(args, "engine", ENGINE_SPACY) == ENGINE_FAST:
+            fast_analyzer = self._get_fast_analyzer(args)
+            return lambda paragraphs: [{ANALYSIS_TYPE_WORDS: fast_analyzer.count_doc(p)} for p in paragraphs]
+
+        analyzer = get_combined_analyzer(args.analysis_type)
+        batch_size = getattr(args, "batch_size", DEFAULT_BATCH_SIZE)
+        return lambda paragraphs: [
+            analyzer.count_doc(doc)
+            for doc in metrics.time_items("spaCy pipeline", analyzer.nlp.pipe(paragraphs, batch_size=batch_size))
+        ]
+
+    def reanalyze_file(self, file_path: Path, args: "argparse.Namespace") -> None:
+        """
+        Re-analyzes a watched file after a change and presents its results. Counts are kept per paragraph,
+        so only paragraphs that are new or were edited since the last call are run through the pipeline.
+        With watch_corpus, the file's counts are updated in the live corpus instead, and its own results
+        are only displayed with --per-file.
+        Safe to call from several threads, though not for the same file at the same time.
+        """
+        with metrics.time("reanalyzing file"):
+            try:
+                text = read_text_file(file_path, getattr(args, "decode_errors", DEFAULT_DECODE_ERRORS))
+            except FileReadError as e:
+                raise FileProcessingError(f"Error reading file {file_path}: {e}") from e
+
+            key = file_path.absolute()
+            paragraphs = split_paragraphs(text, getattr(args, "chunk_size", DEFAULT_CHUNK_SIZE))
+            with self._analysis_lock:
+                if key not in self._incremental:
+                    analysis_types = get_analysis_types(args.analysis_type)
+                    self._incremental[key] = IncrementalCounts(analysis_types, self._paragraph_counter(args))
+                state = self._incremental[key]
+                counted = state.update(paragraphs)
+                # A copy, as the totals change with the next update and the corpus must be able to take these back
+                totals = {t: Counter(c) for t, c in state.totals.items()} if self._live_corpus is not None else None
+            logger.debug(f"Counted {counted} of {len(paragraphs)} paragraphs of {file_path}")
+            if totals is None:
+                with self._output_lock:
+                    self._present_results(file_path, state.totals, args)
+            else:
+                self._update_corpus(file_path, totals)
+                if getattr(args, "per_file", False):
+                    with self._output_lock:
+                        self._present_results(file_path, totals, args, display_only=True)
+        metrics.increment("documents")
 
     def run_analysis(self, args: "argparse.Namespace") -> None:
         """
         Runs the keyword density analysis based on parsed arguments.
         """
+        if getattr(args, "profile", False):
+            self._run_profiled(args)
+        else:
+            self._analyze_path(args)
+
+        if getattr(args, "cache_stats", False):
+            if self.cache is not None:
+                _log_cache_stats("Result cache", self.cache)
+            if self.doc_cache is not None:
+                _log_cache_stats("Parse cache", self.doc_cache)
+        self.report_metrics(args)
+
+    def _analyze_path(self, args: "argparse.Namespace") -> None:
         if is_directory(args.path):
-            files = get_files_from_directory(args.path, SUPPORTED_EXTENSIONS)
-            if not files:
+            files = self._scan(args)
+            first = next(files, None)
+            if first is None:
                 raise FileProcessingError(f"No supported files found in directory '{args.path}'.")
-            for file in files:
-                self._process_file(file, args)
+            self._process_files(itertools.chain([first], files), args)
         else:
-            self._process_file(Path(args.path), args)
+            self._process_files([Path(args.path)], args)
+
+    def _scan(self, args: "argparse.Namespace") -> Iterator[Path]:
+        """
+        Lazily lists the supported files of the analyzed directory, honoring --exclude and --no-ignore and
+        skipping binary files, and reports each of them to scan_listener.
+        """
+        no_ignore = getattr(args, "no_ignore", False)
+        listener = self.scan_listener
+
+        def accept(file_path: Path) -> bool:
+            if not _is_text_file(file_path):
+                return False
+            if listener is not None:
+                listener(file_path)
+            return True
+
+        files = iter_files(
+            args.path,
+            SUPPORTED_EXTENSIONS,
+            exclude=getattr(args, "exclude", None) or (),
+            use_ignore_files=not no_ignore,
+            prune=not no_ignore,
+            threads=getattr(args, "scan_threads", DEFAULT_SCAN_THREADS),
+            accept=accept,
+        )
+        return metrics.time_total("scanning directory", files)
+
+    def _run_profiled(self, args: "argparse.Namespace") -> None:
+        """
+        Analyzes under the profiler, then logs its report and writes the cProfile statistics to --profile-stats.
+        """
+        profiler = StageProfiler()
+        with profiler.profile():
+            self._analyze_path(args)
+        # Tracing slows the run down, so the report is for comparing stages rather than absolute times
+        logger.info(f"Profile of the run:\n{profiler.report()}")
+        stats_path = getattr(args, "profile_stats", None)
+        if stats_path:
+            _validate_output_path(stats_path)
+            profiler.dump_stats(stats_path)
+            logger.info(f"Profile statistics written to {stats_path}")
+
+    def report_metrics(self, args: "argparse.Namespace") -> None:
+        """
+        Logs the summary of the metrics recorded so far (at debug level unless --metrics-out is set) and
+        writes them to --metrics-out.
+        """
+        metrics_out = getattr(args, "metrics_out", None)
+        metrics.log_summary("INFO" if metrics_out else "DEBUG")
+        if metrics_out:
+            _validate_output_path(metrics_out)
+            metrics.write(metrics_out)
+            logger.info(f"Metrics written to {metrics_out}")
@@ -0,0 +1,194 @@
+"""
+Kratio analysis server (`kratio serve`).
+Keeps spaCy models and imports warm in one long-lived process and runs analyses requested by the CLI
+over a Unix domain socket, one at a time.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import signal
+import socket
+import socketserver
+import sys
+from pathlib import Path
+
+from loguru import logger
+
+from kratio.cli.client import default_socket_path, receive_message, send_message
+from kratio.cli.controller import KratioController
+from kratio.constants import ANALYSIS_TYPE_ALL, ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
+from kratio.core.analyzer import get_combined_analyzer
+from kratio.exceptions import FileProcessingError, FileReadError, OutputDirectoryError
+from kratio.io.cache import DocCache, ResultCache
+from kratio.io.serializer import Serializer
+from kratio.utils.logging_config import setup_logging
+from kratio.utils.metrics import metrics
+
+# Same format as loguru's default console sink, without colors
+_LOG_FORMAT = "{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}\n"
+
+
+def parse_serve_arguments(argv: list[str]) -> argparse.Namespace:
+    """
+    Parses the arguments of `kratio serve`.
+
+    Returns:
+        argparse.Namespace: An object containing the parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        prog="kratio serve",
+        description="Run a Kratio analysis server that keeps the spaCy model loaded between runs.",
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help="Path of the Unix domain socket to listen on (default: $KRATIO_SOCKET, else kratio.sock in "
+        "$XDG_RUNTIME_DIR, else kratio-<uid>.sock in the temporary directory).",
+    )
+    parser.add_argument(
+        "--preload",
+        nargs="*",
+        default=[ANALYSIS_TYPE_WORDS],
+        choices=[ANALYSIS_TYPE_WORDS, ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_ALL],
+        help=f"Analysis types whose pipelines are loaded at startup (default: {ANALYSIS_TYPE_WORDS}).",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Enable debug logging for troubleshooting.",
+    )
+    return parser.parse_args(argv)
+
+
+class AnalysisServer(socketserver.UnixStreamServer):
+    """
+    Serves analysis requests sequentially: printed output is captured from the process-wide stdout,
+    and spaCy pipelines are not meant to be shared between threads.
+    """
+
+    def __init__(self, socket_path: Path) -> None:
+        self.socket_path = socket_path
+        # Controllers, and so result caches, per cache configuration of the requests
+        self._controllers: dict[tuple, KratioController] = {}
+        old_umask = os.umask(0o077)  # Only the current user may connect
+        try:
+            super().__init__(str(socket_path), AnalysisRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def get_controller(self, args: argparse.Namespace) -> KratioController:
+        """
+        Returns the controller for the cache settings of a request, creating it on first use.
+        """
+        key = (args.no_cache, args.cache_dir, args.cache_max_size, args.parse_cache, args.parse_cache_max_size)
+        if key not in self._controllers:
+            cache = None if args.no_cache else ResultCache(args.cache_dir, args.cache_max_size * 1024 * 1024)
+            doc_cache = DocCache(args.cache_dir, args.parse_cache_max_size * 1024 * 1024) if args.parse_cache else None
+            self._controllers[key] = KratioController(serializer=Serializer(), cache=cache, doc_cache=doc_cache)
+        return self._controllers[key]
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.socket_path.unlink(missing_ok=True)
+
+
+class AnalysisRequestHandler(socketserver.StreamRequestHandler):
+    """
+    Handles one request: the arguments of KratioController.run_analysis in, its output and exit code out.
+    """
+
+    server: AnalysisServer
+
+    def handle(self) -> None:
+        try:
+            request = receive_message(self.request)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Ignoring malformed request: {e}")
+            return
+        args = argparse.Namespace(**request["args"])
+        send_message(self.request, run_request(self.server.get_controller(args), args))
+
+
+def run_request(controller: KratioController, args: argparse.Namespace) -> dict:
+    """
+    Runs one analysis and captures everything the CLI would have shown.
+
+    Returns:
+        dict: The printed output ("stdout"), the log messages ("log"), the top results of every analyzed
+            source ("results") and the exit code ("exit_code"), which matches the CLI's.
+    """
+    stdout = io.StringIO()
+    log = io.StringIO()
+    sink_id = None if args.silent else logger.add(log, level="DEBUG" if args.debug else "INFO", format=_LOG_FORMAT)
+    controller.collected_results = []
+    metrics.reset()  # Metrics describe this run only
+    exit_code = 0
+    try:
+        with contextlib.redirect_stdout(stdout):
+            controller.run_analysis(args)
+    except FileReadError as e:
+        logger.error(f"Error reading file: {e}")
+        exit_code = 1
+    except FileProcessingError as e:
+        logger.error(f"Error processing file: {e}")
+        exit_code = 2
+    except OutputDirectoryError as e:
+        logger.error(f"Output directory error: {e}")
+        exit_code = 3
+    except Exception:
+        logger.exception("An unexpected error occurred:")
+        exit_code = 99
+    finally:
+        if sink_id is not None:
+            logger.remove(sink_id)
+        results, controller.collected_results = controller.collected_results, None
+    return {"stdout": stdout.getvalue(), "log": log.getvalue(), "results": results, "exit_code": exit_code}
+
+
+def _remove_stale_socket(socket_path: Path) -> None:
+    """
+    Removes a socket file left behind by a server that is no longer running.
+    Raises OSError if a server is still listening on it.
+    """
+    if not socket_path.exists():
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+        except OSError:
+            socket_path.unlink()
+            return
+    raise OSError(f"A Kratio server is already listening on {socket_path}.")
+
+
+def _stop_on_sigterm(signum: int, frame: object) -> None:
+    raise KeyboardInterrupt
+
+
+def serve_main(argv: list[str]) -> None:
+    """
+    Entry point of `kratio serve`: preloads the requested pipelines and serves requests until interrupted.
+    """
+    args = parse_serve_arguments(argv)
+    setup_logging(level="DEBUG" if args.debug else "INFO")
+    socket_path = Path(args.socket) if args.socket else default_socket_path()
+    try:
+        _remove_stale_socket(socket_path)
+    except OSError as e:
+        logger.error(str(e))
+        sys.exit(4)
+
+    for analysis_type in args.preload:
+        logger.info(f"Loading the {analysis_type} pipeline...")
+        get_combined_analyzer(analysis_type)
+
+    # Shut down cleanly, removing the socket, when stopped by a service manager too
+    signal.signal(signal.SIGTERM, _stop_on_sigterm)
+    with AnalysisServer(socket_path) as server:
+        logger.info(f"Kratio server listening on {socket_path}. Press Ctrl+C to stop.")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            logger.info("Kratio server stopped.")
@@ -1,9 +1,85 @@
 # Constants for analysis types
 ANALYSIS_TYPE_WORDS = "words"
 ANALYSIS_TYPE_NOUN_CHUNKS = "noun_chunks"
+# Runs every analysis type over a single parse of each document
+ANALYSIS_TYPE_ALL = "all"
+
+# Counting engines: the spaCy pipeline, or the spaCy-free regex tokenizer with lookup lemmas (words only)
+ENGINE_SPACY = "spacy"
+ENGINE_FAST = "fast"
 
 # Supported file extensions for analysis
 SUPPORTED_EXTENSIONS = [".txt", ".md", ".py", ".html", ".js"]
 
 # Logging configuration
 LOGS_DIR = "logs"
+
+# Number of documents spaCy processes per nlp.pipe batch in directory runs
+DEFAULT_BATCH_SIZE = 64
+
+# Maximum number of characters handed to spaCy in one document. Larger files are split into
+# paragraph- or sentence-aligned chunks; must stay below spaCy's max_length (1,000,000).
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Persistent result cache: environment variable overriding its location, and default size limit
+CACHE_DIR_ENV_VAR = "KRATIO_CACHE_DIR"
+DEFAULT_CACHE_MAX_MB = 512
+
+# Opt-in parse cache of serialized spaCy Docs, which are much larger than term counts
+DEFAULT_PARSE_CACHE_MAX_MB = 2048
+
+# Environment variable overriding the Unix socket of the analysis server (kratio serve)
+SERVER_SOCKET_ENV_VAR = "KRATIO_SOCKET"
+
+# Directories never descended into when scanning a directory (unless --no-ignore is set), besides
+# virtual environments, which are recognized by their pyvenv.cfg
+DEFAULT_IGNORED_DIRECTORIES = frozenset(
+    {
+        ".git",
+        ".hg",
+        ".svn",
+        ".tox",
+        ".nox",
+        ".venv",
+        "venv",
+        "node_modules",
+        "__pycache__",
+        ".mypy_cache",
+        ".pytest_cache",
+        ".ruff_cache",
+        ".ipynb_checkpoints",
+    },
+)
+
+# Files holding ignore patterns in the .gitignore syntax, honored in every scanned directory
+IGNORE_FILES = (".gitignore", ".kratioignore")
+
+# Number of threads listing directories in parallel when scanning a directory
+DEFAULT_SCAN_THREADS = 8
+
+# Pipelined directory runs: threads reading files ahead of the analysis, number of files read ahead, and
+# number of results waiting to be displayed and serialized by the writer thread
+DEFAULT_READ_THREADS = 4
+DEFAULT_PREFETCH_FILES = 16
+DEFAULT_WRITE_QUEUE = 16
+
+# Handling of bytes that are not valid UTF-8: fail the file, substitute U+FFFD, or drop them
+DECODE_ERRORS_STRICT = "strict"
+DECODE_ERRORS_REPLACE = "replace"
+DECODE_ERRORS_SKIP = "skip"
+DEFAULT_DECODE_ERRORS = DECODE_ERRORS_STRICT
+
+# Watch mode: quiet period after the last change to a file before it is analyzed, and number of threads
+# analyzing changed files
+DEFAULT_WATCH_DEBOUNCE_SECONDS = 0.2
+DEFAULT_WATCH_WORKERS = 2
+
+# Watch mode: seconds between two polls of the watched path when polling for changes
+DEFAULT_WATCH_POLL_INTERVAL_SECONDS = 1.0
+
+# Watch mode with --aggregate: minimum seconds between two writes of the corpus results to --output
+DEFAULT_SNAPSHOT_INTERVAL_SECONDS = 10.0
+
+# Watch mode: number of strings the spaCy vocabulary may gain before the model is reloaded, which is the only
+# way to shrink it (0 for no limit)
+DEFAULT_MAX_VOCAB_GROWTH = 200_000
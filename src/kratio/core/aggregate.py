@@ -0,0 +1,78 @@
+"""
+Corpus-level aggregation of per-file term counts.
+Counts are merged as files complete, so memory grows with the vocabulary, not with the number of files.
+In watch mode, the counts of a changed file are removed and its new counts added, so the corpus results
+stay current without counting the other files again.
+"""
+
+from collections import Counter
+from collections.abc import Iterable
+
+import pandas as pd
+
+from kratio.core.analyzer import get_analyzer_class
+
+
+def _subtract(totals: Counter[str], counts: Iterable[tuple[str, int]]) -> None:
+    # Unlike Counter's -=, only visits the subtracted terms rather than the whole vocabulary of the corpus
+    for term, count in counts:
+        remaining = totals[term] - count
+        if remaining > 0:
+            totals[term] = remaining
+        else:
+            totals.pop(term, None)
+
+
+class CorpusCounts:
+    """
+    Streaming, mergeable term counts of a corpus: total frequency and document frequency per analysis type.
+    """
+
+    def __init__(self) -> None:
+        self.documents = 0
+        self.term_counts: dict[str, Counter[str]] = {}
+        self.document_frequencies: dict[str, Counter[str]] = {}
+
+    def add(self, counts: dict[str, Counter[str]]) -> None:
+        """
+        Merges the term counts of one document, keyed by analysis type.
+        """
+        self.documents += 1
+        for analysis_type, type_counts in counts.items():
+            self.term_counts.setdefault(analysis_type, Counter()).update(type_counts)
+            self.document_frequencies.setdefault(analysis_type, Counter()).update(type_counts.keys())
+
+    def remove(self, counts: dict[str, Counter[str]]) -> None:
+        """
+        Takes back the term counts of one document previously merged with add, e.g. before adding the
+        counts of its new version. Terms no longer occurring in the corpus are dropped.
+        """
+        self.documents -= 1
+        for analysis_type, type_counts in counts.items():
+            _subtract(self.term_counts[analysis_type], type_counts.items())
+            _subtract(self.document_frequencies[analysis_type], ((term, 1) for term in type_counts))
+
+    def to_dataframes(self, top_n: int | None = None) -> dict[str, pd.DataFrame]:
+        """
+        Builds the corpus result DataFrames: frequency and density over the whole corpus, plus the number
+        of documents each term occurs in.
+
+        Args:
+            top_n (int | None): When given, only the top_n most frequent terms of each type are kept.
+
+        Returns:
+            dict[str, pandas.DataFrame]: DataFrames keyed by analysis type, with a "<prefix>DocumentFrequency"
+                column next to the usual frequency and density columns.
+        """
+        results = {}
+        for analysis_type, type_counts in self.term_counts.items():
+            analyzer_class = get_analyzer_class(analysis_type)
+            df = analyzer_class.to_dataframe(type_counts, top_n)
+            document_frequency = self.document_frequencies[analysis_type]
+            df[f"{analyzer_class.column_prefix}DocumentFrequency"] = pd.Series(
+                [document_frequency[term] for term in df.index],
+                index=df.index,
+                dtype=int,
+            )
+            results[analysis_type] = df
+        return results
@@ -1,6 +1,83 @@
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from typing import TYPE_CHECKING
+
 import pandas as pd
 
-from kratio.core.analyzers import NounChunkAnalyzer, WordAnalyzer
+from kratio.constants import ANALYSIS_TYPE_ALL, ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS, DEFAULT_BATCH_SIZE
+from kratio.core.analyzer_interface import Analyzer
+from kratio.core.analyzers import CombinedAnalyzer, NounChunkAnalyzer, WordAnalyzer, merge_counts
+from kratio.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+# Analyzers by analysis type. Every registered analyzer takes part in the ANALYSIS_TYPE_ALL pass,
+# so new metrics only need to be added here to share the single parse of each document.
+ANALYZERS: dict[str, type[Analyzer]] = {
+    ANALYSIS_TYPE_WORDS: WordAnalyzer,
+    ANALYSIS_TYPE_NOUN_CHUNKS: NounChunkAnalyzer,
+}
+
+
+def get_analysis_types(analysis_type: str) -> list[str]:
+    """
+    Expands an analysis type into the registered analysis types it covers.
+
+    Args:
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+
+    Returns:
+        list[str]: The analysis types to run.
+    """
+    return list(ANALYZERS) if analysis_type == ANALYSIS_TYPE_ALL else [analysis_type]
+
+
+def get_analyzer_class(analysis_type: str) -> type[Analyzer]:
+    """
+    Returns the analyzer class registered for the given analysis type.
+
+    Args:
+        analysis_type (str): The type of analysis ('words' or 'noun_chunks').
+
+    Returns:
+        type[Analyzer]: The analyzer class.
+    """
+    return ANALYZERS[analysis_type]
+
+
+def get_combined_analyzer(analysis_type: str, parse_all: bool = False) -> CombinedAnalyzer:
+    """
+    Creates an analyzer that derives every result of the requested analysis type from one parse.
+
+    Args:
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+        parse_all (bool): Whether to parse with the components of every registered analyzer rather than
+            only those the requested type needs, so the parsed Docs can be reused for any analysis type.
+
+    Returns:
+        CombinedAnalyzer: The combined analyzer.
+    """
+    nlp = CombinedAnalyzer(ANALYZERS).nlp if parse_all else None
+    return CombinedAnalyzer({t: get_analyzer_class(t) for t in get_analysis_types(analysis_type)}, nlp)
+
+
+def counts_to_dataframes(counts: dict[str, Counter[str]], top_n: int | None = None) -> dict[str, pd.DataFrame]:
+    """
+    Normalizes term counts keyed by analysis type into their result DataFrames.
+
+    Args:
+        counts (dict[str, Counter[str]]): Term counts keyed by analysis type.
+        top_n (int | None): When given, only the top_n most frequent terms of each type are kept.
+
+    Returns:
+        dict[str, pandas.DataFrame]: Frequency and density DataFrames keyed by analysis type.
+    """
+    return {
+        analysis_type: get_analyzer_class(analysis_type).to_dataframe(type_counts, top_n)
+        for analysis_type, type_counts in counts.items()
+    }
 
 
 def analyze_text_words(text: str) -> pd.DataFrame:
@@ -29,3 +106,120 @@ def analyze_text_noun_chunks(text: str) -> pd.DataFrame:
     """
     analyzer = NounChunkAnalyzer()
     return analyzer.analyze(text)
+
+
+def _tag_chunks[T](chunked_texts: Iterable[tuple[T, Iterable[str]]]) -> Iterator[tuple[str, tuple[T, bool]]]:
+    """
+    Flattens the chunks of several texts into (chunk, (context, is_last_chunk)) pairs for nlp.pipe.
+    A text without any chunk is represented by a single empty chunk so it still gets a result.
+    """
+    for context, chunks in chunked_texts:
+        iterator = iter(chunks)
+        current = next(iterator, "")
+        for following in iterator:
+            yield current, (context, False)
+            current = following
+        yield current, (context, True)
+
+
+def parse_chunked_texts[T](
+    chunked_texts: Iterable[tuple[T, Iterable[str]]],
+    nlp: "Language",
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[T, list["Doc"]]]:
+    """
+    Parses a stream of texts, each given as a sequence of chunks, into one Doc per chunk.
+
+    Args:
+        chunked_texts (Iterable[tuple[T, Iterable[str]]]): Pairs of (context, chunks), e.g. (file path,
+            chunks of the file content).
+        nlp (Language): The pipeline to parse with.
+        batch_size (int): The number of chunks spaCy processes per batch.
+
+    Yields:
+        tuple[T, list[Doc]]: The context of each text and the Docs of its chunks, in input order.
+    """
+    docs: list[Doc] = []
+    parsed = nlp.pipe(_tag_chunks(chunked_texts), as_tuples=True, batch_size=batch_size)
+    for doc, (context, is_last) in metrics.time_items("spaCy pipeline", parsed):
+        docs.append(doc)
+        if is_last:
+            yield context, docs
+            docs = []
+
+
+def count_chunked_texts[T](
+    chunked_texts: Iterable[tuple[T, Iterable[str]]],
+    analysis_type: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[T, dict[str, Counter[str]]]]:
+    """
+    Counts the terms of a stream of texts, each given as a sequence of chunks, parsing each chunk once.
+
+    Chunks are streamed through nlp.pipe and their counts are merged per text as they complete,
+    so memory is bounded by the batch size and the chunk size rather than by the size of a text.
+
+    Args:
+        chunked_texts (Iterable[tuple[T, Iterable[str]]]): Pairs of (context, chunks), e.g. (file path,
+            chunks of the file content).
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+        batch_size (int): The number of chunks spaCy processes per batch.
+
+    Yields:
+        tuple[T, dict[str, Counter[str]]]: The context of each text and its term counts keyed by
+            analysis type, in input order.
+    """
+    analyzer = get_combined_analyzer(analysis_type)
+    totals: dict[str, Counter[str]] = {}
+    parsed = analyzer.nlp.pipe(_tag_chunks(chunked_texts), as_tuples=True, batch_size=batch_size)
+    for doc, (context, is_last) in metrics.time_items("spaCy pipeline", parsed):
+        merge_counts(totals, analyzer.count_doc(doc))
+        if is_last:
+            yield context, totals
+            totals = {}
+
+
+def analyze_chunked_texts[T](
+    chunked_texts: Iterable[tuple[T, Iterable[str]]],
+    analysis_type: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[T, dict[str, pd.DataFrame]]]:
+    """
+    Analyzes a stream of texts, each given as a sequence of chunks, parsing each chunk once.
+    A text made of a single chunk gives the same result as analyzing it on its own.
+
+    Args:
+        chunked_texts (Iterable[tuple[T, Iterable[str]]]): Pairs of (context, chunks), e.g. (file path,
+            chunks of the file content).
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+        batch_size (int): The number of chunks spaCy processes per batch.
+
+    Yields:
+        tuple[T, dict[str, pandas.DataFrame]]: The context of each text and its DataFrames keyed by
+            analysis type, in input order.
+    """
+    for context, counts in count_chunked_texts(chunked_texts, analysis_type, batch_size):
+        yield context, counts_to_dataframes(counts)
+
+
+def analyze_texts[T](
+    texts: Iterable[tuple[str, T]],
+    analysis_type: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple[T, dict[str, pd.DataFrame]]]:
+    """
+    Analyzes a stream of texts in batches with nlp.pipe, parsing each text once.
+
+    Texts are consumed lazily, so only about one batch is held in memory at a time.
+    Results are identical to analyzing each text on its own.
+
+    Args:
+        texts (Iterable[tuple[str, T]]): Pairs of (text, context), e.g. (file content, file path).
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+        batch_size (int): The number of texts spaCy processes per batch.
+
+    Yields:
+        tuple[T, dict[str, pandas.DataFrame]]: The context of each text and its DataFrames keyed by
+            analysis type, in input order.
+    """
+    return analyze_chunked_texts(((context, [text]) for text, context in texts), analysis_type, batch_size)
@@ -1,9 +1,40 @@
 from abc import ABC, abstractmethod
+from collections import Counter
+from typing import TYPE_CHECKING
 
 import pandas as pd
 
+from kratio.utils.data_utils import normalize_to_dataframe
+
+if TYPE_CHECKING:
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
 
 class Analyzer(ABC):
+    # spaCy pipeline components the analyzer relies on; None means the full pipeline
+    required_components: tuple[str, ...] | None = None
+    # Naming of the result DataFrame, see normalize_to_dataframe
+    index_name: str
+    column_prefix: str
+    nlp: "Language"
+
     @abstractmethod
     def analyze(self, text: str) -> pd.DataFrame:
         pass  # pragma: no cover
+
+    @abstractmethod
+    def count_doc(self, doc: "Doc") -> Counter[str]:
+        pass  # pragma: no cover
+
+    def analyze_doc(self, doc: "Doc") -> pd.DataFrame:
+        return self.to_dataframe(self.count_doc(doc))
+
+    @classmethod
+    def to_dataframe(cls, counts: Counter[str], top_n: int | None = None) -> pd.DataFrame:
+        """
+        Normalizes term counts into the analyzer's frequency and density DataFrame.
+        With top_n, only the most frequent terms are selected (a heap rather than a full sort) and kept.
+        """
+        selected = counts if top_n is None else dict(counts.most_common(top_n))
+        return normalize_to_dataframe(pd.Series(selected, dtype=int), counts.total(), cls.index_name, cls.column_prefix)
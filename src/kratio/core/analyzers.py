@@ -1,36 +1,132 @@
+from collections import Counter
+from typing import TYPE_CHECKING
+
+import numpy as np
 import pandas as pd
 
 from kratio.core.analyzer_interface import Analyzer
-from kratio.core.spacy_loader import SpacyModelLoader
-from kratio.utils.data_utils import normalize_to_dataframe
+from kratio.utils.metrics import metrics
 from kratio.utils.timing import timed
 
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from spacy.language import Language
+    from spacy.tokens import Doc
+
+
+def _load_pipeline(components: tuple[str, ...] | None) -> "Language":
+    """
+    Loads a spaCy pipeline profile. spaCy is imported on first use, so the spaCy-free fast engine never pays for it.
+    """
+    from kratio.core.spacy_loader import SpacyModelLoader
+
+    return SpacyModelLoader.get_nlp(components)
+
 
 class WordAnalyzer(Analyzer):
-    def __init__(self) -> None:
-        self.nlp = SpacyModelLoader.get_nlp()
+    # Lemmas come from the rule-based lemmatizer, which needs the POS tags set by tagger and attribute_ruler
+    required_components = ("tok2vec", "tagger", "attribute_ruler", "lemmatizer")
+    index_name = "Keyword"
+    column_prefix = "Word"
+
+    def __init__(self, nlp: "Language | None" = None) -> None:
+        self.nlp = nlp if nlp is not None else _load_pipeline(self.required_components)
 
     @timed("analyzing words")
     def analyze(self, text: str) -> pd.DataFrame:
-        doc = self.nlp(text)
-        words = [
-            token.lemma_.lower() for token in doc if not token.is_stop and not token.is_punct and token.lemma_.strip()
-        ]
-        word_counts = pd.Series(words).value_counts()
-        return normalize_to_dataframe(word_counts, len(words), "Keyword", "Word")
+        return self.analyze_doc(self.nlp(text))
+
+    def count_doc(self, doc: "Doc") -> Counter[str]:
+        from spacy.attrs import IS_PUNCT, IS_STOP, LEMMA
+
+        # Filters and counts the lemma hashes of all tokens with NumPy; strings are only resolved for
+        # the distinct lemmas left, instead of creating Python objects for every token
+        rows = doc.to_array([LEMMA, IS_STOP, IS_PUNCT])
+        kept = (rows[:, 1] == 0) & (rows[:, 2] == 0)
+        lemma_hashes, frequencies = np.unique(rows[kept, 0], return_counts=True)
+        counts: Counter[str] = Counter()
+        for lemma_hash, frequency in zip(lemma_hashes.tolist(), frequencies.tolist(), strict=True):
+            lemma = doc.vocab.strings[lemma_hash]
+            if lemma.strip():
+                counts[lemma.lower()] += frequency
+        return counts
 
 
 class NounChunkAnalyzer(Analyzer):
-    def __init__(self) -> None:
-        self.nlp = SpacyModelLoader.get_nlp()
+    # Noun chunks are derived from the dependency parse; named entities are never used
+    required_components = ("tok2vec", "tagger", "parser", "attribute_ruler", "lemmatizer")
+    index_name = "Noun Chunk"
+    column_prefix = "NounChunk"
+
+    def __init__(self, nlp: "Language | None" = None) -> None:
+        self.nlp = nlp if nlp is not None else _load_pipeline(self.required_components)
 
     @timed("analyzing noun chunks")
     def analyze(self, text: str) -> pd.DataFrame:
-        doc = self.nlp(text)
-        noun_chunks = [
+        return self.analyze_doc(self.nlp(text))
+
+    def count_doc(self, doc: "Doc") -> Counter[str]:
+        return Counter(
             chunk.text.lower()
             for chunk in doc.noun_chunks
             if not chunk.root.is_stop and not chunk.root.is_punct and chunk.text.strip()
-        ]
-        noun_counts = pd.Series(noun_chunks).value_counts()
-        return normalize_to_dataframe(noun_counts, len(noun_chunks), "Noun Chunk", "NounChunk")
+        )
+
+
+class CombinedAnalyzer:
+    """
+    Runs several analyzers over a single parse of each document.
+    The pipeline profile is the union of the components every analyzer requires.
+    """
+
+    def __init__(self, analyzer_classes: dict[str, type[Analyzer]], nlp: "Language | None" = None) -> None:
+        """
+        Args:
+            analyzer_classes (dict[str, type[Analyzer]]): Analyzer classes keyed by analysis type.
+            nlp (Language | None): The pipeline to use; loaded from SpacyModelLoader when None.
+        """
+        self.required_components = _union_components(analyzer_classes.values())
+        self.nlp = nlp if nlp is not None else _load_pipeline(self.required_components)
+        self.analyzers = {analysis_type: cls(self.nlp) for analysis_type, cls in analyzer_classes.items()}
+
+    @timed("analyzing text")
+    def analyze(self, text: str) -> dict[str, pd.DataFrame]:
+        return self.analyze_doc(self.nlp(text))
+
+    def count_doc(self, doc: "Doc") -> dict[str, Counter[str]]:
+        metrics.increment("tokens", len(doc))
+        with metrics.time("counting terms"):
+            return {analysis_type: analyzer.count_doc(doc) for analysis_type, analyzer in self.analyzers.items()}
+
+    def count_docs(self, docs: "Iterable[Doc]") -> dict[str, Counter[str]]:
+        """
+        Counts several documents, e.g. the chunks of one large file, into a single set of totals.
+        """
+        totals: dict[str, Counter[str]] = {analysis_type: Counter() for analysis_type in self.analyzers}
+        for doc in docs:
+            merge_counts(totals, self.count_doc(doc))
+        return totals
+
+    def analyze_doc(self, doc: "Doc") -> dict[str, pd.DataFrame]:
+        return {analysis_type: analyzer.analyze_doc(doc) for analysis_type, analyzer in self.analyzers.items()}
+
+
+def merge_counts(totals: dict[str, Counter[str]], counts: dict[str, Counter[str]]) -> None:
+    """
+    Adds term counts keyed by analysis type into running totals, in place.
+    """
+    for analysis_type, type_counts in counts.items():
+        totals.setdefault(analysis_type, Counter()).update(type_counts)
+
+
+def _union_components(analyzer_classes: "Iterable[type[Analyzer]]") -> tuple[str, ...] | None:
+    """
+    Merges the required components of several analyzers; None if any of them needs the full pipeline.
+    """
+    components: set[str] = set()
+    for cls in analyzer_classes:
+        if cls.required_components is None:
+            return None
+        components.update(cls.required_components)
+    return tuple(sorted(components))
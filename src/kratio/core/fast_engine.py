@@ -0,0 +1,154 @@
+"""
+spaCy-free word counting for plain keyword density.
+Tokens come from a compiled regular expression, stop words from spaCy's English stop-word list
+(read from its source file, without importing spaCy) and lemmas from a lookup table.
+Results have the same shape as WordAnalyzer's.
+"""
+
+import gzip
+import importlib.metadata
+import json
+import re
+import runpy
+from collections import Counter
+from collections.abc import Iterable
+from functools import cache
+from importlib.util import find_spec
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from kratio.constants import ANALYSIS_TYPE_WORDS
+from kratio.core.analyzer_interface import Analyzer
+from kratio.exceptions import FileReadError
+from kratio.io.file_handler import hash_file
+from kratio.utils.metrics import metrics
+from kratio.utils.timing import timed
+
+# Word tokens, with English contractions split off the way spaCy's tokenizer does ("don't" -> "do", "n't")
+_TOKEN_PATTERN = re.compile(r"\w+?(?=n['’]t\b)|n['’]t\b|['‘’](?:s|d|ll|m|re|ve)\b|\w+", re.IGNORECASE)
+
+# Lemma lookup table shipped by the optional spacy-lookups-data package
+_LOOKUPS_PACKAGE = "spacy_lookups_data"
+_LOOKUPS_TABLE = "en_lemma_lookup.json"
+
+
+def _package_dir(name: str) -> Path | None:
+    """
+    Locates an installed package without importing it.
+    """
+    spec = find_spec(name)
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return Path(next(iter(spec.submodule_search_locations)))
+
+
+@cache
+def load_stop_words() -> frozenset[str]:
+    """
+    Loads spaCy's English stop words by running its stop_words.py on its own, so the spaCy package
+    and its dependencies are never imported.
+
+    Returns:
+        frozenset[str]: The lowercase stop words, including the contraction suffixes.
+    """
+    spacy_dir = _package_dir("spacy")
+    if spacy_dir is None:
+        raise FileReadError("spaCy is not installed; its stop-word list is required by the fast engine.")
+    return frozenset(runpy.run_path(str(spacy_dir / "lang" / "en" / "stop_words.py"))["STOP_WORDS"])
+
+
+def _read_json_table(path: Path) -> dict[str, str]:
+    try:
+        if path.suffix == ".gz":
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                return json.load(f)
+        with path.open(encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise FileReadError(f"Could not read lemma table {path}: {e}") from e
+
+
+def load_lemma_table(path: Path | str | None = None) -> tuple[dict[str, str], str]:
+    """
+    Loads a lemma lookup table mapping word forms to lemmas.
+
+    Args:
+        path (Path | str | None): A JSON file with a {form: lemma} object. When None, the English table of
+            spacy-lookups-data is used if that package is installed; otherwise words are not lemmatized.
+
+    Returns:
+        tuple[dict[str, str], str]: The table and an identifier of its source and version, for cache keys.
+    """
+    if path is not None:
+        return _read_json_table(Path(path)), f"table-{hash_file(path)}"
+
+    lookups_dir = _package_dir(_LOOKUPS_PACKAGE)
+    if lookups_dir is not None:
+        for table_path in (lookups_dir / "data" / _LOOKUPS_TABLE, lookups_dir / "data" / f"{_LOOKUPS_TABLE}.gz"):
+            if table_path.is_file():
+                version = importlib.metadata.version(_LOOKUPS_PACKAGE.replace("_", "-"))
+                return _read_json_table(table_path), f"lookups-{version}"
+
+    logger.warning(
+        "No lemma lookup table found; the fast engine counts lowercase word forms. "
+        "Install spacy-lookups-data or pass --lemma-table to lemmatize.",
+    )
+    return {}, "no-lemmas"
+
+
+class FastWordAnalyzer(Analyzer):
+    """
+    Counts keywords like WordAnalyzer without a spaCy pipeline. Documents are plain strings.
+    """
+
+    # No spaCy pipeline is used
+    required_components = ()
+    index_name = "Keyword"
+    column_prefix = "Word"
+
+    def __init__(self, lemma_table: Path | str | None = None) -> None:
+        """
+        Args:
+            lemma_table (Path | str | None): JSON lemma lookup table, see load_lemma_table.
+        """
+        self.stop_words = load_stop_words()
+        self.lemmas, self.lemma_source = load_lemma_table(lemma_table)
+
+    @timed("analyzing words (fast engine)")
+    def analyze(self, text: str) -> pd.DataFrame:
+        return self.analyze_doc(text)
+
+    def count_doc(self, doc: str) -> Counter[str]:
+        # Every distinct form is filtered and lemmatized once, like spaCy's lookup lemmatizer (keyed by the
+        # exact form). Tokens are made of word characters only, so none of them is punctuation.
+        with metrics.time("tokenizing"):
+            forms = _TOKEN_PATTERN.findall(doc)
+        metrics.increment("tokens", len(forms))
+        counts: Counter[str] = Counter()
+        with metrics.time("counting terms"):
+            for form, frequency in Counter(forms).items():
+                if form.lower() in self.stop_words:
+                    continue
+                lemma = self.lemmas.get(form, form)
+                if lemma.strip():
+                    counts[lemma.lower()] += frequency
+        return counts
+
+    def count_texts(self, texts: Iterable[str]) -> dict[str, Counter[str]]:
+        """
+        Counts several texts, e.g. the chunks of one large file, into word totals keyed by analysis type,
+        like CombinedAnalyzer.count_docs.
+        """
+        totals: Counter[str] = Counter()
+        for text in texts:
+            totals.update(self.count_doc(text))
+        return {ANALYSIS_TYPE_WORDS: totals}
+
+    def fingerprint(self) -> str:
+        """
+        Identifies the stop-word list and lemma table, used to invalidate cached results when they change.
+        """
+        spacy_version = importlib.metadata.version("spacy")
+        return f"fast-spacy{spacy_version}-{self.lemma_source}"
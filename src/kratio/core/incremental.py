@@ -0,0 +1,72 @@
+"""
+Incremental re-counting of edited texts for watch mode.
+Counts are kept per paragraph, so after an edit only new or changed paragraphs are run through the
+pipeline and the totals are updated by subtracting removed paragraphs and adding new ones.
+"""
+
+import hashlib
+from collections import Counter
+from collections.abc import Callable
+
+
+def _digest(paragraph: str) -> bytes:
+    return hashlib.blake2b(paragraph.encode("utf-8"), digest_size=16).digest()
+
+
+def _scaled(counts: Counter[str], factor: int) -> Counter[str]:
+    return counts if factor == 1 else Counter({term: count * factor for term, count in counts.items()})
+
+
+class IncrementalCounts:
+    """
+    Term counts of one text, kept per paragraph hash. Paragraphs that occur several times are counted once.
+    """
+
+    def __init__(
+        self,
+        analysis_types: list[str],
+        count_paragraphs: Callable[[list[str]], list[dict[str, Counter[str]]]],
+    ) -> None:
+        """
+        Args:
+            analysis_types (list[str]): The analysis types counted.
+            count_paragraphs (Callable[[list[str]], list[dict[str, Counter[str]]]]): Counts a batch of
+                paragraphs, returning the term counts of each paragraph keyed by analysis type.
+        """
+        self.count_paragraphs = count_paragraphs
+        # Totals of the current text, keyed by analysis type
+        self.totals: dict[str, Counter[str]] = {analysis_type: Counter() for analysis_type in analysis_types}
+        # How often each paragraph occurs in the current text, and its counts
+        self._occurrences: Counter[bytes] = Counter()
+        self._paragraph_counts: dict[bytes, dict[str, Counter[str]]] = {}
+
+    def update(self, paragraphs: list[str]) -> int:
+        """
+        Replaces the text with a new version, counting only the paragraphs not seen in the previous one.
+
+        Args:
+            paragraphs (list[str]): The paragraphs of the new version.
+
+        Returns:
+            int: The number of paragraphs that had to be counted.
+        """
+        digests = [_digest(paragraph) for paragraph in paragraphs]
+        by_digest = dict(zip(digests, paragraphs, strict=True))
+        occurrences = Counter(digests)
+
+        new = [digest for digest in by_digest if digest not in self._paragraph_counts]
+        if new:
+            counted = self.count_paragraphs([by_digest[digest] for digest in new])
+            self._paragraph_counts.update(zip(new, counted, strict=True))
+
+        for digest, times in (self._occurrences - occurrences).items():
+            for analysis_type, counts in self._paragraph_counts[digest].items():
+                self.totals[analysis_type] -= _scaled(counts, times)
+        for digest, times in (occurrences - self._occurrences).items():
+            for analysis_type, counts in self._paragraph_counts[digest].items():
+                self.totals[analysis_type].update(_scaled(counts, times))
+
+        for digest in self._occurrences.keys() - occurrences.keys():
+            del self._paragraph_counts[digest]
+        self._occurrences = occurrences
+        return len(new)
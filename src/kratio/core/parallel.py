@@ -0,0 +1,132 @@
+"""
+Multi-process directory analysis.
+Each worker process loads the spaCy model (or the fast engine's tables) once and returns compact
+term counts to the parent.
+"""
+
+from collections import Counter
+from collections.abc import Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+
+from kratio.constants import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_DECODE_ERRORS,
+    ENGINE_FAST,
+    ENGINE_SPACY,
+)
+from kratio.core.analyzer import get_combined_analyzer
+from kratio.core.analyzers import CombinedAnalyzer
+from kratio.core.fast_engine import FastWordAnalyzer
+from kratio.exceptions import FileProcessingError, FileReadError
+from kratio.io.file_handler import iter_text_chunks
+from kratio.utils.metrics import metrics
+
+# Analyzer of the current worker process and how it reads files, set once by _init_worker
+_worker_analyzer: CombinedAnalyzer | FastWordAnalyzer | None = None
+_worker_chunk_size = DEFAULT_CHUNK_SIZE
+_worker_batch_size = DEFAULT_BATCH_SIZE
+_worker_decode_errors = DEFAULT_DECODE_ERRORS
+
+
+def _init_worker(
+    analysis_type: str,
+    chunk_size: int,
+    batch_size: int,
+    engine: str = ENGINE_SPACY,
+    lemma_table: str | None = None,
+    decode_errors: str = DEFAULT_DECODE_ERRORS,
+) -> None:
+    """
+    Process pool initializer: warms up the analyzer and its spaCy model for the lifetime of the worker.
+    """
+    global _worker_analyzer, _worker_chunk_size, _worker_batch_size, _worker_decode_errors
+    _worker_analyzer = FastWordAnalyzer(lemma_table) if engine == ENGINE_FAST else get_combined_analyzer(analysis_type)
+    _worker_chunk_size = chunk_size
+    _worker_batch_size = batch_size
+    _worker_decode_errors = decode_errors
+
+
+def _count_file(file_path: Path) -> dict[str, Counter[str]]:
+    """
+    Reads and analyzes a single file inside a worker process, returning only its term counts
+    keyed by analysis type.
+    """
+    if _worker_analyzer is None:
+        raise RuntimeError("Worker process was not initialized.")
+    try:
+        chunks = iter_text_chunks(file_path, _worker_chunk_size, _worker_decode_errors)
+        if isinstance(_worker_analyzer, FastWordAnalyzer):
+            return _worker_analyzer.count_texts(chunks)
+        docs = metrics.time_items("spaCy pipeline", _worker_analyzer.nlp.pipe(chunks, batch_size=_worker_batch_size))
+        return _worker_analyzer.count_docs(docs)
+    except FileReadError as e:
+        raise FileProcessingError(f"Error reading file {file_path}: {e}") from e
+
+
+def _count_file_with_metrics(file_path: Path) -> tuple[dict[str, Counter[str]], dict]:
+    """
+    Counts a file inside a worker process, returning the worker's metrics recorded meanwhile as well.
+    """
+    with metrics.time("counting file in worker"):
+        counts = _count_file(file_path)
+    metrics.increment("bytes", _file_size(file_path))
+    return counts, metrics.drain()
+
+
+def _file_size(file_path: Path) -> int:
+    try:
+        return file_path.stat().st_size
+    except OSError:
+        return 0
+
+
+def count_files_parallel(
+    files: list[Path],
+    analysis_type: str,
+    workers: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    engine: str = ENGINE_SPACY,
+    lemma_table: str | None = None,
+    decode_errors: str = DEFAULT_DECODE_ERRORS,
+) -> Iterator[tuple[Path, dict[str, Counter[str]]]]:
+    """
+    Counts the terms of files across a pool of worker processes.
+
+    Files are scheduled largest first so a single huge file does not stall the end of the run,
+    while results are yielded in the original file order.
+
+    Args:
+        files (list[Path]): The files to analyze.
+        analysis_type (str): The requested analysis type ('words', 'noun_chunks' or 'all').
+        workers (int): The number of worker processes.
+        chunk_size (int): The maximum number of characters parsed as one document; larger files are chunked.
+        batch_size (int): The number of chunks a worker processes per nlp.pipe batch.
+        engine (str): The counting engine ('spacy' or 'fast').
+        lemma_table (str | None): The fast engine's lemma lookup table, see load_lemma_table.
+        decode_errors (str): How to handle bytes that are not valid UTF-8 ('strict', 'replace' or 'skip').
+
+    Yields:
+        tuple[Path, dict[str, Counter[str]]]: Each file and its term counts keyed by analysis type,
+            in input order.
+    """
+    schedule = sorted(range(len(files)), key=lambda i: _file_size(files[i]), reverse=True)
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(analysis_type, chunk_size, batch_size, engine, lemma_table, decode_errors),
+    ) as pool:
+        futures: dict[int, Future[tuple[dict[str, Counter[str]], dict]]] = {
+            i: pool.submit(_count_file_with_metrics, files[i]) for i in schedule
+        }
+        try:
+            for i, file_path in enumerate(files):
+                counts, worker_metrics = futures[i].result()
+                metrics.merge(worker_metrics)
+                yield file_path, counts
+        finally:
+            for future in futures.values():
+                future.cancel()
@@ -1,3 +1,5 @@
+from collections.abc import Iterable
+
 import spacy
 from loguru import logger
 from spacy.cli.download import download
@@ -6,23 +8,91 @@ from spacy.cli.download import download
 class SpacyModelLoader:
     _nlp = None
     _model_name = "en_core_web_sm"
+    # Pipelines restricted to a subset of components, keyed by the enabled component names
+    _profiles: dict[frozenset[str], spacy.language.Language] = {}
+    # Number of strings in the vocabularies of the loaded pipelines when they were loaded
+    _initial_vocabulary_size = 0
 
     @classmethod
-    def get_nlp(cls) -> spacy.language.Language:
-        if cls._nlp is None:
+    def _load(cls, **kwargs: Iterable[str]) -> spacy.language.Language:
+        """
+        Loads the spaCy model, downloading it first if it is not installed.
+        Keyword arguments are forwarded to spacy.load (e.g. enable, disable, exclude).
+        """
+        try:
+            return spacy.load(cls._model_name, **kwargs)
+        except OSError:
+            logger.info(f"spaCy model '{cls._model_name}' not found. Attempting to download...")
             try:
-                cls._nlp = spacy.load(cls._model_name)
-            except OSError:
-                logger.info(f"spaCy model '{cls._model_name}' not found. Attempting to download...")
-                try:
-                    download(cls._model_name)
-                    cls._nlp = spacy.load(cls._model_name)
-                    logger.info(f"Successfully downloaded and loaded spaCy model '{cls._model_name}'.")
-                except Exception:
-                    logger.exception(
-                        f"Failed to download or load spaCy model '{cls._model_name}'. "
-                        "Please ensure you have an active internet connection or run "
-                        f"'python -m spacy download {cls._model_name}' manually.",
-                    )
-                    exit(1)
-        return cls._nlp
+                download(cls._model_name)
+                nlp = spacy.load(cls._model_name, **kwargs)
+                logger.info(f"Successfully downloaded and loaded spaCy model '{cls._model_name}'.")
+                return nlp
+            except Exception:
+                logger.exception(
+                    f"Failed to download or load spaCy model '{cls._model_name}'. "
+                    "Please ensure you have an active internet connection or run "
+                    f"'python -m spacy download {cls._model_name}' manually.",
+                )
+                exit(1)
+
+    @classmethod
+    def get_nlp(cls, components: Iterable[str] | None = None) -> spacy.language.Language:
+        """
+        Returns a cached spaCy pipeline.
+
+        Args:
+            components (Iterable[str] | None): Names of the pipeline components the caller needs.
+                When given, a separate pipeline profile is built with every other component
+                disabled, so they are not run on each document. When None, the full pipeline
+                is returned.
+
+        Returns:
+            spacy.language.Language: The loaded spaCy pipeline.
+        """
+        if components is None:
+            if cls._nlp is None:
+                cls._nlp = cls._load()
+                cls._initial_vocabulary_size += len(cls._nlp.vocab.strings)
+            return cls._nlp
+
+        profile = frozenset(components)
+        if profile not in cls._profiles:
+            logger.debug(f"Loading spaCy pipeline profile with components: {sorted(profile)}")
+            cls._profiles[profile] = cls._load(enable=sorted(profile))
+            cls._initial_vocabulary_size += len(cls._profiles[profile].vocab.strings)
+        return cls._profiles[profile]
+
+    @classmethod
+    def vocabulary_size(cls) -> tuple[int, int] | None:
+        """
+        Returns the number of strings in the vocabularies of the loaded pipelines, which grows with every new
+        word parsed, and how many of them were added since the pipelines were loaded; None if none is loaded.
+        """
+        loaded = [nlp for nlp in (cls._nlp, *cls._profiles.values()) if nlp is not None]
+        if not loaded:
+            return None
+        size = sum(len(nlp.vocab.strings) for nlp in loaded)
+        return size, size - cls._initial_vocabulary_size
+
+    @classmethod
+    def unload(cls) -> None:
+        """
+        Drops the loaded pipelines, so the next get_nlp loads them again with the model's initial vocabulary.
+        Pipelines already handed out stay usable until their last reference is gone.
+        """
+        cls._nlp = None
+        cls._profiles = {}
+        cls._initial_vocabulary_size = 0
+
+    @classmethod
+    def get_model_fingerprint(cls) -> str:
+        """
+        Identifies the installed spaCy model and its version without loading it.
+        Used to invalidate cached results when the model changes.
+
+        Returns:
+            str: The model name, model package version and spaCy version, e.g. "en_core_web_sm-3.8.0-spacy3.8.7".
+        """
+        model_version = spacy.util.get_package_version(cls._model_name) or "unknown"
+        return f"{cls._model_name}-{model_version}-spacy{spacy.__version__}"
@@ -14,3 +14,9 @@ class OutputDirectoryError(Exception):
     """Custom exception for errors related to output directory validation."""
 
     pass
+
+
+class BinaryFileError(FileReadError):
+    """Custom exception for files that look binary rather than text."""
+
+    pass
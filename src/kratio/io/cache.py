@@ -0,0 +1,236 @@
+"""
+Persistent, content-addressed caches of analysis work.
+ResultCache stores the term counts of one file for one analysis type, so unchanged files skip
+reading, parsing and counting on later runs. DocCache stores parsed spaCy Docs, so a file can be
+analyzed again with other settings without running the pipeline.
+"""
+
+import hashlib
+import json
+import os
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from kratio.constants import CACHE_DIR_ENV_VAR, DEFAULT_CACHE_MAX_MB
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc
+    from spacy.vocab import Vocab
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the cache directory: $KRATIO_CACHE_DIR, else $XDG_CACHE_HOME/kratio, else ~/.cache/kratio.
+    """
+    if CACHE_DIR_ENV_VAR in os.environ:
+        return Path(os.environ[CACHE_DIR_ENV_VAR])
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    return (Path(cache_home) if cache_home else Path.home() / ".cache") / "kratio"
+
+
+class DiskCache:
+    """
+    Stores binary entries as files named by a key derived from the file content and everything
+    else the cached data depends on. Once the cache grows beyond its size limit, the least recently
+    used entries are evicted.
+    """
+
+    # Sub-directory of the cache directory and file suffix of the entries
+    subdir = "entries"
+    suffix = ".bin"
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+    ) -> None:
+        """
+        Args:
+            cache_dir (str | Path | None): Cache directory shared by all caches (defaults to default_cache_dir()).
+            max_bytes (int): Size limit of all entries together.
+        """
+        self.cache_dir = (Path(cache_dir) if cache_dir else default_cache_dir()) / self.subdir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Entry sizes in least- to most-recently-used order, loaded from disk on first use
+        self._index: OrderedDict[str, int] | None = None
+        self._size_bytes = 0
+
+    @staticmethod
+    def make_key(content_hash: str, *parts: str) -> str:
+        """
+        Derives an entry key from a content hash and the other inputs the cached data depends on.
+        """
+        return hashlib.sha256("\0".join((content_hash, *parts)).encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{self.suffix}"
+
+    def _load_index(self) -> OrderedDict[str, int]:
+        if self._index is None:
+            entries = []
+            if self.cache_dir.is_dir():
+                for entry_path in self.cache_dir.glob(f"*/*{self.suffix}"):
+                    try:
+                        stat = entry_path.stat()
+                    except OSError:
+                        continue
+                    entries.append((stat.st_mtime, entry_path.stem, stat.st_size))
+            self._index = OrderedDict((key, size) for _, key, size in sorted(entries))
+            self._size_bytes = sum(self._index.values())
+        return self._index
+
+    def contains(self, key: str) -> bool:
+        """
+        Checks whether an entry exists, without reading it or counting a hit or miss.
+        """
+        return key in self._load_index()
+
+    def record_miss(self, count: int = 1) -> None:
+        """
+        Counts misses for keys planned with contains, whose entries are computed instead of read.
+        """
+        self.misses += count
+
+    def get_bytes(self, key: str) -> bytes | None:
+        """
+        Returns the data stored under a key, or None on a miss.
+        """
+        if key not in self._load_index():
+            self.misses += 1
+            return None
+        entry_path = self._entry_path(key)
+        try:
+            data = entry_path.read_bytes()
+            os.utime(entry_path)  # Record the access for LRU eviction across runs
+        except OSError as e:
+            self.discard(key, e)
+            return None
+        self._load_index().move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put_bytes(self, key: str, data: bytes) -> None:
+        """
+        Stores data under a key, evicting least recently used entries if the size limit is exceeded.
+        Write failures are logged and otherwise ignored, since the cache is only an optimization.
+        """
+        index = self._load_index()
+        entry_path = self._entry_path(key)
+        try:
+            entry_path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = entry_path.with_suffix(f".{os.getpid()}.tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(entry_path)
+        except OSError as e:
+            logger.warning(f"Could not write cache entry {entry_path}: {e}")
+            return
+        self._size_bytes += len(data) - index.get(key, 0)
+        index[key] = len(data)
+        index.move_to_end(key)
+        self._evict()
+
+    def discard(self, key: str, reason: Exception, *, was_hit: bool = False) -> None:
+        """
+        Removes an entry that turned out to be unreadable; the lookup counts as a miss.
+
+        Args:
+            key (str): Key of the unreadable entry.
+            reason (Exception): Why the entry could not be read, for the debug log.
+            was_hit (bool): Whether the lookup was already counted as a hit and must be corrected.
+        """
+        logger.debug(f"Discarding unreadable cache entry {self._entry_path(key)}: {reason}")
+        if was_hit:
+            self.hits -= 1
+        self._remove(key)
+        self.misses += 1
+
+    def _remove(self, key: str) -> None:
+        self._size_bytes -= self._load_index().pop(key, 0)
+        self._entry_path(key).unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        index = self._load_index()
+        while self._size_bytes > self.max_bytes and len(index) > 1:
+            self._remove(next(iter(index)))
+            self.evictions += 1
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns hit, miss and eviction counts of this run along with the current cache size.
+        Hits and misses are counted per entry, e.g. per file and analysis type for the result cache.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._load_index()),
+            "size_bytes": self._size_bytes,
+        }
+
+
+class ResultCache(DiskCache):
+    """
+    Caches the term counts of a file for one analysis type, keyed by the file content, the analysis
+    type, the spaCy model and the Kratio version.
+    """
+
+    subdir = "results"
+    suffix = ".json"
+
+    def get(self, key: str) -> Counter[str] | None:
+        """
+        Returns the cached term counts for a key, or None on a miss.
+        """
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return Counter(json.loads(data)["counts"])
+        except (ValueError, KeyError, TypeError) as e:
+            self.discard(key, e, was_hit=True)
+            return None
+
+    def put(self, key: str, counts: Counter[str]) -> None:
+        """
+        Stores the term counts of a file under a key.
+        """
+        self.put_bytes(key, json.dumps({"counts": counts}, ensure_ascii=False).encode("utf-8"))
+
+
+class DocCache(DiskCache):
+    """
+    Caches the parsed spaCy Docs of a file, serialized with DocBin, keyed by the file content,
+    the spaCy model and the pipeline components that produced them.
+    """
+
+    subdir = "docs"
+    suffix = ".spacy"
+
+    def load(self, key: str, vocab: "Vocab") -> list["Doc"] | None:
+        """
+        Returns the cached Docs for a key, deserialized against the given vocabulary, or None on a miss.
+        """
+        from spacy.tokens import DocBin
+
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return list(DocBin().from_bytes(data).get_docs(vocab))
+        except Exception as e:  # DocBin raises a variety of errors on corrupt data
+            self.discard(key, e, was_hit=True)
+            return None
+
+    def store(self, key: str, docs: list["Doc"]) -> None:
+        """
+        Serializes the Docs of a file with DocBin and stores them under a key.
+        """
+        from spacy.tokens import DocBin
+
+        self.put_bytes(key, DocBin(docs=docs).to_bytes())
@@ -1,6 +1,28 @@
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import re
+from collections.abc import Iterator
 from pathlib import Path
+from typing import BinaryIO
 
-from kratio.exceptions import FileReadError
+from kratio.constants import DECODE_ERRORS_SKIP, DEFAULT_CHUNK_SIZE, DEFAULT_DECODE_ERRORS
+from kratio.exceptions import BinaryFileError, FileReadError
+from kratio.io.scanner import iter_files
+
+# End of a sentence: terminal punctuation, optional closing quotes/brackets, then whitespace
+_SENTENCE_END = re.compile(r"[.!?][\"')\]]*\s")
+# Blank line(s) separating paragraphs
+_PARAGRAPH_BREAK = re.compile(r"\n[^\S\n]*\n\s*")
+
+# Number of leading bytes inspected to tell binary files from text
+BINARY_SNIFF_BYTES = 8192
+# Files from this size on are memory-mapped and decoded straight from the page cache
+_MMAP_MIN_BYTES = 1024 * 1024
+# Number of bytes decoded at a time
+_DECODE_BLOCK_BYTES = 256 * 1024
 
 
 def is_directory(path: str) -> bool:
@@ -12,15 +34,83 @@ def is_directory(path: str) -> bool:
 
 def get_files_from_directory(directory_path: str, supported_extensions: list[str]) -> list[Path]:
     """
-    Scans a directory and returns a list of files with supported extensions.
+    Scans a directory and returns a list of files with supported extensions, skipping ignored files
+    and directories. See iter_files to start processing files before the scan is complete.
     """
-    return [p for p in Path(directory_path).rglob("*") if p.is_file() and p.suffix in supported_extensions]
+    return list(iter_files(directory_path, supported_extensions))
 
 
-def _read_text(file_path: Path | str) -> str:
+def looks_binary(head: bytes) -> bool:
     """
-    Reads a text file and returns its content as a string.
+    Checks whether the first bytes of a file look binary: UTF-8 text never contains NUL bytes.
+    """
+    return b"\0" in head
+
+
+def is_binary_file(file_path: Path | str) -> bool:
+    """
+    Checks whether a file looks binary by inspecting only its first BINARY_SNIFF_BYTES bytes.
+    Files that cannot be read are not considered binary, so that the error is reported when they are read.
+    """
+    try:
+        with Path(file_path).open("rb") as f:
+            return looks_binary(f.read(BINARY_SNIFF_BYTES))
+    except OSError:
+        return False
+
+
+def hash_file(file_path: Path | str, algorithm: str = "sha256") -> str:
+    """
+    Computes the digest of a file's content, reading it in blocks.
     Raises FileReadError on failure.
+
+    Args:
+        file_path (Path | str): The path to the file.
+        algorithm (str): The hashlib algorithm, e.g. "sha256", or the faster "blake2b" for change detection.
+
+    Returns:
+        str: The hexadecimal content digest.
+    """
+    try:
+        with Path(file_path).open("rb") as f:
+            return hashlib.file_digest(f, algorithm).hexdigest()
+    except FileNotFoundError as e:
+        raise FileReadError(f"File not found at {file_path}") from e
+    except Exception as e:
+        raise FileReadError(f"An error occurred while reading the file: {e}") from e
+
+
+def _iter_decoded_blocks(f: BinaryIO, errors: str, memory_map: bool) -> Iterator[str]:
+    """
+    Decodes an open file as UTF-8 block by block, translating line endings to "\\n" like text mode does.
+    With memory_map, large files are decoded straight from the page cache instead of being read into buffers.
+    Raises BinaryFileError if the first bytes look binary, before reading the rest of the file.
+    """
+    head = f.read(BINARY_SNIFF_BYTES)
+    if looks_binary(head):
+        raise BinaryFileError("The file looks binary (it contains NUL bytes).")
+
+    codec_errors = "ignore" if errors == DECODE_ERRORS_SKIP else errors
+    decoder = io.IncrementalNewlineDecoder(codecs.getincrementaldecoder("utf-8")(codec_errors), translate=True)
+    size = os.fstat(f.fileno()).st_size
+    if not memory_map or size < _MMAP_MIN_BYTES:
+        block = head
+        while block:
+            if text := decoder.decode(block):
+                yield text
+            block = f.read(_DECODE_BLOCK_BYTES)
+    else:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+            for start in range(0, len(view), _DECODE_BLOCK_BYTES):
+                if text := decoder.decode(view[start : start + _DECODE_BLOCK_BYTES]):
+                    yield text
+    if text := decoder.decode(b"", final=True):
+        yield text
+
+
+def _iter_decoded_file(file_path: Path | str, errors: str, memory_map: bool = True) -> Iterator[str]:
+    """
+    Yields the decoded content of a text file in blocks. Raises FileReadError on failure.
     """
     if is_directory(str(file_path)):
         raise FileReadError(f"Path '{file_path}' is a directory, not a file.")
@@ -28,22 +118,110 @@ def _read_text(file_path: Path | str) -> str:
     try:
         if isinstance(file_path, str):
             file_path = Path(file_path)
-        with file_path.open(encoding="utf-8") as f:
-            return f.read()
+        with file_path.open("rb") as f:
+            yield from _iter_decoded_blocks(f, errors, memory_map)
+    except FileReadError:
+        raise
     except FileNotFoundError as e:
         raise FileReadError(f"File not found at {file_path}") from e
     except Exception as e:
         raise FileReadError(f"An error occurred while reading the file: {e}") from e
 
 
-def read_text_file(file_path: Path | str) -> str:
+def _read_text(file_path: Path | str, errors: str = DEFAULT_DECODE_ERRORS) -> str:
+    """
+    Reads a text file and returns its content as a string.
+    Raises FileReadError on failure.
+    """
+    # Not memory-mapped: watch mode reads files right after they change, and a mapped file that is
+    # truncated while it is read raises SIGBUS
+    return "".join(_iter_decoded_file(file_path, errors, memory_map=False))
+
+
+def read_text_file(file_path: Path | str, errors: str = DEFAULT_DECODE_ERRORS) -> str:
     """
     Reads a text file and returns its content as a string.
 
     Args:
         file_path (Path | str): The path to the text file.
+        errors (str): How to handle bytes that are not valid UTF-8: 'strict' fails the read, 'replace'
+            substitutes U+FFFD and 'skip' drops them.
 
     Returns:
         str: The content of the text file.
     """
-    return _read_text(file_path)
+    return _read_text(file_path, errors)
+
+
+def _find_chunk_boundary(text: str, limit: int) -> int:
+    """
+    Finds where to cut text so the first chunk holds at most `limit` characters.
+    Prefers the last paragraph break, then the last sentence end, then the last whitespace.
+    """
+    paragraph_end = text.rfind("\n\n", 0, limit)
+    if paragraph_end > 0:
+        return paragraph_end + 2
+
+    sentence_end = None
+    for match in _SENTENCE_END.finditer(text, 0, limit):
+        sentence_end = match.end()
+    if sentence_end:
+        return sentence_end
+
+    whitespace = max(text.rfind(" ", 0, limit), text.rfind("\n", 0, limit))
+    return whitespace + 1 if whitespace > 0 else limit
+
+
+def iter_text_chunks(
+    file_path: Path | str,
+    max_chars: int = DEFAULT_CHUNK_SIZE,
+    errors: str = DEFAULT_DECODE_ERRORS,
+) -> Iterator[str]:
+    """
+    Reads a text file incrementally and yields its content in chunks of at most `max_chars` characters,
+    split on paragraph or sentence boundaries where possible. A file that fits in one chunk is yielded whole.
+    Large files are memory-mapped and decoded block by block, so at most about two chunks are held in
+    memory at a time, regardless of the file size.
+    Raises FileReadError on failure, and BinaryFileError for a binary file before reading more than its
+    first few kilobytes.
+
+    Args:
+        file_path (Path | str): The path to the text file.
+        max_chars (int): The maximum number of characters per chunk.
+        errors (str): How to handle bytes that are not valid UTF-8: 'strict' fails the read, 'replace'
+            substitutes U+FFFD and 'skip' drops them.
+
+    Yields:
+        str: Consecutive chunks of the file content; joined together they equal the whole content.
+    """
+    buffer = ""
+    for block in _iter_decoded_file(file_path, errors):
+        buffer += block
+        while len(buffer) > max_chars:
+            cut = _find_chunk_boundary(buffer, max_chars)
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    if buffer:
+        yield buffer
+
+
+def split_paragraphs(text: str, max_chars: int = DEFAULT_CHUNK_SIZE) -> list[str]:
+    """
+    Splits text into its non-blank paragraphs. Paragraphs longer than `max_chars` are split further on
+    sentence or whitespace boundaries, like iter_text_chunks.
+
+    Args:
+        text (str): The text to split.
+        max_chars (int): The maximum number of characters per paragraph.
+
+    Returns:
+        list[str]: The paragraphs in order, without the blank lines between them.
+    """
+    paragraphs = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        while len(paragraph) > max_chars:
+            cut = _find_chunk_boundary(paragraph, max_chars)
+            paragraphs.append(paragraph[:cut])
+            paragraph = paragraph[cut:]
+        paragraphs.append(paragraph)
+    return [paragraph for paragraph in paragraphs if paragraph.strip()]
@@ -0,0 +1,308 @@
+"""
+Directory scanning for analysis runs.
+
+Directories are listed with os.scandir, whose entries carry the file type reported by the operating system,
+so no extra stat call is made per entry. Well-known tool, cache and virtual environment directories are
+pruned, and patterns from .gitignore and .kratioignore files are honored. Directories are listed on a pool
+of threads, which hides the latency of network filesystems, and files are yielded as soon as their
+directory has been listed so analysis can start before the walk is complete.
+"""
+
+import os
+import re
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from loguru import logger
+
+from kratio.constants import DEFAULT_IGNORED_DIRECTORIES, DEFAULT_SCAN_THREADS, IGNORE_FILES
+
+# A directory holding this file is a virtual environment, whatever its name
+_VENV_MARKER = "pyvenv.cfg"
+
+
+@dataclass(frozen=True)
+class IgnorePattern:
+    """
+    One pattern of an ignore file, in the .gitignore syntax.
+
+    A pattern containing a slash (other than a trailing one) is anchored to the directory of the ignore
+    file it comes from; any other pattern matches the name of a file or directory at any depth below it.
+    """
+
+    regex: re.Pattern[str]
+    base: str
+    anchored: bool
+    negated: bool
+    directory_only: bool
+
+    def matches(self, relative_path: str, name: str, is_dir: bool) -> bool:
+        """
+        Args:
+            relative_path (str): The entry's path relative to the scanned root, with "/" separators.
+            name (str): The entry's name.
+            is_dir (bool): Whether the entry is a directory.
+        """
+        if self.directory_only and not is_dir:
+            return False
+        if not self.anchored:
+            return self.regex.fullmatch(name) is not None
+        if self.base:
+            if not relative_path.startswith(self.base + "/"):
+                return False
+            relative_path = relative_path[len(self.base) + 1 :]
+        return self.regex.fullmatch(relative_path) is not None
+
+
+def _translate(pattern: str) -> str:
+    """
+    Translates a .gitignore glob into a regular expression: "*" and "?" do not cross directories,
+    "**" matches any number of directories, and [...] is a character class.
+    """
+    regex = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            regex.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            regex.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[" and (end := pattern.find("]", i + 2)) != -1:
+            members = pattern[i + 1 : end]
+            if members[0] in "!^":
+                members = "^" + members[1:]
+            regex.append("[" + members.replace("\\", "\\\\") + "]")
+            i = end
+        elif char == "\\" and i + 1 < len(pattern):
+            i += 1
+            regex.append(re.escape(pattern[i]))
+        else:
+            regex.append(re.escape(char))
+        i += 1
+    return "".join(regex)
+
+
+def parse_ignore_patterns(lines: Iterable[str], base: str = "") -> list[IgnorePattern]:
+    """
+    Parses ignore patterns in the .gitignore syntax, skipping blank lines and comments.
+
+    Args:
+        lines (Iterable[str]): The lines of an ignore file, or patterns given on the command line.
+        base (str): The directory the patterns are relative to, relative to the scanned root ("" for the root).
+
+    Returns:
+        list[IgnorePattern]: The parsed patterns, in order; the last matching pattern decides.
+    """
+    patterns = []
+    for line in lines:
+        line = line.rstrip("\n").rstrip()
+        if not line or line.startswith("#"):
+            continue
+        negated = line.startswith("!")
+        if negated or line.startswith(("\\!", "\\#")):
+            line = line[1:]
+        directory_only = line.endswith("/")
+        line = line.rstrip("/")
+        if not line:
+            continue
+        anchored = "/" in line
+        line = line.lstrip("/")
+        patterns.append(IgnorePattern(re.compile(_translate(line)), base, anchored, negated, directory_only))
+    return patterns
+
+
+def is_ignored(patterns: Iterable[IgnorePattern], relative_path: str, name: str, is_dir: bool) -> bool:
+    """
+    Checks whether an entry is ignored: the last pattern matching it decides, and negated patterns re-include.
+    """
+    ignored = False
+    for pattern in patterns:
+        if pattern.negated == ignored and pattern.matches(relative_path, name, is_dir):
+            ignored = not pattern.negated
+    return ignored
+
+
+def _read_ignore_file(path: Path, base: str) -> list[IgnorePattern]:
+    try:
+        with path.open(encoding="utf-8", errors="replace") as f:
+            return parse_ignore_patterns(f, base)
+    except OSError as e:
+        logger.warning(f"Could not read ignore file {path}: {e}")
+        return []
+
+
+type _Directory = tuple[str, str, tuple[IgnorePattern, ...]]
+
+
+def _scan_directory(
+    directory: _Directory,
+    extensions: frozenset[str],
+    use_ignore_files: bool,
+    prune: bool,
+    accept: Callable[[Path], bool] | None,
+) -> tuple[list[Path], list[_Directory]]:
+    """
+    Lists one directory, returning its supported files and the subdirectories to scan, both sorted by name.
+    """
+    path, relative, patterns = directory
+    try:
+        with os.scandir(path) as it:
+            entries = sorted(it, key=lambda entry: entry.name)
+    except OSError as e:
+        logger.warning(f"Skipping directory {path}: {e}")
+        return [], []
+
+    names = {entry.name for entry in entries}
+    if prune and relative and _VENV_MARKER in names:
+        logger.debug(f"Skipping virtual environment {path}")
+        return [], []
+    if use_ignore_files:
+        for ignore_file in IGNORE_FILES:
+            if ignore_file in names:
+                patterns += tuple(_read_ignore_file(Path(path, ignore_file), relative))
+
+    files: list[Path] = []
+    subdirectories: list[_Directory] = []
+    for entry in entries:
+        entry_relative = f"{relative}/{entry.name}" if relative else entry.name
+        try:
+            # Symbolic links to directories are not followed, so the walk cannot loop
+            if entry.is_dir(follow_symlinks=False):
+                if prune and entry.name in DEFAULT_IGNORED_DIRECTORIES:
+                    continue
+                if not is_ignored(patterns, entry_relative, entry.name, True):
+                    subdirectories.append((entry.path, entry_relative, patterns))
+            elif (
+                # Cheaper than building a Path for every entry; same suffix as Path.suffix
+                os.path.splitext(entry.name)[1] in extensions  # noqa: PTH122
+                and entry.is_file()
+                and not is_ignored(patterns, entry_relative, entry.name, False)
+            ):
+                file_path = Path(entry.path)
+                if accept is None or accept(file_path):
+                    files.append(file_path)
+        except OSError as e:
+            logger.warning(f"Skipping {entry.path}: {e}")
+    return files, subdirectories
+
+
+def iter_files(
+    directory_path: Path | str,
+    supported_extensions: Iterable[str],
+    exclude: Iterable[str] = (),
+    use_ignore_files: bool = True,
+    prune: bool = True,
+    threads: int = DEFAULT_SCAN_THREADS,
+    accept: Callable[[Path], bool] | None = None,
+) -> Iterator[Path]:
+    """
+    Lazily yields the files with a supported extension below a directory.
+
+    The walk is breadth-first: the files of a directory are yielded, sorted by name, once it has been listed,
+    while its subdirectories are already being listed in the background. The order is deterministic and does
+    not depend on the number of threads.
+
+    Args:
+        directory_path (Path | str): The directory to scan.
+        supported_extensions (Iterable[str]): The extensions of the files to yield, e.g. ".txt".
+        exclude (Iterable[str]): Extra ignore patterns in the .gitignore syntax, relative to the directory.
+        use_ignore_files (bool): Whether to honor .gitignore and .kratioignore files.
+        prune (bool): Whether to skip DEFAULT_IGNORED_DIRECTORIES and virtual environments.
+        threads (int): The number of threads listing directories; 1 scans in the calling thread.
+        accept (Callable[[Path], bool] | None): Further filter of the files, run on the scanning threads,
+            e.g. to skip binary files.
+
+    Yields:
+        Path: Each supported file.
+    """
+    scan = partial(
+        _scan_directory,
+        extensions=frozenset(supported_extensions),
+        use_ignore_files=use_ignore_files,
+        prune=prune,
+        accept=accept,
+    )
+    root: _Directory = (os.fspath(directory_path), "", tuple(parse_ignore_patterns(exclude)))
+
+    if threads <= 1:
+        directories = deque([root])
+        while directories:
+            files, subdirectories = scan(directories.popleft())
+            directories.extend(subdirectories)
+            yield from files
+        return
+
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="kratio-scan")
+    try:
+        pending: deque[Future[tuple[list[Path], list[_Directory]]]] = deque([pool.submit(scan, root)])
+        while pending:
+            files, subdirectories = pending.popleft().result()
+            pending.extend(pool.submit(scan, subdirectory) for subdirectory in subdirectories)
+            yield from files
+    finally:
+        # Stops listing directories when the consumer stops early
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def is_scanned(
+    directory_path: Path | str,
+    file_path: Path | str,
+    supported_extensions: Iterable[str],
+    exclude: Iterable[str] = (),
+    use_ignore_files: bool = True,
+    prune: bool = True,
+) -> bool:
+    """
+    Checks whether a scan of a directory with iter_files would yield a file, e.g. to filter the file system
+    events of a watched directory with the rules of its scan. Only the directories on the way to the file are
+    looked at, so a deleted file can be checked too; whether the file is binary is not checked.
+
+    Args:
+        directory_path (Path | str): The scanned directory.
+        file_path (Path | str): The file to check.
+        supported_extensions (Iterable[str]): The extensions of the files to yield, e.g. ".txt".
+        exclude (Iterable[str]): Extra ignore patterns in the .gitignore syntax, relative to the directory.
+        use_ignore_files (bool): Whether to honor .gitignore and .kratioignore files.
+        prune (bool): Whether to skip DEFAULT_IGNORED_DIRECTORIES and virtual environments.
+
+    Returns:
+        bool: Whether the file is below the directory and neither pruned nor ignored.
+    """
+    root = Path(directory_path).absolute()
+    try:
+        names = Path(file_path).absolute().relative_to(root).parts
+    except ValueError:
+        return False
+    if not names or Path(names[-1]).suffix not in frozenset(supported_extensions):
+        return False
+
+    patterns = tuple(parse_ignore_patterns(exclude))
+    directory, relative = root, ""
+    for depth, name in enumerate(names):
+        # The same checks as _scan_directory when it lists `directory`
+        if prune and relative and (directory / _VENV_MARKER).exists():
+            return False
+        if use_ignore_files:
+            for ignore_file in IGNORE_FILES:
+                if (directory / ignore_file).is_file():
+                    patterns += tuple(_read_ignore_file(directory / ignore_file, relative))
+        is_dir = depth < len(names) - 1
+        if is_dir and prune and name in DEFAULT_IGNORED_DIRECTORIES:
+            return False
+        entry_relative = f"{relative}/{name}" if relative else name
+        if is_ignored(patterns, entry_relative, name, is_dir):
+            return False
+        directory, relative = directory / name, entry_relative
+    return True
@@ -1,8 +1,84 @@
 from pathlib import Path
+from types import TracebackType
 
 import pandas as pd
 from loguru import logger
 
+# Column naming the file each row of a streamed output comes from
+SOURCE_COLUMN = "source_file"
+# Streamed outputs are written through a buffer of this size, so many small tables cost few system calls
+_STREAM_BUFFER_BYTES = 1024 * 1024
+_JSON_LINES_EXTENSIONS = (".ndjson", ".jsonl")
+
+
+class ResultStream:
+    """
+    Writes the result tables of many files to a single output file, one table after the other, so a directory
+    run produces one artifact without keeping every table in memory.
+
+    Every row gets a "source_file" column, and the index of the tables (e.g. the keyword) becomes a column.
+    A .csv file gets its header once, a .ndjson or .jsonl file one JSON object per line, and a .json file a
+    single array of objects. The file is opened once, written through a buffer and flushed when closed.
+    """
+
+    def __init__(self, output_path: str) -> None:
+        """
+        Args:
+            output_path (str): The path to the output file; its extension selects the format.
+        """
+        self.output_path = output_path
+        self.extension = Path(output_path).suffix.lower()
+        self.rows = 0
+        self._header_written = False
+        # Closed by close, as the file stays open across the calls to write
+        self._file = Path(output_path).open(  # noqa: SIM115
+            "w",
+            encoding="utf-8",
+            newline="",
+            buffering=_STREAM_BUFFER_BYTES,
+        )
+
+    def write(self, df: pd.DataFrame, source: str) -> None:
+        """
+        Appends the rows of a result table.
+
+        Args:
+            df (pd.DataFrame): The results of one file.
+            source (str): The file the results come from.
+        """
+        rows = df.reset_index()
+        rows.insert(0, SOURCE_COLUMN, source)
+        if self.extension == ".csv":
+            rows.to_csv(self._file, header=not self._header_written, index=False)
+            self._header_written = True
+        elif rows.empty:
+            pass
+        elif self.extension in _JSON_LINES_EXTENSIONS:
+            self._file.write(rows.to_json(orient="records", lines=True).rstrip("\n") + "\n")
+        else:
+            # The records of the table, without the brackets of their array, continue the array of the file
+            self._file.write(("[\n" if self.rows == 0 else ",\n") + rows.to_json(orient="records")[1:-1])
+        self.rows += len(rows)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        if self.extension == ".json":
+            self._file.write("\n]\n" if self.rows else "[]\n")
+        self._file.close()
+        logger.info(f"{self.rows} rows successfully streamed to {self.output_path}.")
+
+    def __enter__(self) -> "ResultStream":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
 
 class Serializer:
     """
@@ -15,7 +91,7 @@ class Serializer:
 
         Args:
             df (pd.DataFrame): The DataFrame to serialize.
-            output_path (str): The path to the output file (e.g., "output.csv", "output.json").
+            output_path (str): The path to the output file (e.g., "output.csv", "output.json", "output.ndjson").
         """
         file_extension = Path(output_path).suffix.lower()
 
@@ -25,5 +101,24 @@ class Serializer:
         elif file_extension == ".json":
             df.to_json(output_path, orient="records", indent=4)
             logger.info(f"DataFrame successfully dumped to {output_path} (JSON format).")
+        elif file_extension in _JSON_LINES_EXTENSIONS:
+            df.reset_index().to_json(output_path, orient="records", lines=True)
+            logger.info(f"DataFrame successfully dumped to {output_path} (JSON Lines format).")
         else:
-            logger.error(f"Unsupported output format: {file_extension}. Please use .csv or .json.")
+            logger.error(f"Unsupported output format: {file_extension}. Please use .csv, .json or .ndjson.")
+
+    def open_stream(self, output_path: str) -> ResultStream | None:
+        """
+        Opens a ResultStream writing the results of many files to one output file.
+
+        Args:
+            output_path (str): The path to the output file (e.g., "output.csv", "output.ndjson").
+
+        Returns:
+            ResultStream | None: The open stream, or None if the format is not supported.
+        """
+        file_extension = Path(output_path).suffix.lower()
+        if file_extension not in (".csv", ".json", *_JSON_LINES_EXTENSIONS):
+            logger.error(f"Unsupported output format: {file_extension}. Please use .csv, .json or .ndjson.")
+            return None
+        return ResultStream(output_path)
@@ -1,15 +1,24 @@
 import pandas as pd
 
 
-def normalize_to_dataframe(counts: pd.Series, total_items: int, index_name: str, column_prefix: str) -> pd.DataFrame:
+def normalize_to_dataframe(
+    counts: pd.Series,
+    total_items: int,
+    index_name: str,
+    column_prefix: str,
+    top_n: int | None = None,
+) -> pd.DataFrame:
     """
     Normalizes counts to a DataFrame with frequencies and densities, handling empty inputs.
+    Rows are sorted by descending frequency; equal frequencies keep the order of the counts.
 
     Args:
         counts (pd.Series): Series of counts (e.g., word counts, noun chunk counts).
         total_items (int): Total number of items (e.g., total words, total noun chunks).
         index_name (str): Name for the DataFrame index (e.g., "Keyword", "Noun Chunk").
         column_prefix (str): Prefix for the "Frequency" and "Density" columns.
+        top_n (int | None): When given, only the top_n most frequent rows are selected (without sorting
+            every count) and returned; the result equals the head of the full DataFrame.
 
     Returns:
         pd.DataFrame: A DataFrame with frequencies and densities.
@@ -21,7 +30,9 @@ def normalize_to_dataframe(counts: pd.Series, total_items: int, index_name: str,
         empty_df.index.name = index_name
         return empty_df
 
+    if top_n is not None:
+        counts = counts.nlargest(top_n, keep="first")
     densities = counts / total_items * 100
     df = pd.DataFrame({f"{column_prefix}Frequency": counts, f"{column_prefix}Density": densities})
     df.index.name = index_name
-    return df.sort_values(f"{column_prefix}Frequency", ascending=False)
+    return df.sort_values(f"{column_prefix}Frequency", ascending=False, kind="stable")
@@ -0,0 +1,83 @@
+"""
+Memory limits of long-running processes such as watch mode.
+
+spaCy interns every string it has ever parsed in the StringStore of a pipeline's vocabulary, which therefore
+grows for as long as new words are seen. The only way to shrink it is to load the pipeline again. MemoryLimits
+samples the vocabulary size and the resident set size of the process as gauges, and tells when they have
+crossed their limits so the pipelines should be reloaded.
+"""
+
+import os
+import time
+from pathlib import Path
+
+from kratio.utils.metrics import metrics
+
+# Freed memory is not always returned to the operating system, so the resident set size can stay above its
+# limit after a reload; reloading again sooner than this would only cost time
+_MIN_RELOAD_INTERVAL_SECONDS = 300.0
+
+
+def rss_bytes() -> int | None:
+    """
+    Returns the resident set size of the current process, or None where it cannot be read (outside Linux).
+    """
+    try:
+        fields = Path("/proc/self/statm").read_text(encoding="ascii").split()
+        return int(fields[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class MemoryLimits:
+    """
+    Decides when the spaCy pipelines of a long-running process should be reloaded: when their vocabulary has
+    grown by more than a number of strings since they were loaded, or when the resident set size exceeds a
+    limit. Each check records the "vocabulary strings" and "rss bytes" gauges.
+    """
+
+    def __init__(self, max_vocabulary_growth: int = 0, max_rss_bytes: int = 0) -> None:
+        """
+        Args:
+            max_vocabulary_growth (int): The number of strings the vocabulary may gain before a reload; 0 for no limit.
+            max_rss_bytes (int): The resident set size above which to reload; 0 for no limit.
+        """
+        self.max_vocabulary_growth = max_vocabulary_growth
+        self.max_rss_bytes = max_rss_bytes
+        self._last_reload = -_MIN_RELOAD_INTERVAL_SECONDS
+
+    def check(self, vocabulary: tuple[int, int] | None) -> str | None:
+        """
+        Records the gauges and checks the limits.
+
+        Args:
+            vocabulary (tuple[int, int] | None): The number of strings of the loaded pipelines and how many were
+                added since they were loaded, see SpacyModelLoader.vocabulary_size; None if none is loaded.
+
+        Returns:
+            str | None: Why the pipelines should be reloaded, or None while they are within the limits.
+        """
+        rss = rss_bytes()
+        if rss is not None:
+            metrics.set_gauge("rss bytes", rss)
+        if vocabulary is None:
+            return None
+        vocabulary_size, growth = vocabulary
+        metrics.set_gauge("vocabulary strings", vocabulary_size)
+
+        if self.max_vocabulary_growth and growth > self.max_vocabulary_growth:
+            return f"its vocabulary grew by {growth:,} strings"
+        if (
+            self.max_rss_bytes
+            and rss is not None
+            and rss > self.max_rss_bytes
+            and time.monotonic() - self._last_reload >= _MIN_RELOAD_INTERVAL_SECONDS
+        ):
+            return f"the process uses {rss / 1024 / 1024:.0f} MiB"
+        return None
+
+    def reloaded(self) -> None:
+        """
+        Records that the pipelines were reloaded.
+        """
+        self._last_reload = time.monotonic()
@@ -0,0 +1,127 @@
+"""
+Overlapping of I/O and computation across threads.
+
+Reading files, analyzing them and writing their results run as stages connected by bounded queues: reader
+threads prefetch the next files while the current one is analyzed, and a writer thread displays and
+serializes results while the next file is analyzed. Queues are bounded, so a slow stage holds back the
+stages before it instead of letting memory grow (backpressure). Items always leave a stage in the order
+they entered it, and the depth of each queue is recorded as a gauge of the metrics registry for tuning.
+"""
+
+import contextlib
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from types import TracebackType
+
+from kratio.utils.metrics import metrics
+
+
+def prefetch[T, R](
+    func: Callable[[T], R],
+    items: Iterable[T],
+    name: str,
+    threads: int,
+    depth: int,
+) -> Iterator[tuple[T, R]]:
+    """
+    Applies a function to items on a pool of threads, running at most `depth` items ahead of the consumer.
+
+    Each item is yielded with its result in input order; an exception raised by the function is re-raised
+    when its item is reached. Items are only taken from `items` as room frees up in the queue, so a lazy
+    iterable such as a directory scan is consumed gradually. Before each item is handed over, the number of
+    results ready in the queue is recorded as the gauge "<name> queue depth": when it stays at zero the
+    consumer is waiting on this stage, when it stays at `depth` the consumer is the bottleneck.
+
+    Args:
+        func (Callable[[T], R]): The work of the stage, e.g. reading a file.
+        items (Iterable[T]): The items to process.
+        name (str): The name of the stage.
+        threads (int): The number of threads of the stage; with 0, items are processed by the consumer.
+        depth (int): The maximum number of items processed ahead of the consumer.
+
+    Yields:
+        tuple[T, R]: Each item and its result.
+    """
+    if threads < 1 or depth < 1:
+        for item in items:
+            yield item, func(item)
+        return
+
+    pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix=f"kratio-{name}")
+    queue: deque[tuple[T, Future[R]]] = deque()
+    iterator = iter(items)
+    try:
+        while True:
+            for item in iterator:
+                queue.append((item, pool.submit(func, item)))
+                if len(queue) >= depth:
+                    break
+            if not queue:
+                return
+            metrics.set_gauge(f"{name} queue depth", sum(future.done() for _, future in queue))
+            item, future = queue.popleft()
+            yield item, future.result()
+    finally:
+        # Stops the stage when the consumer stops early or fails
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class OrderedWriter:
+    """
+    Runs tasks one at a time on a background thread, in submission order, e.g. displaying and serializing
+    the results of a file while the next one is analyzed.
+
+    At most `depth` tasks wait in the queue; submitting another one blocks until the oldest has run. An
+    exception raised by a task is re-raised by a later call to submit or when the writer is closed. The
+    number of waiting tasks is recorded as the gauge "<name> queue depth" on every submission.
+    """
+
+    def __init__(self, name: str, depth: int) -> None:
+        """
+        Args:
+            name (str): The name of the stage.
+            depth (int): The maximum number of waiting tasks; with 0, tasks run in the submitting thread.
+        """
+        self.name = name
+        self.depth = depth
+        self._queue: deque[Future[None]] = deque()
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"kratio-{name}") if depth > 0 else None
+
+    def submit[**P](self, func: Callable[P, None], *args: P.args, **kwargs: P.kwargs) -> None:
+        if self._pool is None:
+            func(*args, **kwargs)
+            return
+        while self._queue and (self._queue[0].done() or len(self._queue) >= self.depth):
+            self._queue.popleft().result()
+        metrics.set_gauge(f"{self.name} queue depth", len(self._queue))
+        self._queue.append(self._pool.submit(func, *args, **kwargs))
+
+    def close(self) -> None:
+        """
+        Waits for the submitted tasks, re-raising the first exception, and stops the thread.
+        """
+        if self._pool is None:
+            return
+        try:
+            while self._queue:
+                self._queue.popleft().result()
+        finally:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def __enter__(self) -> "OrderedWriter":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # The results submitted before the block failed are still written, but its error takes precedence
+        with contextlib.suppress(Exception):
+            self.close()
@@ -0,0 +1,133 @@
+"""
+Profiling of a run (`--profile`): cumulative and self wall time, CPU time and peak memory allocations per stage,
+plus a cProfile of every function. Stages are the ones timed by the metrics registry, e.g. reading files,
+the spaCy pipeline, counting terms, building DataFrames, displaying, serializing and plotting results.
+"""
+
+import cProfile
+import io
+import pstats
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from kratio.utils.metrics import MetricsRegistry, metrics
+
+
+@dataclass
+class StageProfile:
+    """
+    Totals of one stage over the run. Times of nested stages are included in `wall` but not in `self_wall`.
+    """
+
+    intervals: int = 0
+    wall: float = 0.0
+    self_wall: float = 0.0
+    cpu: float = 0.0
+    peak_bytes: int = 0
+
+
+@dataclass
+class _Frame:
+    stage: str
+    wall_start: float
+    cpu_start: float
+    memory_start: int
+    peak: int
+    child_wall: float = 0.0
+
+
+class StageProfiler:
+    """
+    Profiles the stages of a run as the metrics registry reports their boundaries.
+
+    Peak allocations are measured with tracemalloc as the highest traced memory above the level at which
+    the stage started, including nested stages. Only the thread that started profiling is followed.
+    """
+
+    def __init__(self, top_functions: int = 25) -> None:
+        """
+        Args:
+            top_functions (int): The number of functions listed in the report.
+        """
+        self.top_functions = top_functions
+        self.stages: dict[str, StageProfile] = {}
+        self._stack: list[_Frame] = []
+        self._profile = cProfile.Profile()
+        self._thread: int | None = None
+
+    def enter(self, stage: str) -> None:
+        if threading.get_ident() != self._thread:
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        for frame in self._stack:
+            frame.peak = max(frame.peak, peak)
+        tracemalloc.reset_peak()
+        self._stack.append(_Frame(stage, time.perf_counter(), time.process_time(), current, current))
+
+    def exit(self, stage: str) -> None:
+        if threading.get_ident() != self._thread or not self._stack or self._stack[-1].stage != stage:
+            return
+        frame = self._stack.pop()
+        wall = time.perf_counter() - frame.wall_start
+        frame.peak = max(frame.peak, tracemalloc.get_traced_memory()[1])
+
+        profile = self.stages.setdefault(stage, StageProfile())
+        profile.intervals += 1
+        profile.wall += wall
+        profile.self_wall += wall - frame.child_wall
+        profile.cpu += time.process_time() - frame.cpu_start
+        profile.peak_bytes = max(profile.peak_bytes, frame.peak - frame.memory_start)
+        if self._stack:
+            parent = self._stack[-1]
+            parent.child_wall += wall
+            parent.peak = max(parent.peak, frame.peak)
+
+    @contextmanager
+    def profile(self, registry: MetricsRegistry = metrics) -> Iterator["StageProfiler"]:
+        """
+        Profiles the stages reported by the registry, and every function call, for the duration of the block.
+        """
+        self._thread = threading.get_ident()
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        registry.stage_listener = self
+        self._profile.enable()
+        try:
+            yield self
+        finally:
+            self._profile.disable()
+            registry.stage_listener = None
+            if started_tracing:
+                tracemalloc.stop()
+            self._thread = None
+
+    def dump_stats(self, path: Path | str) -> None:
+        """
+        Writes the cProfile statistics in the .pstats format (for snakeviz, gprof2dot, flameprof, ...).
+        """
+        self._profile.dump_stats(str(path))
+
+    def report(self) -> str:
+        """
+        Formats the per-stage table, slowest stage first, followed by the functions with the highest
+        cumulative time.
+        """
+        lines = [
+            f"{'Stage':<28} {'Intervals':>10} {'Cumulative s':>13} {'Self s':>10} {'CPU s':>10} {'Peak alloc MiB':>15}",
+        ]
+        for stage, profile in sorted(self.stages.items(), key=lambda item: item[1].wall, reverse=True):
+            lines.append(
+                f"{stage:<28} {profile.intervals:>10,} {profile.wall:>13.3f} {profile.self_wall:>10.3f} "
+                f"{profile.cpu:>10.3f} {profile.peak_bytes / 1024 / 1024:>15.2f}",
+            )
+
+        functions = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=functions)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.top_functions)
+        return "\n".join(lines) + f"\n\nTop {self.top_functions} functions by cumulative time:\n{functions.getvalue()}"
@@ -1,24 +1,25 @@
-import time
 from collections.abc import Callable
 from functools import wraps
 from typing import ParamSpec, TypeVar
 
-from loguru import logger
+from kratio.utils.metrics import metrics
 
 P = ParamSpec("P")
 R = TypeVar("R")
 
 
 def timed(name: str) -> Callable[[Callable[P, R]], Callable[P, R]]:
+    """
+    Records the duration of every call in the metrics registry under the stage `name`.
+    Durations are summarized at the end of the run rather than logged one by one, as timed code runs per
+    chunk and per file.
+    """
+
     def decorator(func: Callable[P, R]) -> Callable[P, R]:
         @wraps(func)
         def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-            start_time = time.perf_counter()
-            result = func(*args, **kwargs)
-            end_time = time.perf_counter()
-            duration = (end_time - start_time) * 1000  # Convert to milliseconds
-            logger.info(f"Time spent {name}: {duration:.2f} ms")
-            return result
+            with metrics.time(name):
+                return func(*args, **kwargs)
 
         return wrapper
 
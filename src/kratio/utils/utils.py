@@ -2,7 +2,6 @@ import json
 
 import pandas as pd
 from loguru import logger
-from tabulate import tabulate
 
 
 def format_top_keywords(df: pd.DataFrame, top_n: int) -> list[dict]:
@@ -16,7 +15,7 @@ def format_top_keywords(df: pd.DataFrame, top_n: int) -> list[dict]:
 
     Returns:
         list[dict]: A list of dictionaries, each representing a keyword/noun chunk
-                    with 'keyword', 'density', and 'frequency'.
+                    with 'keyword', 'density', and 'frequency' (and 'documents' for corpus results).
     """
     if df.empty:
         return []
@@ -27,7 +26,12 @@ def format_top_keywords(df: pd.DataFrame, top_n: int) -> list[dict]:
     for _index, row in top_keywords.iterrows():
         density_col = "WordDensity" if "WordDensity" in row else "NounChunkDensity"
         frequency_col = "WordFrequency" if "WordFrequency" in row else "NounChunkFrequency"
-        formatted_results.append({"keyword": row.name, "density": row[density_col], "frequency": row[frequency_col]})
+        formatted = {"keyword": row.name, "density": row[density_col], "frequency": row[frequency_col]}
+        # Corpus-level results also report how many documents contain the term
+        document_frequency_col = frequency_col.replace("Frequency", "DocumentFrequency")
+        if document_frequency_col in row:
+            formatted["documents"] = row[document_frequency_col]
+        formatted_results.append(formatted)
     return formatted_results
 
 
@@ -73,7 +77,9 @@ def display_top_keywords(df: pd.DataFrame, top_n: int, format_type: str = "table
         csv_df = pd.DataFrame(formatted_data)
         print(csv_df.to_csv(index=False))
     elif format_type == "table":
-        # Use tabulate for pretty table output
+        # Use tabulate for pretty table output, imported only when a table is printed
+        from tabulate import tabulate
+
         print(tabulate(formatted_data, headers="keys", tablefmt="grid"))
     else:
         # Fallback to default logging if an unknown format is provided
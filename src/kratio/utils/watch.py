@@ -1,18 +1,248 @@
 """
 File system monitoring module for Kratio watch mode.
 Uses watchdog to monitor files and directories for changes.
+
+Change events are not handled on the watchdog observer thread. They are debounced per file and queued, and a
+pool of worker threads analyzes the changed files, so a burst of events (a branch checkout, a bulk formatter)
+collapses into one analysis per touched file and a slow analysis never holds back event delivery. Saves that
+leave a file's content unchanged are recognized by its fingerprint and skipped.
+
+Where file system events are unreliable (network mounts, some containers), the watched path can be polled
+with stat calls instead.
 """
 
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
 
 from loguru import logger
 from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+from watchdog.observers.polling import PollingObserver
+
+from kratio.constants import (
+    DEFAULT_WATCH_DEBOUNCE_SECONDS,
+    DEFAULT_WATCH_POLL_INTERVAL_SECONDS,
+    DEFAULT_WATCH_WORKERS,
+    SUPPORTED_EXTENSIONS,
+)
+from kratio.exceptions import FileReadError
+from kratio.io.file_handler import hash_file, is_directory
+from kratio.io.scanner import is_scanned
+from kratio.utils.metrics import metrics
+
+# A file that keeps changing is analyzed at least once per this many debounce periods
+_MAX_WAIT_DEBOUNCES = 10
+
+
+@dataclass(frozen=True)
+class Fingerprint:
+    """
+    What identifies the content of a file: its size and modification time, and a digest of its content
+    once it has been hashed.
+    """
+
+    size: int
+    mtime_ns: int
+    digest: str | None = None
 
-from kratio.constants import SUPPORTED_EXTENSIONS
-from kratio.io.file_handler import is_directory
+
+class FileFingerprints:
+    """
+    Fingerprints of the watched files, to tell real changes from saves that leave the content as it was.
+
+    A file whose size and modification time are unchanged is not read at all; otherwise its content is
+    hashed and compared with the last digest. A file without a recorded digest counts as changed.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._fingerprints: dict[Path, Fingerprint] = {}
+
+    def record_stat(self, file_path: Path) -> None:
+        """
+        Records the size and modification time of a file not seen yet, without reading it.
+        Files that cannot be stat'ed are ignored.
+        """
+        try:
+            stat = file_path.stat()
+        except OSError:
+            return
+        with self._lock:
+            self._fingerprints.setdefault(file_path.absolute(), Fingerprint(stat.st_size, stat.st_mtime_ns))
+
+    def hash_recorded(self) -> None:
+        """
+        Completes the fingerprints recorded by record_stat with the digest of their content. A digest is only
+        kept if the file's size and modification time matched the recorded ones before and after hashing, so
+        it never describes content newer than the recorded fingerprint.
+        """
+        with self._lock:
+            recorded = [(path, fp) for path, fp in self._fingerprints.items() if fp.digest is None]
+        for file_path, fingerprint in recorded:
+            try:
+                if not self._matches(file_path, fingerprint):
+                    continue
+                digest = hash_file(file_path, "blake2b")
+                if not self._matches(file_path, fingerprint):
+                    continue
+            except (OSError, FileReadError):
+                continue
+            with self._lock:
+                if self._fingerprints.get(file_path) == fingerprint:
+                    self._fingerprints[file_path] = Fingerprint(fingerprint.size, fingerprint.mtime_ns, digest)
+
+    @staticmethod
+    def _matches(file_path: Path, fingerprint: Fingerprint) -> bool:
+        stat = file_path.stat()
+        return (stat.st_size, stat.st_mtime_ns) == (fingerprint.size, fingerprint.mtime_ns)
+
+    def changed(self, file_path: Path) -> bool:
+        """
+        Checks whether the content of a file changed since the last call, and records its new fingerprint.
+        Files that cannot be read count as changed, so that the error is reported by their analysis.
+        """
+        key = file_path.absolute()
+        with self._lock:
+            previous = self._fingerprints.get(key)
+        try:
+            stat = file_path.stat()
+            if previous is not None and (stat.st_size, stat.st_mtime_ns) == (previous.size, previous.mtime_ns):
+                return False
+            digest = hash_file(file_path, "blake2b")
+        except (OSError, FileReadError):
+            with self._lock:
+                self._fingerprints.pop(key, None)
+            return True
+        with self._lock:
+            self._fingerprints[key] = Fingerprint(stat.st_size, stat.st_mtime_ns, digest)
+        return previous is None or previous.digest != digest
+
+
+class ChangeQueue:
+    """
+    Per-file trailing-edge debounce in front of a pool of analysis workers.
+
+    A changed file is handed to a worker once no further change to it has been reported for `debounce_seconds`
+    (or at the latest `_MAX_WAIT_DEBOUNCES` periods after its first change), so every burst of changes to a file
+    results in a single analysis. Files are queued at most once, the earliest due first, and a file is never
+    analyzed by two workers at the same time: a change reported during its analysis queues it again.
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Path], None],
+        workers: int = DEFAULT_WATCH_WORKERS,
+        debounce_seconds: float = DEFAULT_WATCH_DEBOUNCE_SECONDS,
+    ) -> None:
+        """
+        Args:
+            callback: Function analyzing a changed file, called on a worker thread
+            workers: Number of worker threads
+            debounce_seconds: Quiet period after the last change to a file before it is analyzed
+        """
+        self.callback = callback
+        self.workers = max(1, workers)
+        self.debounce_seconds = debounce_seconds
+        self._condition = threading.Condition()
+        # Due time and time of the first change of every file waiting to be analyzed
+        self._due: dict[Path, float] = {}
+        self._first_change: dict[Path, float] = {}
+        self._running: set[Path] = set()
+        self._held = 0
+        self._stopping = False
+        self._threads: list[threading.Thread] = []
+
+    def submit(self, file_path: Path) -> None:
+        """
+        Reports a change to a file, (re)starting its debounce period. Safe to call from any thread.
+        """
+        now = time.monotonic()
+        with self._condition:
+            first_change = self._first_change.setdefault(file_path, now)
+            self._due[file_path] = min(
+                now + self.debounce_seconds,
+                first_change + _MAX_WAIT_DEBOUNCES * self.debounce_seconds,
+            )
+            metrics.set_gauge("watch queue depth", len(self._due))
+            self._condition.notify()
+
+    def pending(self) -> int:
+        """
+        Returns the number of files waiting to be analyzed or being analyzed.
+        """
+        with self._condition:
+            return len(self._due.keys() | self._running)
+
+    def start(self) -> None:
+        with self._condition:
+            self._stopping = False
+        self._threads = [
+            threading.Thread(target=self._work, name=f"kratio-watch-{i}", daemon=True) for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the workers after their current analysis; files still waiting are dropped.
+        """
+        with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join()
+        self._threads = []
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """
+        Keeps the workers from starting analyses for the duration of the block, e.g. during the initial
+        analysis. Changes are still collected and debounced meanwhile.
+        """
+        with self._condition:
+            self._held += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._held -= 1
+                self._condition.notify_all()
+
+    def _take(self) -> Path | None:
+        """
+        Waits until a file is due and not being analyzed, and takes it. Returns None when stopping.
+        """
+        with self._condition:
+            while not self._stopping:
+                waiting = {path: due for path, due in self._due.items() if path not in self._running}
+                timeout = None
+                if waiting and not self._held:
+                    file_path = min(waiting, key=waiting.__getitem__)
+                    timeout = waiting[file_path] - time.monotonic()
+                    if timeout <= 0:
+                        del self._due[file_path], self._first_change[file_path]
+                        self._running.add(file_path)
+                        return file_path
+                self._condition.wait(timeout)
+            return None
+
+    def _work(self) -> None:
+        while (file_path := self._take()) is not None:
+            try:
+                self.callback(file_path)
+            except Exception as e:
+                logger.exception(f"Unexpected error analyzing {file_path}: {e}")
+            finally:
+                with self._condition:
+                    self._running.discard(file_path)
+                    self._condition.notify_all()
 
 
 class KratioEventHandler(FileSystemEventHandler):
@@ -26,20 +256,22 @@ class KratioEventHandler(FileSystemEventHandler):
         callback: Callable[[Path], None],
         supported_extensions: list[str] = SUPPORTED_EXTENSIONS,
         target_path: str | Path | None = None,
+        accept: Callable[[Path], bool] | None = None,
     ) -> None:
         """
         Initialize the event handler.
 
         Args:
-            callback: Function to call when a relevant file change is detected
+            callback: Function to call when a relevant file change is detected, on the observer thread;
+                it should return quickly, e.g. ChangeQueue.submit
             supported_extensions: List of file extensions to monitor
             target_path: Specific file to monitor (if not a directory)
+            accept: Further filter of the files, e.g. the ignore rules of the directory scan
         """
         self.callback = callback
         self.supported_extensions = supported_extensions
         self.target_path = Path(target_path) if target_path else None
-        self.last_processed_time = 0
-        self.debounce_seconds = 0.1  # Reduced debounce time to be more responsive
+        self.accept = accept
         logger.debug(f"Initialized event handler with target_path: {self.target_path}")
 
     def on_modified(self, event: FileSystemEvent) -> None:
@@ -50,11 +282,6 @@ class KratioEventHandler(FileSystemEventHandler):
         if event.is_directory:
             return
 
-        # Debounce to avoid multiple rapid triggers
-        current_time = time.time()
-        if current_time - self.last_processed_time < self.debounce_seconds:
-            return
-
         # Get the path of the modified file
         file_path = Path(str(event.src_path))
         logger.debug(f"Modified event for: {file_path}")
@@ -69,25 +296,49 @@ class KratioEventHandler(FileSystemEventHandler):
                 return
 
         # Check if the file has a supported extension
-        if file_path.suffix in self.supported_extensions:
-            logger.info(f"Change detected in {file_path}")
-            self.last_processed_time = current_time
-            self.callback(file_path)
-        else:
+        if file_path.suffix not in self.supported_extensions:
             logger.debug(f"Ignoring file with unsupported extension: {file_path.suffix}")
+        elif self._is_accepted(file_path):
+            logger.debug(f"Change detected in {file_path}")
+            self.callback(file_path)
+
+    def _is_accepted(self, file_path: Path) -> bool:
+        if self.accept is None or self.accept(file_path):
+            return True
+        logger.debug(f"Ignoring file excluded from the scan: {file_path}")
+        return False
+
+    def _is_watched(self, file_path: Path) -> bool:
+        if self.target_path and self.target_path.absolute() != file_path.absolute():
+            return False
+        return file_path.suffix in self.supported_extensions and self._is_accepted(file_path)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        """
+        Called when a file or directory is deleted.
+        The callback is called with the deleted file, so that what is kept about it can be dropped.
+        """
+        if event.is_directory:
+            return
+
+        file_path = Path(str(event.src_path))
+        if self._is_watched(file_path):
+            logger.debug(f"File deleted: {file_path}")
+            self.callback(file_path)
 
     def on_moved(self, event: FileSystemEvent) -> None:
         """
         Called when a file or directory is moved/renamed.
         This is important because some editors save files by creating a new one and moving it.
+        The callback is called with the source too, as the file no longer exists there.
         """
         if event.is_directory:
             return
 
-        # Debounce to avoid multiple rapid triggers
-        current_time = time.time()
-        if current_time - self.last_processed_time < self.debounce_seconds:
-            return
+        src_path = Path(str(event.src_path))
+        if self._is_watched(src_path):
+            logger.debug(f"File moved away from {src_path}")
+            self.callback(src_path)
 
         # Get the destination path
         dest_path = Path(str(event.dest_path)) if hasattr(event, "dest_path") else None
@@ -104,9 +355,8 @@ class KratioEventHandler(FileSystemEventHandler):
                 return
 
         # Check if the file has a supported extension
-        if dest_path.suffix in self.supported_extensions:
-            logger.info(f"File moved/renamed to {dest_path}")
-            self.last_processed_time = current_time
+        if dest_path.suffix in self.supported_extensions and self._is_accepted(dest_path):
+            logger.debug(f"File moved/renamed to {dest_path}")
             self.callback(dest_path)
 
     def on_created(self, event: FileSystemEvent) -> None:
@@ -131,12 +381,11 @@ class KratioEventHandler(FileSystemEventHandler):
                 return
 
         # Check if the file has a supported extension
-        if file_path.suffix in self.supported_extensions:
-            logger.info(f"New file detected: {file_path}")
-            self.last_processed_time = time.time()
-            self.callback(file_path)
-        else:
+        if file_path.suffix not in self.supported_extensions:
             logger.debug(f"Ignoring created file with unsupported extension: {file_path.suffix}")
+        elif self._is_accepted(file_path):
+            logger.debug(f"New file detected: {file_path}")
+            self.callback(file_path)
 
 
 class FileWatcher:
@@ -148,6 +397,8 @@ class FileWatcher:
         """Initialize the file watcher."""
         self.observer = None
         self.handler = None
+        self.queue: ChangeQueue | None = None
+        self.fingerprints = FileFingerprints()
         self.watching = False
 
     def start_watching(
@@ -155,14 +406,30 @@ class FileWatcher:
         path: str | Path,
         callback: Callable[[Path], None],
         supported_extensions: list[str] | None = None,
+        workers: int = DEFAULT_WATCH_WORKERS,
+        debounce_seconds: float = DEFAULT_WATCH_DEBOUNCE_SECONDS,
+        polling: bool = False,
+        poll_interval: float = DEFAULT_WATCH_POLL_INTERVAL_SECONDS,
+        exclude: Iterable[str] = (),
+        use_ignore_files: bool = True,
+        prune: bool = True,
     ) -> None:
         """
         Start watching a file or directory for changes.
 
         Args:
             path: Path to the file or directory to watch
-            callback: Function to call when a relevant file change is detected
+            callback: Function to call with each changed file once its changes have settled, on one of the
+                worker threads
             supported_extensions: List of file extensions to monitor (defaults to SUPPORTED_EXTENSIONS)
+            workers: Number of threads analyzing changed files
+            debounce_seconds: Quiet period after the last change to a file before it is analyzed
+            polling: Whether to detect changes by polling with stat calls rather than from file system events;
+                polling is also used when file system events are unavailable
+            poll_interval: Seconds between two polls
+            exclude: Extra ignore patterns of a watched directory, see iter_files
+            use_ignore_files: Whether to honor the .gitignore and .kratioignore files of a watched directory
+            prune: Whether to skip DEFAULT_IGNORED_DIRECTORIES and virtual environments in a watched directory
         """
         if self.watching:
             self.stop_watching()
@@ -176,14 +443,55 @@ class FileWatcher:
         watch_path = path_obj if is_dir else path_obj.parent
         target_file = None if is_dir else path_obj
 
-        # Create the event handler
         extensions = supported_extensions or SUPPORTED_EXTENSIONS
-        self.handler = KratioEventHandler(callback, extensions, target_file if target_file else None)
+        # Fingerprint the files before they are first analyzed, so a change made meanwhile is not mistaken
+        # for a save without changes. The files of a directory are recorded by the scan of its initial analysis
+        # instead (with fingerprints.record_stat), so the tree is not walked twice
+        if target_file:
+            self.fingerprints.record_stat(target_file)
+            self._hash_fingerprints()
+
+        def analyze_if_changed(file_path: Path) -> None:
+            if self.fingerprints.changed(file_path):
+                callback(file_path)
+            else:
+                logger.debug(f"Skipping {file_path}: content unchanged")
+                metrics.increment("unchanged files skipped")
+
+        # Changes are debounced and analyzed on worker threads, so the observer thread only queues them
+        self.queue = ChangeQueue(analyze_if_changed, workers, debounce_seconds)
+        self.queue.start()
+        # Changes in a directory are filtered with the rules of its scan, so that e.g. an npm install or a
+        # virtual environment never adds files the initial analysis left out
+        accept = (
+            partial(
+                is_scanned,
+                watch_path,
+                supported_extensions=extensions,
+                exclude=tuple(exclude),
+                use_ignore_files=use_ignore_files,
+                prune=prune,
+            )
+            if is_dir
+            else None
+        )
+        self.handler = KratioEventHandler(self.queue.submit, extensions, target_file, accept)
 
         # Create and start the observer
-        self.observer = Observer()
-        self.observer.schedule(self.handler, str(watch_path), recursive=is_dir)
-        self.observer.start()
+        def start_observer(observer: BaseObserver) -> BaseObserver:
+            observer.schedule(self.handler, str(watch_path), recursive=is_dir)
+            observer.start()
+            return observer
+
+        if polling:
+            self.observer = start_observer(PollingObserver(timeout=poll_interval))
+        else:
+            try:
+                self.observer = start_observer(Observer())
+            except OSError as e:
+                # e.g. the inotify watch or instance limit is reached
+                logger.warning(f"File system events are unavailable ({e}); polling for changes instead")
+                self.observer = start_observer(PollingObserver(timeout=poll_interval))
         self.watching = True
 
         logger.info(f"Watching {'directory' if is_dir else 'file'}: {path}")
@@ -191,11 +499,31 @@ class FileWatcher:
             logger.info(f"Target file absolute path: {path_obj.absolute()}")
         logger.info("Press Ctrl+C to stop watching")
 
+    def _hash_fingerprints(self) -> None:
+        threading.Thread(target=self.fingerprints.hash_recorded, name="kratio-fingerprints", daemon=True).start()
+
+    @contextmanager
+    def hold_changes(self) -> Iterator[None]:
+        """
+        Defers the analysis of changed files until the end of the block, e.g. during the initial analysis.
+        The files recorded meanwhile with fingerprints.record_stat are hashed in the background afterwards.
+        """
+        try:
+            if self.queue is None:
+                yield
+            else:
+                with self.queue.hold():
+                    yield
+        finally:
+            self._hash_fingerprints()
+
     def stop_watching(self) -> None:
         """Stop watching and clean up resources."""
         if self.observer and self.watching:
             self.observer.stop()
             self.observer.join()
+            if self.queue is not None:
+                self.queue.stop()
             self.watching = False
             logger.info("Stopped watching")
 
@@ -73,3 +73,10 @@ def persist_plot(fig: Figure, save_path: str) -> None:
         save_path (str): The file path to save the figure to.
     """
     fig.savefig(save_path)
+
+
+def close_plots() -> None:
+    """
+    Closes every open matplotlib Figure once it has been saved or displayed, releasing its memory.
+    """
+    plt.close("all")
@@ -6,6 +6,7 @@ import pandas as pd
 
 from kratio.cli.controller import KratioController
 from kratio.constants import ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
+from kratio.io.cache import DocCache, ResultCache
 from kratio.io.serializer import Serializer
 
 
@@ -69,3 +70,262 @@ def test_complete_analysis_pipeline():
         noun_output_path = Path(str(temp_output_path).replace(".csv", "_noun.csv"))
         if noun_output_path.exists():
             noun_output_path.unlink()
+
+
+def test_watched_corpus_is_updated_per_file(tmp_path):
+    """
+    Tests that in watch mode with --aggregate, re-analyzed and removed files replace their counts in the
+    corpus results, which are written to --output by refresh_corpus.
+    """
+    # Arrange
+    (tmp_path / "a.txt").write_text("A cat will chase a mouse.", encoding="utf-8")
+    (tmp_path / "b.txt").write_text("The cat will sleep.", encoding="utf-8")
+    output_path = tmp_path / "out" / "corpus.csv"
+    args = Namespace(
+        path=str(tmp_path),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        aggregate=True,
+        watch=True,
+        top_n=5,
+        output=str(output_path),
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+        snapshot_interval=3600,
+    )
+    controller = KratioController(serializer=Serializer())
+    controller.watch_corpus()
+
+    def written_frequencies():
+        df = pd.read_csv(output_path)
+        return dict(zip(df["Keyword"], df["WordFrequency"], strict=True))
+
+    # Act
+    controller.run_analysis(args)
+    initial = written_frequencies()
+    (tmp_path / "a.txt").write_text("A dog will chase a cat.", encoding="utf-8")
+    controller.reanalyze_file(tmp_path / "a.txt", args)
+    (tmp_path / "b.txt").unlink()
+    controller.forget_file(tmp_path / "b.txt")
+    controller.refresh_corpus(args)
+    throttled = written_frequencies()
+    controller.refresh_corpus(args, flush=True)
+
+    # Assert
+    assert initial == {"cat": 2, "chase": 1, "mouse": 1, "sleep": 1}
+    assert throttled == initial
+    assert written_frequencies() == {"cat": 1, "chase": 1, "dog": 1}
+
+
+def test_directory_results_are_streamed_to_one_output(tmp_path):
+    """
+    Tests that analyzing a directory writes the results of every file to --output, instead of each file
+    replacing the last, and to one file per analyzed file with --output-template.
+    """
+    # Arrange
+    corpus = tmp_path / "corpus"
+    (corpus / "sub").mkdir(parents=True)
+    (corpus / "a.txt").write_text("A cat will chase a mouse.", encoding="utf-8")
+    (corpus / "sub" / "b.txt").write_text("The dog will sleep.", encoding="utf-8")
+    output_path = tmp_path / "results.ndjson"
+    args = Namespace(
+        path=str(corpus),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        top_n=5,
+        output=str(output_path),
+        output_template=str(tmp_path / "per-file" / "{parent}" / "{stem}.csv"),
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+
+    # Act
+    KratioController(serializer=Serializer()).run_analysis(args)
+
+    # Assert
+    rows = pd.read_json(output_path, lines=True)
+    assert sorted(set(rows["source_file"])) == [str(corpus / "a.txt"), str(corpus / "sub" / "b.txt")]
+    assert set(rows["Keyword"]) == {"cat", "chase", "mouse", "dog", "sleep"}
+    assert set(pd.read_csv(tmp_path / "per-file" / "sub" / "b.csv")["Keyword"]) == {"dog", "sleep"}
+    assert (tmp_path / "per-file" / "a.csv").exists()
+
+
+def test_cached_results_of_duplicate_files_stay_with_their_files(tmp_path):
+    """
+    Tests that files with the same content in one directory run get their own results, both when they are
+    first analyzed and when they are served from the result cache, and that no file gets the counts of another.
+    """
+    # Arrange
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("apple apple", encoding="utf-8")
+    (corpus / "b.txt").write_text("apple apple", encoding="utf-8")
+    (corpus / "c.txt").write_text("zebra giraffe", encoding="utf-8")
+    output_path = tmp_path / "results.csv"
+    args = Namespace(
+        path=str(corpus),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        top_n=5,
+        output=str(output_path),
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+
+    def written_keywords():
+        rows = pd.read_csv(output_path)
+        return {Path(source).name: set(group["Keyword"]) for source, group in rows.groupby("source_file")}
+
+    # Act
+    KratioController(serializer=Serializer(), cache=ResultCache(tmp_path / "cache")).run_analysis(args)
+    first_run = written_keywords()
+    KratioController(serializer=Serializer(), cache=ResultCache(tmp_path / "cache")).run_analysis(args)
+
+    # Assert
+    expected = {"a.txt": {"apple"}, "b.txt": {"apple"}, "c.txt": {"zebra", "giraffe"}}
+    assert first_run == expected
+    assert written_keywords() == expected
+
+
+def test_parsed_docs_of_duplicate_files_stay_with_their_files(tmp_path):
+    """
+    Tests that files with the same content in one directory run get their own results with the parse cache,
+    both when they are first parsed and when their Docs are loaded from the cache.
+    """
+    # Arrange
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("The apple is red.", encoding="utf-8")
+    (corpus / "b.txt").write_text("The apple is red.", encoding="utf-8")
+    (corpus / "c.txt").write_text("A zebra runs.", encoding="utf-8")
+    output_path = tmp_path / "results.csv"
+    args = Namespace(
+        path=str(corpus),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        top_n=5,
+        output=str(output_path),
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+
+    def written_keywords():
+        rows = pd.read_csv(output_path)
+        return {Path(source).name: set(group["Keyword"]) for source, group in rows.groupby("source_file")}
+
+    # Act
+    KratioController(serializer=Serializer(), doc_cache=DocCache(tmp_path / "cache")).run_analysis(args)
+    first_run = written_keywords()
+    KratioController(serializer=Serializer(), doc_cache=DocCache(tmp_path / "cache")).run_analysis(args)
+
+    # Assert
+    assert first_run["a.txt"] == first_run["b.txt"]
+    assert "zebra" not in first_run["a.txt"]
+    assert "apple" not in first_run["c.txt"]
+    assert written_keywords() == first_run
+
+
+def test_result_cache_depends_on_decode_errors(tmp_path):
+    """
+    Tests that a file analyzed with one --decode-errors setting is not served from the result cache
+    when it is analyzed again with another one.
+    """
+    # Arrange
+    file_path = tmp_path / "text.txt"
+    file_path.write_bytes(b"caf\xffe caf\xffe")
+    output_path = tmp_path / "results.csv"
+    args = Namespace(
+        path=str(file_path),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        decode_errors="replace",
+        top_n=5,
+        output=str(output_path),
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+    controller = KratioController(serializer=Serializer(), cache=ResultCache(tmp_path / "cache"))
+
+    # Act
+    controller.run_analysis(args)
+    replaced = set(pd.read_csv(output_path)["Keyword"])
+    args.decode_errors = "skip"
+    controller.run_analysis(args)
+
+    # Assert
+    assert "cafe" not in replaced
+    assert set(pd.read_csv(output_path)["Keyword"]) == {"cafe"}
+
+
+def test_scan_listener_receives_the_scanned_files(tmp_path):
+    """
+    Tests that the scan listener, which fingerprints the files of a watched directory, is called with exactly
+    the files the directory scan yields, honoring --exclude.
+    """
+    # Arrange
+    corpus = tmp_path / "corpus"
+    (corpus / "drafts").mkdir(parents=True)
+    (corpus / "a.txt").write_text("A cat will chase a mouse.", encoding="utf-8")
+    (corpus / "drafts" / "b.txt").write_text("The dog will sleep.", encoding="utf-8")
+    args = Namespace(
+        path=str(corpus),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        exclude=["drafts/"],
+        top_n=5,
+        output=None,
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+    controller = KratioController(serializer=Serializer())
+    scanned = []
+    controller.scan_listener = scanned.append
+
+    # Act
+    controller.run_analysis(args)
+
+    # Assert
+    assert scanned == [corpus / "a.txt"]
+
+
+def test_result_cache_counts_misses_then_hits(tmp_path):
+    """
+    Tests that a cold run counts a miss for every file and analysis type, and a warm run a hit for each.
+    """
+    # Arrange
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    (corpus / "a.txt").write_text("A cat will chase a mouse.", encoding="utf-8")
+    (corpus / "b.txt").write_text("The dog will sleep.", encoding="utf-8")
+    args = Namespace(
+        path=str(corpus),
+        analysis_type=ANALYSIS_TYPE_WORDS,
+        engine="fast",
+        top_n=5,
+        output=None,
+        save_plot=None,
+        no_visualization=True,
+        format="csv",
+        silent=True,
+    )
+
+    def run_stats():
+        cache = ResultCache(tmp_path / "cache")
+        KratioController(serializer=Serializer(), cache=cache).run_analysis(args)
+        stats = cache.stats()
+        return stats["hits"], stats["misses"]
+
+    # Act & Assert
+    assert run_stats() == (0, 2)
+    assert run_stats() == (2, 0)
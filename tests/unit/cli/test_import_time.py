@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+# Generous budget for `import kratio.cli.cli`, in microseconds (it takes well under 200 ms on a laptop)
+IMPORT_TIME_BUDGET_US = 750_000
+
+HEAVY_MODULES = ("spacy", "pandas", "numpy", "matplotlib", "seaborn", "tabulate", "importlib.metadata")
+
+
+def _import_times(module: str) -> dict[str, int]:
+    """
+    Imports a module in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        dict[str, int]: The cumulative import time in microseconds of every module that was imported
+    """
+    command = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    # The first run may compile bytecode, so only the second one is measured
+    subprocess.run(command, check=True, capture_output=True)  # noqa: S603
+    result = subprocess.run(command, check=True, capture_output=True, text=True)  # noqa: S603
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_stays_light():
+    """Test that importing the CLI entry point loads no heavy dependency and stays within the time budget."""
+    times = _import_times("kratio.cli.cli")
+
+    assert not [module for module in HEAVY_MODULES if module in times]
+    assert times["kratio.cli.cli"] < IMPORT_TIME_BUDGET_US
+
+
+@pytest.mark.parametrize("module", ["kratio.cli.controller", "kratio.cli.server"])
+def test_analysis_modules_do_not_import_plotting_or_spacy(module):
+    """Test that plotting libraries and spaCy are only imported when a plot is drawn or a model is loaded."""
+    times = _import_times(module)
+
+    assert not [name for name in ("spacy", "matplotlib", "seaborn", "tabulate") if name in times]
@@ -0,0 +1,153 @@
+import argparse
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from loguru import logger
+
+from kratio.cli.client import default_socket_path, forward_to_server
+from kratio.cli.server import AnalysisServer, run_request
+from kratio.exceptions import FileProcessingError
+
+
+def make_args(**overrides: object) -> argparse.Namespace:
+    """Builds CLI arguments for a run that can be forwarded to a server."""
+    values = {
+        "path": "text.txt",
+        "analysis_type": "words",
+        "top_n": 3,
+        "output": None,
+        "save_plot": None,
+        "no_visualization": True,
+        "format": "table",
+        "watch": False,
+        "no_server": False,
+        "silent": False,
+        "debug": False,
+        "no_cache": True,
+        "cache_dir": None,
+        "cache_max_size": 1,
+        "parse_cache": False,
+        "parse_cache_max_size": 1,
+    }
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def fake_run_analysis(args):
+    print(f"results for {args.path}")
+    logger.info("analysis done")
+
+
+def test_run_request_captures_output_and_exit_code():
+    """Test that printed output and log messages of a run are returned to the client."""
+    controller = MagicMock()
+    controller.run_analysis.side_effect = fake_run_analysis
+
+    response = run_request(controller, make_args())
+
+    assert response["stdout"] == "results for text.txt\n"
+    assert "analysis done" in response["log"]
+    assert response["exit_code"] == 0
+    assert controller.collected_results is None
+
+
+def test_run_request_maps_errors_to_cli_exit_codes():
+    """Test that a processing error gives the same exit code as the CLI."""
+    controller = MagicMock()
+    controller.run_analysis.side_effect = FileProcessingError("broken file")
+
+    response = run_request(controller, make_args(silent=True))
+
+    assert response["exit_code"] == 2
+    assert response["log"] == ""
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [{"watch": True}, {"no_server": True}, {"no_visualization": False}],
+)
+def test_forward_to_server_runs_locally_when_not_forwardable(tmp_path, overrides):
+    """Test that watch mode, --no-server and interactive plots are never forwarded."""
+    socket_path = tmp_path / "kratio.sock"
+    socket_path.touch()
+
+    assert forward_to_server(make_args(**overrides), socket_path) is None
+
+
+def test_forward_to_server_without_server_runs_locally(tmp_path):
+    """Test that a missing or stale socket falls back to a local run."""
+    assert forward_to_server(make_args(), tmp_path / "missing.sock") is None
+
+    stale_socket = tmp_path / "stale.sock"
+    stale_socket.touch()
+    assert forward_to_server(make_args(), stale_socket) is None
+
+
+def test_forward_to_server_round_trip(tmp_path, capsys):
+    """Test that a forwarded run is analyzed by the server with absolute paths and its output is printed."""
+    socket_path = tmp_path / "kratio.sock"
+    controller = MagicMock()
+    controller.run_analysis.side_effect = fake_run_analysis
+    with AnalysisServer(socket_path) as server:
+        server.get_controller = MagicMock(return_value=controller)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+
+        args = make_args(silent=True, output_template="results/{parent}/{stem}.csv")
+        exit_code = forward_to_server(args, socket_path)
+        thread.join(timeout=5)
+
+    assert exit_code == 0
+    assert capsys.readouterr().out.endswith("text.txt\n")
+    forwarded = controller.run_analysis.call_args.args[0]
+    assert forwarded.path.startswith("/")
+    assert forwarded.output_template == str(Path.cwd() / "results" / "{parent}" / "{stem}.csv")
+    assert not socket_path.exists()
+
+
+def test_forward_to_server_ignores_sockets_writable_by_others(tmp_path):
+    """Test that a socket other users can write to, e.g. one they created first, never receives a run."""
+    socket_path = tmp_path / "kratio.sock"
+    with AnalysisServer(socket_path) as server:
+        server.get_controller = MagicMock()
+        server.timeout = 1
+        socket_path.chmod(0o777)
+        thread = threading.Thread(target=server.handle_request)
+        thread.start()
+
+        exit_code = forward_to_server(make_args(silent=True), socket_path)
+        thread.join(timeout=5)
+
+    assert exit_code is None
+    server.get_controller.assert_not_called()
+
+
+def test_default_socket_path_prefers_the_runtime_directory(tmp_path, monkeypatch):
+    """Test that the socket is placed in $XDG_RUNTIME_DIR rather than the shared temporary directory."""
+    monkeypatch.delenv("KRATIO_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+
+    assert default_socket_path() == tmp_path / "kratio.sock"
+
+
+def test_server_runs_use_the_lemma_table_of_each_request(tmp_path):
+    """Test that a server analyzing with the fast engine lemmatizes each request with its own --lemma-table."""
+    text_path = tmp_path / "text.txt"
+    text_path.write_text("apples apples", encoding="utf-8")
+    tables = []
+    for lemma in ("zzzapple", "qqqapple"):
+        tables.append(tmp_path / f"{lemma}.json")
+        tables[-1].write_text(f'{{"apples": "{lemma}"}}', encoding="utf-8")
+
+    with AnalysisServer(tmp_path / "kratio.sock") as server:
+        responses = []
+        for table in tables:
+            args = make_args(path=str(text_path), engine="fast", lemma_table=str(table), silent=True)
+            responses.append(run_request(server.get_controller(args), args))
+
+    assert [response["exit_code"] for response in responses] == [0, 0]
+    assert "zzzapple" in str(responses[0]["results"])
+    assert "qqqapple" in str(responses[1]["results"])
+    assert "zzzapple" not in str(responses[1]["results"])
@@ -0,0 +1,62 @@
+from collections import Counter
+
+import pytest
+
+from kratio.constants import ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
+from kratio.core.aggregate import CorpusCounts
+
+
+def test_corpus_counts_merge_frequency_and_document_frequency():
+    """
+    Tests that corpus results sum term frequencies and count the documents each term occurs in.
+    """
+    # Arrange
+    corpus = CorpusCounts()
+
+    # Act
+    corpus.add({ANALYSIS_TYPE_WORDS: Counter({"apple": 3, "pear": 1})})
+    corpus.add({ANALYSIS_TYPE_WORDS: Counter({"apple": 1, "plum": 4})})
+    corpus.add({ANALYSIS_TYPE_WORDS: Counter()})
+    df = corpus.to_dataframes()[ANALYSIS_TYPE_WORDS]
+
+    # Assert
+    assert corpus.documents == 3
+    assert list(df.columns) == ["WordFrequency", "WordDensity", "WordDocumentFrequency"]
+    assert list(df.index) == ["apple", "plum", "pear"]
+    assert df.loc["apple", "WordFrequency"] == 4
+    assert df.loc["apple", "WordDensity"] == pytest.approx(400 / 9)
+    assert df.loc["apple", "WordDocumentFrequency"] == 2
+    assert df.loc["plum", "WordDocumentFrequency"] == 1
+
+
+def test_corpus_counts_top_n_keeps_document_frequency():
+    """
+    Tests that limiting corpus results to the top N terms keeps their document frequencies.
+    """
+    corpus = CorpusCounts()
+    corpus.add({ANALYSIS_TYPE_NOUN_CHUNKS: Counter({"the red car": 2, "a road": 1})})
+    corpus.add({ANALYSIS_TYPE_NOUN_CHUNKS: Counter({"the red car": 1})})
+
+    df = corpus.to_dataframes(top_n=1)[ANALYSIS_TYPE_NOUN_CHUNKS]
+
+    assert list(df.index) == ["the red car"]
+    assert df.loc["the red car", "NounChunkDocumentFrequency"] == 2
+    assert df.loc["the red car", "NounChunkDensity"] == pytest.approx(75.0)
+
+
+def test_corpus_counts_remove_takes_back_a_document():
+    """
+    Tests that replacing the counts of a document gives the same results as counting the new version only.
+    """
+    corpus = CorpusCounts()
+    corpus.add({ANALYSIS_TYPE_WORDS: Counter({"apple": 3, "pear": 1})})
+    old = {ANALYSIS_TYPE_WORDS: Counter({"apple": 1, "plum": 4})}
+    corpus.add(old)
+
+    corpus.remove(old)
+    corpus.add({ANALYSIS_TYPE_WORDS: Counter({"apple": 2, "fig": 1})})
+
+    assert corpus.documents == 2
+    assert corpus.term_counts[ANALYSIS_TYPE_WORDS] == Counter({"apple": 5, "pear": 1, "fig": 1})
+    assert corpus.document_frequencies[ANALYSIS_TYPE_WORDS] == Counter({"apple": 2, "pear": 1, "fig": 1})
+    assert "plum" not in corpus.to_dataframes()[ANALYSIS_TYPE_WORDS].index
@@ -1,10 +1,19 @@
+from collections import Counter
 from unittest.mock import patch
 
 import pandas as pd
 import pytest
 
 # Import the function to be tested
-from kratio.core.analyzer import analyze_text_noun_chunks, analyze_text_words
+from kratio.constants import ANALYSIS_TYPE_ALL, ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
+from kratio.core.analyzer import (
+    analyze_chunked_texts,
+    analyze_text_noun_chunks,
+    analyze_text_words,
+    analyze_texts,
+    counts_to_dataframes,
+    get_analysis_types,
+)
 
 
 @pytest.fixture
@@ -171,3 +180,76 @@ def test_analyze_text_noun_chunks_empty_string(mock_noun_chunk_analyzer_analyze)
     # Assert
     mock_noun_chunk_analyzer_analyze.assert_called_once_with(text)
     pd.testing.assert_frame_equal(df, expected_df)
+
+
+@pytest.fixture
+def mock_combined_analyzer():
+    """
+    Mocks the combined analyzer so that each "doc" is its text and counts are its whitespace-split words.
+    """
+    with patch("kratio.core.analyzer.get_combined_analyzer") as mock_get_analyzer:
+        mock_analyzer = mock_get_analyzer.return_value
+        mock_analyzer.nlp.pipe.side_effect = lambda items, as_tuples, batch_size: iter(list(items))
+        mock_analyzer.count_doc.side_effect = lambda doc: {ANALYSIS_TYPE_WORDS: Counter(doc.split())}
+        yield mock_get_analyzer
+
+
+def test_analyze_texts_batches_through_nlp_pipe(mock_combined_analyzer):
+    """
+    Tests that analyze_texts streams texts through nlp.pipe and pairs each result with its context.
+    """
+    # Arrange
+    texts = [("apple apple pear", "a.txt"), ("plum", "b.txt")]
+
+    # Act
+    results = list(analyze_texts(texts, ANALYSIS_TYPE_WORDS, batch_size=8))
+
+    # Assert
+    mock_combined_analyzer.assert_called_once_with(ANALYSIS_TYPE_WORDS)
+    _, kwargs = mock_combined_analyzer.return_value.nlp.pipe.call_args
+    assert kwargs == {"as_tuples": True, "batch_size": 8}
+    assert [context for context, _ in results] == ["a.txt", "b.txt"]
+    first_df = results[0][1][ANALYSIS_TYPE_WORDS]
+    assert first_df.loc["apple", "WordFrequency"] == 2
+    assert first_df.loc["pear", "WordDensity"] == pytest.approx(100 / 3)
+    assert list(results[1][1][ANALYSIS_TYPE_WORDS].index) == ["plum"]
+
+
+def test_analyze_chunked_texts_merges_counts_per_text(mock_combined_analyzer):
+    """
+    Tests that the counts of every chunk of a text are merged into one result for that text.
+    """
+    # Arrange
+    chunked_texts = [("big.txt", iter(["apple pear", "apple", "apple plum"])), ("empty.txt", iter([]))]
+
+    # Act
+    results = dict(analyze_chunked_texts(chunked_texts, ANALYSIS_TYPE_WORDS))
+
+    # Assert
+    big_df = results["big.txt"][ANALYSIS_TYPE_WORDS]
+    assert big_df.loc["apple", "WordFrequency"] == 3
+    assert big_df.loc["apple", "WordDensity"] == pytest.approx(60.0)
+    assert big_df["WordFrequency"].sum() == 5
+    assert results["empty.txt"][ANALYSIS_TYPE_WORDS].empty
+
+
+def test_get_analysis_types_expands_all():
+    """
+    Tests that the 'all' analysis type covers every registered analyzer.
+    """
+    assert get_analysis_types(ANALYSIS_TYPE_ALL) == [ANALYSIS_TYPE_WORDS, ANALYSIS_TYPE_NOUN_CHUNKS]
+    assert get_analysis_types(ANALYSIS_TYPE_WORDS) == [ANALYSIS_TYPE_WORDS]
+
+
+def test_counts_to_dataframes_keeps_top_n_with_full_densities():
+    """
+    Tests that selecting the top N terms keeps densities relative to all counted terms.
+    """
+    counts = {ANALYSIS_TYPE_WORDS: Counter({"pear": 1, "apple": 5, "plum": 3, "fig": 1})}
+
+    top = counts_to_dataframes(counts, top_n=2)[ANALYSIS_TYPE_WORDS]
+    full = counts_to_dataframes(counts)[ANALYSIS_TYPE_WORDS]
+
+    pd.testing.assert_frame_equal(top, full.head(2))
+    assert top.loc["apple", "WordDensity"] == pytest.approx(50.0)
+    assert list(full.index) == ["apple", "plum", "pear", "fig"]
@@ -0,0 +1,93 @@
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+import spacy
+
+from kratio.core.analyzer_interface import Analyzer
+from kratio.core.analyzers import CombinedAnalyzer, WordAnalyzer
+
+
+class LengthAnalyzer(Analyzer):
+    """Counts documents by length, standing in for a spaCy-based analyzer."""
+
+    required_components = ("tok2vec", "tagger")
+    index_name = "Length"
+    column_prefix = "Length"
+
+    def __init__(self, nlp=None) -> None:
+        self.nlp = nlp
+
+    def analyze(self, text):
+        return self.analyze_doc(self.nlp(text))
+
+    def count_doc(self, doc):
+        return Counter({str(len(doc)): 1})
+
+
+class FirstWordAnalyzer(LengthAnalyzer):
+    required_components = ("tagger", "parser")
+    index_name = "First Word"
+    column_prefix = "FirstWord"
+
+    def count_doc(self, doc):
+        return Counter({doc.split()[0]: 2})
+
+
+def test_combined_analyzer_runs_every_analyzer_on_one_parse():
+    """
+    Tests that CombinedAnalyzer parses the text once and derives every result from that parse.
+    """
+    # Arrange
+    nlp = MagicMock(side_effect=lambda text: text)
+    analyzer = CombinedAnalyzer({"length": LengthAnalyzer, "first": FirstWordAnalyzer}, nlp=nlp)
+
+    # Act
+    results = analyzer.analyze("hello world")
+
+    # Assert
+    nlp.assert_called_once_with("hello world")
+    assert list(results) == ["length", "first"]
+    assert results["length"].loc["11", "LengthFrequency"] == 1
+    assert results["first"].loc["hello", "FirstWordDensity"] == pytest.approx(100.0)
+    assert results["first"].index.name == "First Word"
+
+
+def test_combined_analyzer_requires_union_of_components():
+    """
+    Tests that the combined pipeline profile covers the components of every analyzer.
+    """
+    analyzer = CombinedAnalyzer({"length": LengthAnalyzer, "first": FirstWordAnalyzer}, nlp=MagicMock())
+
+    assert analyzer.required_components == ("parser", "tagger", "tok2vec")
+
+
+def test_word_analyzer_counts_lemmas_from_token_arrays():
+    """
+    Tests that the array-based word count matches counting the lemmas of the tokens one by one.
+    """
+    # Arrange
+    nlp = spacy.blank("en")
+    doc = nlp("The Cats sat, the cat ran and CATS   slept.")
+    for token in doc:
+        token.lemma_ = {"Cats": "Cat", "CATS": "cat", "ran": "run", "   ": "  "}.get(token.text, token.text)
+    expected = Counter(
+        token.lemma_.lower() for token in doc if not token.is_stop and not token.is_punct and token.lemma_.strip()
+    )
+
+    # Act
+    counts = WordAnalyzer(nlp).count_doc(doc)
+
+    # Assert
+    assert counts == expected
+    assert counts["cat"] == 3
+    assert "the" not in counts
+    assert "," not in counts
+
+
+def test_word_analyzer_counts_empty_doc():
+    """
+    Tests that an empty document has no counts.
+    """
+    nlp = spacy.blank("en")
+    assert WordAnalyzer(nlp).count_doc(nlp("")) == Counter()
@@ -0,0 +1,86 @@
+import json
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+import spacy
+from spacy.lang.en.stop_words import STOP_WORDS
+
+from kratio.constants import ANALYSIS_TYPE_WORDS
+from kratio.core.analyzers import WordAnalyzer
+from kratio.core.fast_engine import FastWordAnalyzer, load_stop_words
+
+
+@pytest.fixture
+def lemma_table(tmp_path):
+    """
+    Pytest fixture writing a small lemma lookup table.
+
+    Returns:
+        Path: The path of the JSON table
+    """
+    table_path = tmp_path / "lemmas.json"
+    table_path.write_text(json.dumps({"cats": "cat", "Cats": "cat", "ran": "run", "mice": "mouse"}), encoding="utf-8")
+    return table_path
+
+
+def test_load_stop_words_matches_spacy():
+    """Test that the stop words read from spaCy's source file equal spaCy's English stop words."""
+    assert load_stop_words() == frozenset(STOP_WORDS)
+
+
+def test_count_doc_filters_stop_words_and_lemmatizes(lemma_table):
+    """Test that stop words and contraction suffixes are dropped and forms are looked up before lowercasing."""
+    analyzer = FastWordAnalyzer(lemma_table)
+
+    counts = analyzer.count_doc("The Cats ran, and the cats don't chase MICE. Cats' mice aren't scared!")
+
+    assert counts == Counter({"cat": 3, "run": 1, "chase": 1, "mouse": 1, "mice": 1, "scared": 1})
+
+
+def test_count_doc_agrees_with_word_analyzer(lemma_table):
+    """Test that the fast engine counts like WordAnalyzer on a spaCy parse with the same lookup lemmas."""
+    text = "Cats chase mice. The mice ran while cats slept; cats don't care, do they?"
+    analyzer = FastWordAnalyzer(lemma_table)
+    nlp = spacy.blank("en")
+    doc = nlp(text)
+    for token in doc:
+        token.lemma_ = analyzer.lemmas.get(token.text, token.text)
+
+    assert analyzer.count_doc(text) == WordAnalyzer(nlp).count_doc(doc)
+
+
+def test_count_texts_merges_chunks(lemma_table):
+    """Test that the counts of several chunks are merged under the words analysis type."""
+    analyzer = FastWordAnalyzer(lemma_table)
+
+    counts = analyzer.count_texts(["cats sleep", "Cats ran"])
+
+    assert counts == {ANALYSIS_TYPE_WORDS: Counter({"cat": 2, "sleep": 1, "run": 1})}
+
+
+def test_analyze_returns_word_dataframe(lemma_table):
+    """Test that results have the same columns and index as WordAnalyzer's."""
+    df = FastWordAnalyzer(lemma_table).analyze("cats cats mice")
+
+    assert list(df.columns) == ["WordFrequency", "WordDensity"]
+    assert df.index.name == "Keyword"
+    assert df.loc["cat", "WordDensity"] == pytest.approx(200 / 3)
+
+
+def test_fingerprint_depends_on_lemma_table(lemma_table, tmp_path):
+    """Test that changing the lemma table changes the cache fingerprint."""
+    other_table = tmp_path / "other.json"
+    other_table.write_text(json.dumps({"cats": "feline"}), encoding="utf-8")
+
+    assert FastWordAnalyzer(lemma_table).fingerprint() != FastWordAnalyzer(other_table).fingerprint()
+
+
+def test_fast_engine_does_not_import_spacy():
+    """Test that the CLI and the fast engine can count words without importing spaCy."""
+    code = (
+        "import sys; import kratio.cli.cli; from kratio.core.fast_engine import FastWordAnalyzer; "
+        "FastWordAnalyzer().count_doc('some text'); assert 'spacy' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)  # noqa: S603
@@ -0,0 +1,53 @@
+from collections import Counter
+
+from kratio.core.incremental import IncrementalCounts
+
+
+class RecordingCounter:
+    """Counts the words of paragraphs and records which paragraphs it was asked to count."""
+
+    def __init__(self) -> None:
+        self.counted: list[str] = []
+
+    def __call__(self, paragraphs: list[str]) -> list[dict[str, Counter[str]]]:
+        self.counted.extend(paragraphs)
+        return [{"words": Counter(paragraph.split())} for paragraph in paragraphs]
+
+
+def test_update_counts_only_changed_paragraphs():
+    """
+    Tests that an edit re-counts only the edited paragraph and updates the totals to match the new text.
+    """
+    # Arrange
+    counter = RecordingCounter()
+    counts = IncrementalCounts(["words"], counter)
+    counts.update(["apple pear", "plum plum", "fig"])
+    counter.counted.clear()
+
+    # Act
+    recounted = counts.update(["apple pear", "plum kiwi", "fig"])
+
+    # Assert
+    assert recounted == 1
+    assert counter.counted == ["plum kiwi"]
+    assert counts.totals == {"words": Counter({"apple": 1, "pear": 1, "plum": 1, "kiwi": 1, "fig": 1})}
+
+
+def test_update_handles_repeated_and_removed_paragraphs():
+    """
+    Tests that repeated paragraphs are counted once but weigh as often as they occur, and that removed
+    paragraphs leave no terms behind.
+    """
+    counter = RecordingCounter()
+    counts = IncrementalCounts(["words"], counter)
+
+    counts.update(["apple", "apple", "pear"])
+    assert counter.counted == ["apple", "pear"]
+    assert counts.totals["words"] == Counter({"apple": 2, "pear": 1})
+
+    counts.update(["apple"])
+    assert counts.totals["words"] == Counter({"apple": 1})
+    assert "pear" not in counts.totals["words"]
+
+    assert counts.update([]) == 0
+    assert counts.totals == {"words": Counter()}
@@ -0,0 +1,71 @@
+from collections import Counter
+from concurrent.futures import Future
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kratio.constants import ANALYSIS_TYPE_WORDS
+from kratio.core import parallel
+from kratio.core.parallel import count_files_parallel
+from kratio.exceptions import FileProcessingError
+
+
+class InlineExecutor:
+    """Runs submitted tasks synchronously and records the order in which they were submitted."""
+
+    def __init__(self, max_workers=None, initializer=None, initargs=()) -> None:
+        self.submitted = []
+        InlineExecutor.instance = self
+
+    def __enter__(self) -> "InlineExecutor":
+        return self
+
+    def __exit__(self, *exc_info: object) -> bool:
+        return False
+
+    def submit(self, fn, *args: object) -> Future:
+        self.submitted.append(args[0])
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_count_files_parallel_schedules_largest_first_and_preserves_order(tmp_path):
+    """
+    Tests that files are submitted largest first while results are yielded in input order.
+    """
+    # Arrange
+    small = tmp_path / "small.txt"
+    small.write_text("a")
+    large = tmp_path / "large.txt"
+    large.write_text("a" * 100)
+    medium = tmp_path / "medium.txt"
+    medium.write_text("a" * 10)
+    files = [small, large, medium]
+    counts = {
+        small: {ANALYSIS_TYPE_WORDS: Counter({"small": 1})},
+        large: {ANALYSIS_TYPE_WORDS: Counter({"large": 2})},
+        medium: {ANALYSIS_TYPE_WORDS: Counter({"medium": 3})},
+    }
+
+    with (
+        patch("kratio.core.parallel.ProcessPoolExecutor", InlineExecutor),
+        patch("kratio.core.parallel._count_file", side_effect=lambda path: counts[path]),
+    ):
+        # Act
+        results = list(count_files_parallel(files, ANALYSIS_TYPE_WORDS, workers=2))
+
+    # Assert
+    assert InlineExecutor.instance.submitted == [large, medium, small]
+    assert [file_path for file_path, _ in results] == files
+    assert [file_counts for _, file_counts in results] == [counts[small], counts[large], counts[medium]]
+
+
+def test_count_file_wraps_read_errors(tmp_path):
+    """
+    Tests that read failures inside a worker surface as FileProcessingError.
+    """
+    analyzer = MagicMock()
+    analyzer.nlp.pipe.side_effect = lambda chunks, batch_size: list(chunks)
+    with patch.object(parallel, "_worker_analyzer", analyzer), pytest.raises(FileProcessingError):
+        parallel._count_file(tmp_path / "missing.txt")
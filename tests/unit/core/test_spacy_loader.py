@@ -67,3 +67,48 @@ def test_get_nlp_exits_on_download_failure():
         mock_spacy_download.assert_called_once_with(SpacyModelLoader._model_name)
         mock_logger_exception.assert_called_once()
         assert SpacyModelLoader._nlp is None  # Ensure _nlp remains None on failure
+
+
+def test_get_nlp_builds_and_caches_component_profiles():
+    # Reset the cached profiles before the test to ensure isolation
+    SpacyModelLoader._profiles = {}
+    # Arrange
+    words_nlp = MagicMock()
+    chunks_nlp = MagicMock()
+    with patch("spacy.load", side_effect=[words_nlp, chunks_nlp]) as mock_spacy_load:
+        # Act
+        first = SpacyModelLoader.get_nlp(("tagger", "lemmatizer"))
+        again = SpacyModelLoader.get_nlp(["lemmatizer", "tagger"])
+        other = SpacyModelLoader.get_nlp(("tagger", "parser"))
+
+        # Assert
+        assert first is words_nlp
+        assert again is words_nlp  # Same component set, regardless of order, reuses the profile
+        assert other is chunks_nlp
+        assert mock_spacy_load.call_count == 2
+        mock_spacy_load.assert_any_call(SpacyModelLoader._model_name, enable=["lemmatizer", "tagger"])
+        mock_spacy_load.assert_any_call(SpacyModelLoader._model_name, enable=["parser", "tagger"])
+    SpacyModelLoader._profiles = {}
+
+
+def test_unload_drops_pipelines_and_their_vocabulary():
+    # Arrange
+    SpacyModelLoader._nlp = None
+    SpacyModelLoader._profiles = {}
+    words_nlp = MagicMock()
+    words_nlp.vocab.strings.__len__.return_value = 120
+    reloaded_nlp = MagicMock()
+    reloaded_nlp.vocab.strings.__len__.return_value = 80
+    with patch("spacy.load", side_effect=[words_nlp, reloaded_nlp]) as mock_spacy_load:
+        # Act & Assert
+        assert SpacyModelLoader.vocabulary_size() is None
+        SpacyModelLoader.get_nlp(("tagger",))
+        words_nlp.vocab.strings.__len__.return_value = 150
+        assert SpacyModelLoader.vocabulary_size() == (150, 30)
+
+        SpacyModelLoader.unload()
+        assert SpacyModelLoader.vocabulary_size() is None
+        assert SpacyModelLoader.get_nlp(("tagger",)) is reloaded_nlp
+        assert SpacyModelLoader.vocabulary_size() == (80, 0)
+        assert mock_spacy_load.call_count == 2
+    SpacyModelLoader._profiles = {}
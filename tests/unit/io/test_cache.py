@@ -0,0 +1,109 @@
+from collections import Counter
+
+import pytest
+import spacy
+
+from kratio.io.cache import DocCache, ResultCache, default_cache_dir
+
+
+@pytest.fixture
+def cache(tmp_path) -> ResultCache:
+    """
+    Pytest fixture to create a ResultCache in a temporary directory.
+
+    Returns:
+        ResultCache: A ResultCache instance for testing
+    """
+    return ResultCache(tmp_path / "cache")
+
+
+def test_put_and_get_round_trip(cache):
+    """Test that stored counts are returned on a later lookup, also from a new cache instance."""
+    key = ResultCache.make_key("content", "words", "model-1")
+    cache.put(key, Counter({"apple": 2, "pear": 1}))
+
+    assert cache.get(key) == Counter({"apple": 2, "pear": 1})
+    assert ResultCache(cache.cache_dir.parent).get(key) == Counter({"apple": 2, "pear": 1})
+    assert cache.stats()["hits"] == 1
+
+
+def test_get_miss_returns_none(cache):
+    """Test that an unknown key is a miss."""
+    assert cache.get(ResultCache.make_key("content", "words")) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_make_key_depends_on_every_part():
+    """Test that changing the content, analysis type or model gives a different key."""
+    key = ResultCache.make_key("content", "words", "model-1")
+
+    assert key == ResultCache.make_key("content", "words", "model-1")
+    assert key != ResultCache.make_key("other content", "words", "model-1")
+    assert key != ResultCache.make_key("content", "noun_chunks", "model-1")
+    assert key != ResultCache.make_key("content", "words", "model-2")
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    """Test that exceeding the size limit evicts the least recently used entries first."""
+    cache = ResultCache(tmp_path / "cache", max_bytes=80)
+    counts = Counter({"word": 1})  # Each entry is 24 bytes
+    cache.put("a" * 64, counts)
+    cache.put("b" * 64, counts)
+    cache.put("c" * 64, counts)
+    cache.get("a" * 64)  # "a" becomes the most recently used entry
+
+    cache.put("d" * 64, counts)
+
+    assert cache.get("b" * 64) is None
+    assert cache.get("a" * 64) == counts
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size_bytes"] <= 80
+
+
+def test_unreadable_entry_is_discarded(cache):
+    """Test that a corrupt entry counts as a miss and is removed."""
+    key = "e" * 64
+    cache.put(key, Counter({"word": 1}))
+    cache._entry_path(key).write_text("not json", encoding="utf-8")
+
+    assert cache.get(key) is None
+    assert not cache._entry_path(key).exists()
+    assert cache.stats()["entries"] == 0
+
+
+def test_default_cache_dir_honors_environment(monkeypatch, tmp_path):
+    """Test that KRATIO_CACHE_DIR overrides the default cache location."""
+    monkeypatch.setenv("KRATIO_CACHE_DIR", str(tmp_path))
+    assert default_cache_dir() == tmp_path
+
+    monkeypatch.delenv("KRATIO_CACHE_DIR")
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path))
+    assert default_cache_dir() == tmp_path / "kratio"
+
+
+def test_doc_cache_round_trip(tmp_path):
+    """Test that cached Docs are restored with their tokens and annotations."""
+    nlp = spacy.blank("en")
+    doc = nlp("Apples grow on trees.")
+    doc[0].lemma_ = "apple"
+    cache = DocCache(tmp_path / "cache")
+    key = DocCache.make_key("content", "model-1")
+    cache.store(key, [doc, nlp("")])
+
+    docs = DocCache(tmp_path / "cache").load(key, nlp.vocab)
+
+    assert [d.text for d in docs] == ["Apples grow on trees.", ""]
+    assert docs[0][0].lemma_ == "apple"
+    assert not (tmp_path / "cache" / "results").exists()
+
+
+def test_doc_cache_discards_corrupt_entry(tmp_path):
+    """Test that an entry DocBin cannot read counts as a miss and is removed."""
+    nlp = spacy.blank("en")
+    cache = DocCache(tmp_path / "cache")
+    key = "f" * 64
+    cache.store(key, [nlp("text")])
+    cache._entry_path(key).write_bytes(b"corrupt")
+
+    assert cache.load(key, nlp.vocab) is None
+    assert cache.stats() == {"hits": 0, "misses": 1, "evictions": 0, "entries": 0, "size_bytes": 0}
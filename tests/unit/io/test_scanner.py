@@ -0,0 +1,140 @@
+import pytest
+
+from kratio.io.file_handler import get_files_from_directory
+from kratio.io.scanner import is_ignored, is_scanned, iter_files, parse_ignore_patterns
+
+EXTENSIONS = [".txt", ".md"]
+
+
+def _touch(root, *paths: str):
+    for path in paths:
+        file_path = root / path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text("text", encoding="utf-8")
+
+
+def _relative(root, files):
+    return [file.relative_to(root).as_posix() for file in files]
+
+
+@pytest.mark.parametrize(
+    ("pattern", "path", "is_dir", "expected"),
+    [
+        ("*.md", "docs/guide/readme.md", False, True),
+        ("*.md", "docs/readme.txt", False, False),
+        ("build/", "src/build", True, True),
+        ("build/", "src/build", False, False),
+        ("/notes.txt", "notes.txt", False, True),
+        ("/notes.txt", "sub/notes.txt", False, False),
+        ("docs/*.txt", "docs/a.txt", False, True),
+        ("docs/*.txt", "docs/sub/a.txt", False, False),
+        ("docs/**/*.txt", "docs/sub/deep/a.txt", False, True),
+        ("**/drafts", "a/b/drafts", True, True),
+        ("data/**", "data/x/y.txt", False, True),
+        ("file[0-9].txt", "file7.txt", False, True),
+        ("file[!0-9].txt", "file7.txt", False, False),
+        ("?.txt", "a.txt", False, True),
+    ],
+)
+def test_ignore_pattern_matching(pattern, path, is_dir, expected):
+    """
+    Tests the .gitignore semantics of anchored, unanchored, directory-only and ** patterns.
+    """
+    patterns = parse_ignore_patterns([pattern])
+    assert is_ignored(patterns, path, path.rsplit("/", 1)[-1], is_dir) is expected
+
+
+def test_ignore_patterns_last_match_wins_and_negation_reincludes():
+    """
+    Tests that comments and blank lines are skipped and a later negated pattern re-includes an entry.
+    """
+    patterns = parse_ignore_patterns(["# comment", "", "*.txt", "!keep.txt", "\\#literal.txt"])
+    assert len(patterns) == 3
+    assert is_ignored(patterns, "drop.txt", "drop.txt", False)
+    assert not is_ignored(patterns, "keep.txt", "keep.txt", False)
+    assert not is_ignored(parse_ignore_patterns(["#literal.txt"]), "#literal.txt", "#literal.txt", False)
+
+
+def test_iter_files_prunes_default_directories_and_virtual_environments(tmp_path):
+    """
+    Tests that VCS, dependency and cache directories and virtual environments are skipped unless pruning is off.
+    """
+    _touch(
+        tmp_path,
+        "a.txt",
+        "image.png",
+        ".git/description.txt",
+        "node_modules/pkg/readme.md",
+        "env/lib/site.txt",
+        "src/b.md",
+    )
+    (tmp_path / "env" / "pyvenv.cfg").write_text("home = /usr/bin", encoding="utf-8")
+
+    assert _relative(tmp_path, iter_files(tmp_path, EXTENSIONS)) == ["a.txt", "src/b.md"]
+    assert sorted(_relative(tmp_path, iter_files(tmp_path, EXTENSIONS, prune=False))) == [
+        ".git/description.txt",
+        "a.txt",
+        "env/lib/site.txt",
+        "node_modules/pkg/readme.md",
+        "src/b.md",
+    ]
+
+
+def test_iter_files_honors_nested_ignore_files_and_exclude(tmp_path):
+    """
+    Tests that .gitignore and .kratioignore patterns apply below their directory, and --exclude patterns
+    apply from the root.
+    """
+    _touch(tmp_path, "a.txt", "drafts/d.txt", "docs/keep.md", "docs/skip.md", "docs/out/o.txt", "other/skip.md")
+    (tmp_path / ".gitignore").write_text("drafts/\n", encoding="utf-8")
+    (tmp_path / "docs" / ".kratioignore").write_text("/skip.md\nout\n", encoding="utf-8")
+
+    assert _relative(tmp_path, iter_files(tmp_path, EXTENSIONS)) == ["a.txt", "docs/keep.md", "other/skip.md"]
+    assert _relative(tmp_path, iter_files(tmp_path, EXTENSIONS, exclude=["other"])) == ["a.txt", "docs/keep.md"]
+    assert len(list(iter_files(tmp_path, EXTENSIONS, use_ignore_files=False))) == 6
+
+
+def test_iter_files_order_does_not_depend_on_threads(tmp_path):
+    """
+    Tests that the walk is breadth-first, sorted by name, and identical with and without scan threads.
+    """
+    _touch(tmp_path, "z.txt", "b/2.txt", "b/1.txt", "a/deep/x.txt", "a/y.txt")
+    expected = ["z.txt", "a/y.txt", "b/1.txt", "b/2.txt", "a/deep/x.txt"]
+
+    assert _relative(tmp_path, iter_files(tmp_path, EXTENSIONS, threads=1)) == expected
+    assert _relative(tmp_path, iter_files(tmp_path, EXTENSIONS, threads=4)) == expected
+    assert _relative(tmp_path, get_files_from_directory(str(tmp_path), EXTENSIONS)) == expected
+
+
+def test_iter_files_yields_before_the_walk_is_complete(tmp_path):
+    """
+    Tests that files are yielded lazily: the first file is available before deeper directories are listed.
+    """
+    _touch(tmp_path, "first.txt", "sub/second.txt")
+    files = iter_files(tmp_path, EXTENSIONS, threads=1)
+
+    assert next(files).name == "first.txt"
+    (tmp_path / "sub" / "late.txt").write_text("text", encoding="utf-8")
+    assert [file.name for file in files] == ["late.txt", "second.txt"]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"exclude": ["other"]}, {"use_ignore_files": False}, {"prune": False}],
+)
+def test_is_scanned_agrees_with_iter_files(tmp_path, options):
+    """
+    Tests that checking single files, as watch mode does for file system events, applies the rules of a scan.
+    """
+    all_files = ["a.txt", "image.png", ".git/x.txt", "node_modules/pkg/readme.md", "env/lib/site.txt"]
+    all_files += ["drafts/d.txt", "docs/keep.md", "docs/skip.md", "docs/out/o.txt", "other/skip.md"]
+    _touch(tmp_path, *all_files)
+    (tmp_path / "env" / "pyvenv.cfg").write_text("home = /usr/bin", encoding="utf-8")
+    (tmp_path / ".gitignore").write_text("drafts/\n", encoding="utf-8")
+    (tmp_path / "docs" / ".kratioignore").write_text("/skip.md\nout\n", encoding="utf-8")
+
+    scanned = [path for path in all_files if is_scanned(tmp_path, tmp_path / path, EXTENSIONS, **options)]
+
+    assert scanned == sorted(_relative(tmp_path, iter_files(tmp_path, EXTENSIONS, **options)), key=all_files.index)
+    assert is_scanned(tmp_path, tmp_path / "deleted.txt", EXTENSIONS, **options)
+    assert not is_scanned(tmp_path, tmp_path.parent / "outside.txt", EXTENSIONS, **options)
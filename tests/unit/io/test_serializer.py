@@ -1,3 +1,4 @@
+from functools import partial
 from unittest.mock import patch
 
 import pandas as pd
@@ -70,7 +71,9 @@ def test_serialize_unsupported_format(sample_df, serializer):
         serializer.serialize(sample_df, output_path)
 
         # Assert that the error was logged
-        mock_logger_error.assert_called_once_with("Unsupported output format: .xlsx. Please use .csv or .json.")
+        mock_logger_error.assert_called_once_with(
+            "Unsupported output format: .xlsx. Please use .csv, .json or .ndjson.",
+        )
 
 
 def test_serialize_with_uppercase_extension(sample_df, serializer):
@@ -87,3 +90,33 @@ def test_serialize_with_uppercase_extension(sample_df, serializer):
 
         # Assert that the correct log message was generated
         mock_logger_info.assert_called_once_with(f"DataFrame successfully dumped to {output_path} (CSV format).")
+
+
+@pytest.mark.parametrize("extension", [".csv", ".ndjson", ".json"])
+def test_result_stream_concatenates_tables_with_their_source(tmp_path, serializer, extension):
+    """Test that a stream writes the rows of several tables to one file, each labeled with its source file."""
+    # Arrange
+    output_path = tmp_path / f"results{extension}"
+    first = pd.DataFrame({"WordFrequency": [2, 1]}, index=pd.Index(["cat", "dog"], name="Keyword"))
+    second = pd.DataFrame({"WordFrequency": [3]}, index=pd.Index(["fish"], name="Keyword"))
+
+    # Act
+    with serializer.open_stream(str(output_path)) as stream:
+        stream.write(first, "a.txt")
+        stream.write(second.iloc[:0], "empty.txt")
+        stream.write(second, "b.txt")
+
+    # Assert
+    read = {".csv": pd.read_csv, ".ndjson": partial(pd.read_json, lines=True), ".json": pd.read_json}[extension]
+    rows = read(output_path)
+    assert list(rows.columns) == ["source_file", "Keyword", "WordFrequency"]
+    assert rows.values.tolist() == [["a.txt", "cat", 2], ["a.txt", "dog", 1], ["b.txt", "fish", 3]]
+    assert stream.rows == 3
+
+
+def test_open_stream_rejects_unsupported_format(tmp_path, serializer):
+    """Test that no stream is opened for an unsupported format."""
+    with patch("loguru.logger.error") as mock_logger_error:
+        assert serializer.open_stream(str(tmp_path / "results.xlsx")) is None
+        mock_logger_error.assert_called_once()
+    assert not (tmp_path / "results.xlsx").exists()
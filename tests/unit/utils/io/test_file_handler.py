@@ -3,8 +3,15 @@ from unittest.mock import MagicMock
 
 import pytest
 
-from kratio.exceptions import FileReadError
-from kratio.io.file_handler import _read_text, read_text_file
+from kratio.exceptions import BinaryFileError, FileReadError
+from kratio.io.file_handler import (
+    BINARY_SNIFF_BYTES,
+    _read_text,
+    is_binary_file,
+    iter_text_chunks,
+    read_text_file,
+    split_paragraphs,
+)
 
 
 def test_read_text_file_success(tmp_path):
@@ -86,3 +93,124 @@ def test_read_text_file_with_str_path(tmp_path):
 
     result = read_text_file(str(test_file))
     assert result == file_content
+
+
+def test_iter_text_chunks_small_file_is_one_chunk(tmp_path):
+    """
+    Tests that a file smaller than the chunk size is yielded whole.
+    """
+    file_content = "First paragraph.\n\nSecond paragraph."
+    test_file = tmp_path / "small.txt"
+    test_file.write_text(file_content, encoding="utf-8")
+
+    assert list(iter_text_chunks(test_file, max_chars=1000)) == [file_content]
+
+
+def test_iter_text_chunks_splits_on_paragraphs_and_sentences(tmp_path):
+    """
+    Tests that large content is split on paragraph, then sentence boundaries, within the size limit.
+    """
+    paragraphs = [f"Sentence {i} of the text. Another sentence follows here." for i in range(20)]
+    file_content = "\n\n".join(paragraphs) + "\n\n" + "One very long paragraph. " * 20
+    test_file = tmp_path / "large.txt"
+    test_file.write_text(file_content, encoding="utf-8")
+
+    chunks = list(iter_text_chunks(test_file, max_chars=150))
+
+    assert "".join(chunks) == file_content
+    assert all(len(chunk) <= 150 for chunk in chunks)
+    assert chunks[0].endswith("\n\n")
+    assert chunks[-2].endswith(". ")
+
+
+def test_iter_text_chunks_without_boundaries_cuts_at_limit(tmp_path):
+    """
+    Tests that content without any whitespace is cut at the size limit.
+    """
+    test_file = tmp_path / "dense.txt"
+    test_file.write_text("x" * 25, encoding="utf-8")
+
+    assert list(iter_text_chunks(test_file, max_chars=10)) == ["x" * 10, "x" * 10, "x" * 5]
+
+
+def test_iter_text_chunks_not_found():
+    """
+    Tests that iter_text_chunks raises FileReadError for a non-existent file.
+    """
+    with pytest.raises(FileReadError) as excinfo:
+        list(iter_text_chunks(Path("non_existent_file.txt")))
+    assert "File not found at" in str(excinfo.value)
+
+
+@pytest.mark.parametrize(
+    ("errors", "expected"),
+    [("replace", "caf\ufffd ol\u00e9"), ("skip", "caf ol\u00e9")],
+)
+def test_read_text_file_decode_errors(tmp_path, errors, expected):
+    """
+    Tests that invalid UTF-8 fails the read by default and is replaced or dropped on request.
+    """
+    test_file = tmp_path / "latin1.txt"
+    test_file.write_bytes(b"caf\xe9 ol\xc3\xa9")
+
+    with pytest.raises(FileReadError):
+        read_text_file(test_file)
+    assert read_text_file(test_file, errors=errors) == expected
+
+
+def test_iter_text_chunks_memory_maps_large_files(tmp_path):
+    """
+    Tests that a file over the memory-mapping threshold decodes like a small one, with multi-byte characters
+    split across decode blocks and Windows line endings translated.
+    """
+    line = "Caf\u00e9 \u2014 na\u00efve r\u00e9sum\u00e9.\r\n"
+    test_file = tmp_path / "large.txt"
+    test_file.write_bytes((line * 60_000).encode("utf-8"))
+    assert test_file.stat().st_size > 1024 * 1024
+
+    chunks = list(iter_text_chunks(test_file, max_chars=50_000))
+
+    assert "".join(chunks) == line.replace("\r\n", "\n") * 60_000
+    assert all(len(chunk) <= 50_000 for chunk in chunks)
+
+
+def test_binary_files_are_detected_from_their_first_bytes(tmp_path, monkeypatch):
+    """
+    Tests that a file with NUL bytes is rejected after reading only its first block.
+    """
+    test_file = tmp_path / "image.txt"
+    test_file.write_bytes(b"\x89PNG\r\n\x1a\n\x00\x00" + b"x" * (4 * BINARY_SNIFF_BYTES))
+    reads = []
+    original_open = Path.open
+
+    def tracking_open(self, *args: object, **kwargs: object):
+        f = original_open(self, *args, **kwargs)
+        original_read = f.read
+        f.read = lambda size=-1: reads.append(size) or original_read(size)
+        return f
+
+    monkeypatch.setattr(Path, "open", tracking_open)
+
+    assert is_binary_file(test_file)
+    assert not is_binary_file(tmp_path / "missing.txt")
+    with pytest.raises(BinaryFileError):
+        list(iter_text_chunks(test_file))
+    assert reads == [BINARY_SNIFF_BYTES, BINARY_SNIFF_BYTES]
+
+
+def test_split_paragraphs_drops_blank_lines():
+    """
+    Tests that text is split on blank lines, including lines holding only whitespace.
+    """
+    text = "First line\nstill first.\n\nSecond.\n  \n\n\tThird.\n\n"
+
+    assert split_paragraphs(text) == ["First line\nstill first.", "Second.", "Third."]
+
+
+def test_split_paragraphs_splits_long_paragraphs():
+    """
+    Tests that a paragraph above the size limit is split on sentence boundaries.
+    """
+    paragraphs = split_paragraphs("One two. Three four. Five.\n\nSix.", max_chars=12)
+
+    assert paragraphs == ["One two. ", "Three four. ", "Five.", "Six."]
@@ -49,3 +49,17 @@ def test_normalize_to_dataframe_with_data():
 
     # Verify sorting
     assert list(df.index) == ["c", "b", "a"]
+
+
+def test_normalize_to_dataframe_top_n_matches_head_of_full_result():
+    """
+    Test that selecting the top N rows gives the head of the full DataFrame, including the order of ties.
+    """
+    counts = pd.Series({"a": 2, "b": 5, "c": 2, "d": 7, "e": 2, "f": 1})
+
+    full_df = normalize_to_dataframe(counts, 19, "Word", "Word")
+    top_df = normalize_to_dataframe(counts, 19, "Word", "Word", top_n=4)
+
+    pd.testing.assert_frame_equal(top_df, full_df.head(4))
+    assert list(top_df.index) == ["d", "b", "a", "c"]
+    assert top_df.loc["d", "WordDensity"] == pytest.approx(7 / 19 * 100)
@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+from kratio.utils.memory import MemoryLimits, rss_bytes
+from kratio.utils.metrics import metrics
+
+
+def test_vocabulary_growth_asks_for_a_reload():
+    """
+    Test that a reload is asked for once the vocabulary has gained more strings than the limit.
+    """
+    limits = MemoryLimits(max_vocabulary_growth=100)
+
+    assert limits.check((1_000, 0)) is None
+    assert limits.check((1_100, 100)) is None
+    assert limits.check((1_101, 101)) == "its vocabulary grew by 101 strings"
+    assert metrics.summary()["gauges"]["vocabulary strings"]["value"] == 1_101
+
+
+def test_rss_limit_waits_between_reloads():
+    """
+    Test that exceeding the resident set size limit asks for a reload, but not again right after one.
+    """
+    limits = MemoryLimits(max_rss_bytes=1024 * 1024)
+
+    with patch("kratio.utils.memory.rss_bytes", return_value=2 * 1024 * 1024):
+        assert limits.check((10, 0)) == "the process uses 2 MiB"
+        limits.reloaded()
+        assert limits.check((10, 0)) is None
+    assert metrics.summary()["gauges"]["rss bytes"]["value"] == 2 * 1024 * 1024
+
+
+def test_no_limits_only_record_gauges():
+    """
+    Test that without limits nothing is reloaded, and that the resident set size is read on Linux.
+    """
+    limits = MemoryLimits()
+
+    assert limits.check((10**9, 10**9)) is None
+    assert limits.check(None) is None
+    rss = rss_bytes()
+    assert rss is None or rss > 0
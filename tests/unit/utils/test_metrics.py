@@ -0,0 +1,119 @@
+import json
+
+import pytest
+
+from kratio.utils.metrics import LatencyHistogram, MetricsRegistry
+
+
+def test_histogram_quantiles_are_accurate_within_bucket_width():
+    """Test that p50 and p99 estimates are within a bucket width (4%) of the exact values."""
+    histogram = LatencyHistogram()
+    for millisecond in range(1, 1001):
+        histogram.observe(millisecond / 1000)
+
+    assert histogram.quantile(0.5) == pytest.approx(0.5, rel=0.04)
+    assert histogram.quantile(0.99) == pytest.approx(0.99, rel=0.04)
+    assert histogram.quantile(1.0) == pytest.approx(1.0)
+    assert histogram.summary()["count"] == 1000
+    assert histogram.summary()["total_s"] == pytest.approx(500.5)
+
+
+def test_time_items_records_one_observation_per_item():
+    """Test that time_items yields every item and observes the time to produce each one."""
+    registry = MetricsRegistry()
+
+    assert list(registry.time_items("stage", iter("abc"))) == ["a", "b", "c"]
+    assert registry.summary()["stages"]["stage"]["count"] == 3
+
+
+def test_time_total_records_one_observation_per_iterable():
+    """Test that time_total observes the total time of an iterable once it is exhausted."""
+    registry = MetricsRegistry()
+
+    assert list(registry.time_total("reading", ["chunk 1", "chunk 2"])) == ["chunk 1", "chunk 2"]
+    assert registry.summary()["stages"]["reading"]["count"] == 1
+
+
+def test_drain_and_merge_move_metrics_between_registries():
+    """Test that metrics drained from one registry (e.g. a worker process) add up in another one."""
+    worker = MetricsRegistry()
+    worker.increment("documents")
+    worker.observe("counting", 0.5)
+    parent = MetricsRegistry()
+    parent.increment("documents", 2)
+    parent.observe("counting", 0.25)
+
+    parent.merge(worker.drain())
+
+    assert worker.summary() == {"counters": {}, "stages": {}, "gauges": {}}
+    summary = parent.summary()
+    assert summary["counters"] == {"documents": 3}
+    assert summary["stages"]["counting"]["count"] == 2
+    assert summary["stages"]["counting"]["max_s"] == 0.5
+
+
+def test_to_prometheus_formats_counters_and_stage_summaries():
+    """Test the Prometheus text format of counters and of the stage latency summary."""
+    registry = MetricsRegistry()
+    registry.increment("tokens", 42)
+    registry.observe('analyzing "words"', 0.002)
+
+    text = registry.to_prometheus()
+
+    assert "# TYPE kratio_tokens_total counter\nkratio_tokens_total 42\n" in text
+    assert "# TYPE kratio_stage_seconds summary" in text
+    assert 'kratio_stage_seconds{stage="analyzing \\"words\\"",quantile="0.99"} 0.002' in text
+    assert 'kratio_stage_seconds_count{stage="analyzing \\"words\\""} 1' in text
+
+
+def test_write_picks_the_format_from_the_extension(tmp_path):
+    """Test that .json files receive the JSON summary and other files the Prometheus text format."""
+    registry = MetricsRegistry()
+    registry.increment("documents", 5)
+
+    registry.write(tmp_path / "metrics.json")
+    registry.write(tmp_path / "metrics.prom")
+
+    assert json.loads((tmp_path / "metrics.json").read_text())["counters"] == {"documents": 5}
+    assert (tmp_path / "metrics.prom").read_text().endswith("kratio_documents_total 5\n")
+
+
+def test_stage_listener_is_notified_of_stage_boundaries():
+    """Test that the stage listener sees every timed block and every item produced by a timed iterable."""
+    registry = MetricsRegistry()
+    events = []
+
+    class Listener:
+        def enter(self, stage: str) -> None:
+            events.append(("enter", stage))
+
+        def exit(self, stage: str) -> None:
+            events.append(("exit", stage))
+
+    registry.stage_listener = Listener()
+    with registry.time("outer"):
+        list(registry.time_total("inner", [1]))
+
+    assert events == [
+        ("enter", "outer"),
+        ("enter", "inner"),
+        ("exit", "inner"),
+        ("enter", "inner"),  # The call that finds the iterable exhausted
+        ("exit", "inner"),
+        ("exit", "outer"),
+    ]
+
+
+def test_gauges_keep_last_mean_and_max_and_are_exported():
+    """Test that gauges summarize their samples, survive drain and merge, and appear in the Prometheus format."""
+    worker = MetricsRegistry()
+    for depth in (2, 6, 4):
+        worker.set_gauge("reading queue depth", depth)
+    parent = MetricsRegistry()
+    parent.merge(worker.drain())
+
+    gauge = parent.summary()["gauges"]["reading queue depth"]
+    assert gauge == {"value": 4, "mean": 4.0, "max": 6, "samples": 3}
+    text = parent.to_prometheus()
+    assert "# TYPE kratio_reading_queue_depth gauge\nkratio_reading_queue_depth 4\n" in text
+    assert "kratio_reading_queue_depth_max 6\n" in text
@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from kratio.utils.metrics import metrics
+from kratio.utils.pipeline import OrderedWriter, prefetch
+
+
+def test_prefetch_yields_results_in_order_and_stays_bounded():
+    """
+    Test that prefetch keeps the input order and never takes more than `depth` items ahead of the consumer.
+    """
+    taken = []
+
+    def items():
+        for i in range(20):
+            taken.append(i)
+            yield i
+
+    def slow_square(i: int) -> int:
+        time.sleep(0.001 * (i % 3))
+        return i * i
+
+    results = []
+    for item, result in prefetch(slow_square, items(), "test", threads=4, depth=3):
+        assert len(taken) - len(results) <= 3
+        results.append((item, result))
+
+    assert results == [(i, i * i) for i in range(20)]
+    assert metrics.summary()["gauges"]["test queue depth"]["max"] <= 3
+
+
+def test_prefetch_reraises_errors_when_their_item_is_reached():
+    """
+    Test that an exception of the stage surfaces in order, after the results of earlier items.
+    """
+
+    def fail_on_two(i: int) -> int:
+        if i == 2:
+            raise ValueError("bad item")
+        return i
+
+    results = prefetch(fail_on_two, range(5), "test", threads=2, depth=4)
+
+    assert [next(results), next(results)] == [(0, 0), (1, 1)]
+    with pytest.raises(ValueError, match="bad item"):
+        next(results)
+
+
+def test_ordered_writer_runs_tasks_in_order_on_another_thread():
+    """
+    Test that the writer keeps the submission order, runs off the calling thread and is drained on exit.
+    """
+    written = []
+    threads = set()
+
+    def write(i: int) -> None:
+        time.sleep(0.001)
+        threads.add(threading.get_ident())
+        written.append(i)
+
+    with OrderedWriter("test", depth=2) as writer:
+        for i in range(10):
+            writer.submit(write, i)
+
+    assert written == list(range(10))
+    assert threading.get_ident() not in threads
+
+
+def test_ordered_writer_reraises_task_errors():
+    """
+    Test that a failed task is reported by a later submission or by closing the writer.
+    """
+
+    def fail() -> None:
+        raise OSError("disk full")
+
+    writer = OrderedWriter("test", depth=4)
+    writer.submit(fail)
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+
+
+def test_ordered_writer_without_depth_runs_inline():
+    """
+    Test that a depth of 0 runs tasks immediately in the calling thread.
+    """
+    calls = []
+    with OrderedWriter("test", depth=0) as writer:
+        writer.submit(lambda: calls.append(threading.get_ident()))
+        assert calls == [threading.get_ident()]
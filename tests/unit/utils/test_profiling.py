@@ -0,0 +1,59 @@
+import pstats
+import time
+
+import pytest
+
+from kratio.utils.metrics import MetricsRegistry
+from kratio.utils.profiling import StageProfiler
+
+
+def test_stage_profiler_separates_cumulative_and_self_time():
+    """Test that nested stages count toward the cumulative but not the self time of the enclosing stage."""
+    registry = MetricsRegistry()
+    profiler = StageProfiler()
+
+    with profiler.profile(registry), registry.time("outer"):
+        for _ in registry.time_items("inner", range(2)):
+            pass
+        time.sleep(0.01)
+        with registry.time("inner"):
+            time.sleep(0.02)
+
+    outer, inner = profiler.stages["outer"], profiler.stages["inner"]
+    assert outer.intervals == 1
+    assert inner.intervals == 4  # Two items, the exhausted call and the block
+    assert outer.wall >= inner.wall + 0.01
+    assert outer.self_wall == pytest.approx(outer.wall - inner.wall)
+    assert registry.stage_listener is None
+
+
+def test_stage_profiler_attributes_peak_allocations_to_stages():
+    """Test that memory allocated inside a nested stage counts toward its peak and the enclosing one's."""
+    registry = MetricsRegistry()
+    profiler = StageProfiler()
+
+    with profiler.profile(registry), registry.time("presenting"):
+        with registry.time("building"):
+            block = bytearray(4 * 1024 * 1024)
+            del block
+        with registry.time("displaying"):
+            pass
+
+    assert profiler.stages["building"].peak_bytes >= 4 * 1024 * 1024
+    assert profiler.stages["presenting"].peak_bytes >= 4 * 1024 * 1024
+    assert profiler.stages["displaying"].peak_bytes < 1024 * 1024
+
+
+def test_report_and_dump_stats(tmp_path):
+    """Test that the report lists the stages and top functions, and that the .pstats file can be loaded."""
+    registry = MetricsRegistry()
+    profiler = StageProfiler(top_functions=5)
+    with profiler.profile(registry), registry.time("reading file"):
+        sorted(range(1000), reverse=True)
+
+    report = profiler.report()
+    profiler.dump_stats(tmp_path / "run.pstats")
+
+    assert "reading file" in report
+    assert "Top 5 functions by cumulative time" in report
+    assert pstats.Stats(str(tmp_path / "run.pstats")).total_calls > 0
@@ -1,25 +1,55 @@
-from unittest.mock import MagicMock, patch
+import pytest
+from loguru import logger
 
+from kratio.utils.metrics import metrics
 from kratio.utils.timing import timed
 
 
-def test_timed_decorator_logs_execution_time():
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    """Pytest fixture clearing the process-wide metrics registry around each test."""
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def test_timed_decorator_records_execution_time():
     """
-    Test that the `timed` decorator logs the execution time of a function.
+    Test that the `timed` decorator records the execution time of a function in the metrics registry
+    without logging every call.
     """
-    # Arrange
-    mock_logger = MagicMock()
 
+    # Arrange
     @timed("test_function")
     def sample_function(x, y):
         return x + y
 
+    messages = []
+    sink_id = logger.add(messages.append, level="DEBUG")
+
     # Act
-    with patch("kratio.utils.timing.logger", mock_logger):
+    try:
         result = sample_function(1, 2)
+        sample_function(3, 4)
+    finally:
+        logger.remove(sink_id)
 
     # Assert
     assert result == 3
-    mock_logger.info.assert_called_once()
-    call_args, _ = mock_logger.info.call_args
-    assert "Time spent test_function" in call_args[0]
+    assert metrics.summary()["stages"]["test_function"]["count"] == 2
+    assert messages == []
+
+
+def test_timed_decorator_records_failed_calls():
+    """
+    Test that calls raising an exception are timed as well.
+    """
+
+    @timed("failing_function")
+    def failing_function():
+        raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        failing_function()
+
+    assert metrics.summary()["stages"]["failing_function"]["count"] == 1
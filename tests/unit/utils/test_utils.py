@@ -59,6 +59,16 @@ def test_format_top_keywords_with_noun_chunk_df(sample_noun_chunk_df):
     assert result[2]["keyword"] == "chunk3"
 
 
+def test_format_top_keywords_includes_document_frequency(sample_word_df):
+    """Test format_top_keywords with corpus results that have a document frequency column."""
+    sample_word_df["WordDocumentFrequency"] = [5, 4, 3, 2, 1]
+
+    result = format_top_keywords(sample_word_df, 2)
+
+    assert result[0]["documents"] == 5
+    assert result[1]["documents"] == 4
+
+
 def test_format_top_keywords_with_empty_df(empty_df):
     """Test format_top_keywords with an empty DataFrame."""
     result = format_top_keywords(empty_df, 3)
@@ -136,7 +146,7 @@ def test_display_top_keywords_csv_format(mock_print, sample_word_df):
 
 
 @patch("kratio.utils.utils.print")
-@patch("kratio.utils.utils.tabulate")
+@patch("tabulate.tabulate")
 def test_display_top_keywords_table_format(mock_tabulate, mock_print, sample_word_df):
     """Test display_top_keywords with table format."""
     mock_tabulate.return_value = "Mocked Table Output"
@@ -2,12 +2,22 @@
 Unit tests for the watch module.
 """
 
+import os
+import threading
+import time
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from kratio.utils.watch import FileWatcher, KratioEventHandler
+from kratio.utils.watch import ChangeQueue, FileFingerprints, FileWatcher, KratioEventHandler
+
+
+def _wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Timed out waiting for the change queue"
+        time.sleep(0.01)
 
 
 def test_kratio_event_handler_init():
@@ -24,8 +34,6 @@ def test_kratio_event_handler_init():
     assert handler.callback == callback
     assert handler.supported_extensions == supported_extensions
     assert handler.target_path == target_path
-    assert handler.last_processed_time == 0
-    assert handler.debounce_seconds > 0
 
 
 def test_kratio_event_handler_on_modified_directory_event():
@@ -43,25 +51,89 @@ def test_kratio_event_handler_on_modified_directory_event():
     callback.assert_not_called()
 
 
-def test_kratio_event_handler_on_modified_debounce():
-    """Test debouncing of rapid events."""
+def test_kratio_event_handler_forwards_every_event():
+    """Test that the handler forwards rapid events for different files; debouncing is left to the queue."""
     # Arrange
     callback = MagicMock()
     handler = KratioEventHandler(callback)
-    handler.debounce_seconds = 1.0  # Set a longer debounce for testing
+    first_event = MagicMock(is_directory=False, src_path="a.txt")
+    second_event = MagicMock(is_directory=False, src_path="b.txt")
 
-    event = MagicMock()
-    event.is_directory = False
-    event.src_path = "test.txt"
+    # Act - Changes to two files in rapid succession
+    handler.on_modified(first_event)
+    handler.on_modified(second_event)
 
-    # Act - Call twice in rapid succession
-    handler.on_modified(event)
-    first_time = handler.last_processed_time
-    handler.on_modified(event)
+    # Assert - Neither change is dropped
+    assert [call.args[0] for call in callback.call_args_list] == [Path("a.txt"), Path("b.txt")]
 
-    # Assert - Second call should be debounced
-    assert callback.call_count == 1
-    assert handler.last_processed_time == first_time
+
+def test_change_queue_collapses_bursts_per_file():
+    """Test that a burst of changes results in one analysis per touched file, after the burst."""
+    # Arrange
+    analyzed = []
+    queue = ChangeQueue(analyzed.append, workers=2, debounce_seconds=0.05)
+    queue.start()
+
+    # Act - Many changes to a few files, like a checkout
+    for _ in range(20):
+        for name in ("a.txt", "b.txt", "c.txt"):
+            queue.submit(Path(name))
+    _wait_until(lambda: queue.pending() == 0)
+    queue.stop()
+
+    # Assert
+    assert sorted(analyzed) == [Path("a.txt"), Path("b.txt"), Path("c.txt")]
+
+
+def test_change_queue_never_analyzes_a_file_concurrently():
+    """Test that a change during the analysis of a file queues it again rather than analyzing it in parallel."""
+    # Arrange
+    active = set()
+    overlaps = []
+    calls = []
+    started = threading.Event()
+
+    def analyze(file_path: Path) -> None:
+        overlaps.append(file_path in active)
+        active.add(file_path)
+        calls.append(file_path)
+        started.set()
+        time.sleep(0.1)
+        active.discard(file_path)
+
+    queue = ChangeQueue(analyze, workers=4, debounce_seconds=0.01)
+    queue.start()
+
+    # Act - Change the file again while its first analysis is running
+    queue.submit(Path("a.txt"))
+    assert started.wait(5)
+    queue.submit(Path("a.txt"))
+    _wait_until(lambda: queue.pending() == 0)
+    queue.stop()
+
+    # Assert
+    assert calls == [Path("a.txt"), Path("a.txt")]
+    assert not any(overlaps)
+
+
+def test_change_queue_hold_defers_analysis():
+    """Test that changes reported while the queue is held are analyzed once it is released."""
+    # Arrange
+    analyzed = []
+    queue = ChangeQueue(analyzed.append, workers=1, debounce_seconds=0.01)
+    queue.start()
+
+    # Act
+    with queue.hold():
+        queue.submit(Path("a.txt"))
+        time.sleep(0.1)
+        held = list(analyzed)
+    _wait_until(lambda: queue.pending() == 0)
+    queue.stop()
+
+    # Assert
+    assert held == []
+    assert analyzed == [Path("a.txt")]
 
 
 def test_kratio_event_handler_on_modified_target_file():
@@ -130,8 +202,22 @@ def test_kratio_event_handler_on_moved(tmp_path):
     # Act
     handler.on_moved(event)
 
+    # Assert - The source is reported too, as the file is gone from there
+    assert [call.args[0] for call in callback.call_args_list] == [tmp_path / "original.txt", dest_path]
+
+
+def test_kratio_event_handler_on_deleted(tmp_path):
+    """Test that deleting a watched file is reported, and deleting an unsupported one is not."""
+    # Arrange
+    callback = MagicMock()
+    handler = KratioEventHandler(callback, supported_extensions=[".txt"])
+
+    # Act
+    handler.on_deleted(MagicMock(is_directory=False, src_path=str(tmp_path / "gone.txt")))
+    handler.on_deleted(MagicMock(is_directory=False, src_path=str(tmp_path / "image.png")))
+
     # Assert
-    callback.assert_called_once_with(dest_path)
+    callback.assert_called_once_with(tmp_path / "gone.txt")
 
 
 def test_kratio_event_handler_on_created(tmp_path):
@@ -151,6 +237,77 @@ def test_kratio_event_handler_on_created(tmp_path):
     callback.assert_called_once_with(created_path)
 
 
+def test_file_fingerprints_skip_saves_without_changes(tmp_path):
+    """Test that rewriting the same content is not a change, while editing the content is."""
+    # Arrange
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("Cats chase mice.", encoding="utf-8")
+    fingerprints = FileFingerprints()
+    fingerprints.record_stat(file_path)
+
+    # Act & Assert - Nothing happened: not even hashed
+    with patch("kratio.utils.watch.hash_file") as mock_hash:
+        assert fingerprints.changed(file_path) is False
+        mock_hash.assert_not_called()
+
+    # A save with the same content changes the modification time, but not the digest
+    fingerprints.hash_recorded()
+    file_path.write_text("Cats chase mice.", encoding="utf-8")
+    os.utime(file_path, ns=(1, 1))
+    assert fingerprints.changed(file_path) is False
+
+    # An edit
+    file_path.write_text("Dogs chase cats.", encoding="utf-8")
+    assert fingerprints.changed(file_path) is True
+
+
+def test_file_fingerprints_do_not_hash_files_changed_since_recorded(tmp_path):
+    """Test that a file edited after its stat was recorded keeps counting as changed."""
+    file_path = tmp_path / "notes.txt"
+    file_path.write_text("Cats chase mice.", encoding="utf-8")
+    fingerprints = FileFingerprints()
+    fingerprints.record_stat(file_path)
+
+    file_path.write_text("Dogs chase cats, again.", encoding="utf-8")
+    fingerprints.hash_recorded()
+
+    assert fingerprints.changed(file_path) is True
+
+
+def test_file_fingerprints_missing_file_counts_as_changed(tmp_path):
+    """Test that a file that cannot be read is handed to the analysis, which reports the error."""
+    assert FileFingerprints().changed(tmp_path / "missing.txt") is True
+
+
+@patch("kratio.utils.watch.PollingObserver")
+@patch("kratio.utils.watch.Observer")
+def test_file_watcher_polling(mock_observer_class, mock_polling_class):
+    """Test that polling uses the stat-based observer with the given interval."""
+    with patch("kratio.utils.watch.is_directory", return_value=True), patch("pathlib.Path.exists", return_value=True):
+        watcher = FileWatcher()
+        watcher.start_watching("test_dir", MagicMock(), polling=True, poll_interval=2.5)
+        watcher.stop_watching()
+
+    mock_observer_class.assert_not_called()
+    mock_polling_class.assert_called_once_with(timeout=2.5)
+    mock_polling_class.return_value.start.assert_called_once()
+
+
+@patch("kratio.utils.watch.PollingObserver")
+@patch("kratio.utils.watch.Observer")
+def test_file_watcher_falls_back_to_polling(mock_observer_class, mock_polling_class):
+    """Test that polling is used when file system events are unavailable, e.g. at the inotify watch limit."""
+    mock_observer_class.return_value.start.side_effect = OSError("inotify watch limit reached")
+
+    with patch("kratio.utils.watch.is_directory", return_value=True), patch("pathlib.Path.exists", return_value=True):
+        watcher = FileWatcher()
+        watcher.start_watching("test_dir", MagicMock())
+        watcher.stop_watching()
+
+    assert watcher.observer == mock_polling_class.return_value
+    mock_polling_class.return_value.start.assert_called_once()
+
+
 def test_file_watcher_init():
     """Test initialization of FileWatcher."""
     # Act
@@ -265,3 +422,46 @@ def test_file_watcher_cleanup_on_del(mock_observer_class):
         # Assert
         mock_observer.stop.assert_called_once()
         mock_observer.join.assert_called_once()
+
+
+def test_file_watcher_hashes_fingerprints_after_hold():
+    """Test that the files recorded during the initial analysis are hashed once it is over, not before."""
+    watcher = FileWatcher()
+
+    with patch.object(watcher.fingerprints, "hash_recorded") as mock_hash:
+        with watcher.hold_changes():
+            time.sleep(0.05)
+            mock_hash.assert_not_called()
+        _wait_until(lambda: mock_hash.called)
+
+
+def test_kratio_event_handler_ignores_files_excluded_from_the_scan(tmp_path):
+    """Test that changes to files the directory scan skips, e.g. in node_modules, are not reported."""
+    # Arrange
+    callback = MagicMock()
+    handler = KratioEventHandler(callback, [".md"], accept=lambda path: "node_modules" not in path.parts)
+    kept, skipped = tmp_path / "README.md", tmp_path / "node_modules" / "pkg" / "README.md"
+
+    # Act
+    for path in (kept, skipped):
+        handler.on_created(MagicMock(is_directory=False, src_path=str(path)))
+        handler.on_modified(MagicMock(is_directory=False, src_path=str(path)))
+        handler.on_deleted(MagicMock(is_directory=False, src_path=str(path)))
+    handler.on_moved(MagicMock(is_directory=False, src_path=str(skipped), dest_path=str(skipped.with_stem("x"))))
+
+    # Assert
+    assert [call.args[0] for call in callback.call_args_list] == [kept, kept, kept]
+
+
+@patch("kratio.utils.watch.Observer")
+def test_file_watcher_filters_events_with_the_scan_rules(mock_observer_class, tmp_path):
+    """Test that a watched directory reports changes with the rules of its scan, honoring exclude."""
+    (tmp_path / "node_modules").mkdir()
+    (tmp_path / "drafts").mkdir()
+    watcher = FileWatcher()
+    watcher.start_watching(tmp_path, MagicMock(), exclude=["drafts/"])
+    watcher.stop_watching()
+
+    assert watcher.handler.accept(tmp_path / "notes.md")
+    assert not watcher.handler.accept(tmp_path / "node_modules" / "README.md")
+    assert not watcher.handler.accept(tmp_path / "drafts" / "notes.md")
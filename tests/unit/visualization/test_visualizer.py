@@ -5,6 +5,7 @@ import pytest
 
 from kratio.constants import ANALYSIS_TYPE_NOUN_CHUNKS, ANALYSIS_TYPE_WORDS
 from kratio.visualization.visualizer import (
+    close_plots,
     display_plot,
     persist_plot,
     visualize_top_keywords,
@@ -105,3 +106,14 @@ def test_persist_plot(tmp_path):
     save_path = tmp_path / "test_plot.png"
     persist_plot(mock_fig, str(save_path))
     mock_fig.savefig.assert_called_once_with(str(save_path))
+
+
+def test_close_plots_releases_figures():
+    import matplotlib.pyplot as plt
+
+    visualize_top_keywords(pd.DataFrame({"WordDensity": [50.0, 50.0]}, index=["cat", "dog"]))
+    assert plt.get_fignums()
+
+    close_plots()
+
+    assert not plt.get_fignums()